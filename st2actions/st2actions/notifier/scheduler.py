@@ -22,6 +22,7 @@ import apscheduler.util as aps_utils
 
 from st2common import log as logging
 from st2common.constants import action as action_constants
+from st2common.policies import concurrency as concurrency_policies
 from st2common.services import coordination
 from st2common.util import date as date_utils
 from st2common.services import action as action_service
@@ -60,6 +61,13 @@ def recover_delayed_executions():
     dt_timeout = dt_now - dt_delta
 
     with coordinator.get_lock('st2-rescheduling-delayed-executions'):
+        # Release concurrency policy slots which are held by executions which have completed
+        # without the post run policies being applied so the delayed executions can be scheduled.
+        try:
+            concurrency_policies.reconcile_slots()
+        except:
+            LOG.exception('Unable to reconcile concurrency policy slots.')
+
         liveactions = LiveAction.query(status=action_constants.LIVEACTION_STATUS_DELAYED,
                                        start_timestamp__lte=dt_timeout,
                                        order_by=['start_timestamp'])
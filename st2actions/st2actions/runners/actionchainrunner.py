@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import eventlet
 import traceback
 import uuid
@@ -34,29 +35,49 @@ from st2common.models.system import actionchain
 from st2common.models.utils import action_param_utils
 from st2common.persistence.execution import ActionExecution
 from st2common.services import action as action_service
-from st2common.services.keyvalues import KeyValueLookup
+from st2common.services import liveaction_watcher
+from st2common.services.keyvalues import get_key_value_lookup
 from st2common.util import action_db as action_db_util
 from st2common.util import isotime
 from st2common.util import date as date_utils
 from st2common.util import jinja as jinja_utils
+from st2common.util.cache import LRUCache
 
 
 LOG = logging.getLogger(__name__)
 RESULTS_KEY = '__results'
 
+# Parallel node join semantics
+JOIN_ALL = 'all'
+JOIN_ANY = 'any'
+
+# Maximum number of parsed chain definitions which are cached per process
+CHAIN_CACHE_SIZE = 500
+
+# Maps chain definition file path to a tuple of (file signature, ActionChain). Cached chains are
+# shared between executions and should be treated as read-only.
+_CHAIN_CACHE = LRUCache(max_size=CHAIN_CACHE_SIZE)
+
 
 class ChainHolder(object):
 
     def __init__(self, chainspec, chainname):
-        self.actionchain = actionchain.ActionChain(**chainspec)
         self.chainname = chainname
+        self.vars = {}
+
+        if isinstance(chainspec, actionchain.ActionChain):
+            # Chain has already been parsed and validated (e.g. it has been retrieved from cache)
+            self.actionchain = chainspec
+            return
+
+        self.actionchain = actionchain.ActionChain(**chainspec)
         if not self.actionchain.default:
             default = self._get_default(self.actionchain)
             self.actionchain.default = default
         LOG.debug('Using %s as default for %s.', self.actionchain.default, self.chainname)
         if not self.actionchain.default:
             raise Exception('Failed to find default node in %s.' % (self.chainname))
-        self.vars = {}
+        self._validate_nodes(self.actionchain)
 
     def init_vars(self, action_parameters):
         if self.actionchain.vars:
@@ -80,7 +101,8 @@ class ChainHolder(object):
         node_names = set(all_nodes)
         on_success_nodes = set([node.on_success for node in _actionchain.chain])
         on_failure_nodes = set([node.on_failure for node in _actionchain.chain])
-        referenced_nodes = on_success_nodes | on_failure_nodes
+        parallel_nodes = set([name for node in _actionchain.chain for name in node.parallel or []])
+        referenced_nodes = on_success_nodes | on_failure_nodes | parallel_nodes
         possible_default_nodes = node_names - referenced_nodes
         if possible_default_nodes:
             # This is to preserve order. set([..]) does not preserve the order so iterate
@@ -91,11 +113,45 @@ class ChainHolder(object):
         # If no node is found assume the first node in the chain list to be default.
         return _actionchain.chain[0].name
 
+    @staticmethod
+    def _validate_nodes(_actionchain):
+        nodes = dict([(node.name, node) for node in _actionchain.chain])
+
+        for node in _actionchain.chain:
+            if not node.parallel:
+                if not node.ref:
+                    raise Exception('Node "%s" needs to specify either ref or parallel.' %
+                                    (node.name))
+                continue
+
+            if node.ref:
+                raise Exception('Parallel node "%s" can\'t specify ref.' % (node.name))
+
+            for name in node.parallel:
+                if name not in nodes:
+                    raise Exception('Unable to find node with name "%s" referenced by parallel '
+                                    'node "%s".' % (name, node.name))
+
+                if nodes[name].parallel:
+                    raise Exception('Parallel node "%s" can\'t reference another parallel node '
+                                    '"%s".' % (node.name, name))
+
+    def compile_templates(self):
+        """
+        Compile templates used in the chain variables, task parameters and published variables
+        so they don't need to be compiled when the chain is executed.
+        """
+        jinja_utils.compile_values(mapping=self.actionchain.vars)
+
+        for node in self.actionchain.chain:
+            jinja_utils.compile_values(mapping=node.params)
+            jinja_utils.compile_values(mapping=node.publish)
+
     @staticmethod
     def _get_rendered_vars(vars, action_parameters):
         if not vars:
             return {}
-        context = {SYSTEM_KV_PREFIX: KeyValueLookup()}
+        context = {SYSTEM_KV_PREFIX: get_key_value_lookup(vars)}
         context.update(action_parameters)
         return jinja_utils.render_values(mapping=vars, context=context)
 
@@ -133,6 +189,30 @@ class ActionChainRunner(ActionRunner):
 
     def pre_run(self):
         chainspec_file = self.entry_point
+        self.chain_holder = self._get_chain_holder(chainspec_file=chainspec_file)
+
+        # Runner attributes are set lazily. So these steps
+        # should happen outside the constructor.
+        if getattr(self, 'liveaction', None):
+            self._chain_notify = getattr(self.liveaction, 'notify', None)
+        if self.runner_parameters:
+            self._skip_notify_tasks = self.runner_parameters.get('skip_notify', [])
+
+    def _get_chain_holder(self, chainspec_file):
+        """
+        Return ChainHolder for the provided chain definition file.
+
+        Parsed and validated chains are cached and only re-read from disk when the file changes
+        (e.g. when the pack is updated and re-registered).
+        """
+        signature = _get_file_signature(chainspec_file)
+        cached = _CHAIN_CACHE.get(chainspec_file)
+
+        if signature and cached and cached[0] == signature:
+            LOG.debug('Using cached action chain from %s for action %s.', chainspec_file,
+                      self.action)
+            return ChainHolder(cached[1], self.action_name)
+
         LOG.debug('Reading action chain from %s for action %s.', chainspec_file,
                   self.action)
 
@@ -146,18 +226,19 @@ class ActionChainRunner(ActionRunner):
             raise runnerexceptions.ActionRunnerPreRunError(message)
 
         try:
-            self.chain_holder = ChainHolder(chainspec, self.action_name)
+            chain_holder = ChainHolder(chainspec, self.action_name)
+            chain_holder.compile_templates()
         except Exception as e:
             message = e.message or str(e)
             LOG.exception('Failed to instantiate ActionChain.')
             raise runnerexceptions.ActionRunnerPreRunError(message)
 
-        # Runner attributes are set lazily. So these steps
-        # should happen outside the constructor.
-        if getattr(self, 'liveaction', None):
-            self._chain_notify = getattr(self.liveaction, 'notify', None)
-        if self.runner_parameters:
-            self._skip_notify_tasks = self.runner_parameters.get('skip_notify', [])
+        # Signature is retrieved before the file is read so a change which happens while the file
+        # is being read results in a reload on the next run
+        if signature:
+            _CHAIN_CACHE.set(chainspec_file, (signature, chain_holder.actionchain))
+
+        return chain_holder
 
     def run(self, action_parameters):
         result = {'tasks': []}  # holds final result we store
@@ -189,6 +270,51 @@ class ActionChainRunner(ActionRunner):
             parent_context.update(self.liveaction.context)
 
         while action_node:
+            if action_node.parallel:
+                try:
+                    succeeded = self._run_parallel_node(
+                        action_node=action_node, parent_context=parent_context,
+                        action_parameters=action_parameters, context_result=context_result,
+                        result=result)
+                except (InvalidActionReferencedException, ParameterRenderingFailedException) as e:
+                    # Some of the tasks couldn't be scheduled, abort and fail the whole chain
+                    LOG.exception('Failed to run parallel task "%s".', action_node.name)
+
+                    fail = True
+                    top_level_error = {
+                        'error': 'Failed to run task "%s": %s' % (action_node.name, str(e)),
+                        'traceback': traceback.format_exc(10)
+                    }
+                    break
+
+                if self.liveaction_id:
+                    self._stopped = action_service.is_action_canceled_or_canceling(
+                        self.liveaction_id)
+
+                if self._stopped:
+                    LOG.info('Chain execution (%s) canceled by user.', self.liveaction_id)
+                    status = LIVEACTION_STATUS_CANCELED
+                    return (status, result, None)
+
+                fail = not succeeded
+                condition = 'on-success' if succeeded else 'on-failure'
+
+                try:
+                    action_node = self.chain_holder.get_next_node(action_node.name,
+                                                                  condition=condition)
+                except Exception as e:
+                    LOG.exception('Failed to get next node "%s".', action_node.name)
+
+                    fail = True
+                    top_level_error = {
+                        'error': ('Failed to get next node "%s". Lookup failed: %s' %
+                                  (action_node.name, str(e))),
+                        'traceback': traceback.format_exc(10)
+                    }
+                    break
+
+                continue
+
             fail = False
             error = None
             liveaction = None
@@ -305,6 +431,84 @@ class ActionChainRunner(ActionRunner):
 
         return (status, result, None)
 
+    def _run_parallel_node(self, action_node, parent_context, action_parameters,
+                           context_result, result):
+        """
+        Run the nodes referenced by the parallel node concurrently and wait for all of them to
+        complete.
+
+        Parameters of all the nodes are rendered before any of them runs so they can only refer
+        to the results of the nodes which ran before the parallel node. Once all the nodes have
+        completed, results are recorded and variables are published in the order in which the
+        nodes are listed, so the outcome doesn't depend on the order in which they complete.
+
+        :return: True if the parallel node succeeded according to its join semantics.
+        :rtype: ``bool``
+        """
+        branches = [self.chain_holder.get_node(name, raise_on_failure=True)
+                    for name in action_node.parallel]
+
+        liveactions = []
+        for branch in branches:
+            liveactions.append(self._get_next_action(
+                action_node=branch, parent_context=parent_context,
+                action_params=action_parameters, context_result=context_result))
+
+        pool = eventlet.GreenPool(len(branches))
+        outcomes = list(pool.imap(self._run_branch, branches, liveactions))
+
+        for branch, (liveaction, error, _, _) in zip(branches, outcomes):
+            context_result[branch.name] = error if error else liveaction.result
+
+        succeeded = 0
+
+        for branch, (liveaction, error, created_at, updated_at) in zip(branches, outcomes):
+            if not error:
+                rendered_publish_vars = ActionChainRunner._render_publish_vars(
+                    action_node=branch, action_parameters=action_parameters,
+                    execution_result=liveaction.result, previous_execution_results=context_result,
+                    chain_vars=self.chain_holder.vars)
+
+                if rendered_publish_vars:
+                    self.chain_holder.vars.update(rendered_publish_vars)
+
+                if liveaction.status == LIVEACTION_STATUS_SUCCEEDED:
+                    succeeded += 1
+
+            format_kwargs = {'action_node': branch, 'liveaction_db': liveaction,
+                             'created_at': created_at, 'updated_at': updated_at}
+
+            if error:
+                format_kwargs['error'] = error
+
+            result['tasks'].append(self._format_action_exec_result(**format_kwargs))
+
+        LOG.debug('%s out of %s tasks of parallel task "%s" succeeded.', succeeded,
+                  len(branches), action_node.name)
+
+        if action_node.join == JOIN_ANY:
+            return succeeded > 0
+
+        return succeeded == len(branches)
+
+    def _run_branch(self, action_node, liveaction):
+        created_at = date_utils.get_datetime_utc_now()
+        error = None
+
+        try:
+            liveaction = self._run_action(liveaction)
+        except Exception as e:
+            LOG.exception('Failure in running action "%s".', action_node.name)
+
+            error = {
+                'error': 'Task "%s" failed: %s' % (action_node.name, str(e)),
+                'traceback': traceback.format_exc(10)
+            }
+
+        updated_at = date_utils.get_datetime_utc_now()
+
+        return liveaction, error, created_at, updated_at
+
     @staticmethod
     def _render_publish_vars(action_node, action_parameters, execution_result,
                              previous_execution_results, chain_vars):
@@ -324,7 +528,7 @@ class ActionChainRunner(ActionRunner):
         context.update(previous_execution_results)
         context.update(chain_vars)
         context.update({RESULTS_KEY: previous_execution_results})
-        context.update({SYSTEM_KV_PREFIX: KeyValueLookup()})
+        context.update({SYSTEM_KV_PREFIX: get_key_value_lookup(action_node.publish)})
         rendered_result = jinja_utils.render_values(mapping=action_node.publish, context=context)
         return rendered_result
 
@@ -336,7 +540,7 @@ class ActionChainRunner(ActionRunner):
         context.update(results)
         context.update(chain_vars)
         context.update({RESULTS_KEY: results})
-        context.update({SYSTEM_KV_PREFIX: KeyValueLookup()})
+        context.update({SYSTEM_KV_PREFIX: get_key_value_lookup(action_node.params)})
         context.update({ACTION_KV_PREFIX: chain_context})
         try:
             rendered_params = jinja_utils.render_values(mapping=action_node.params,
@@ -378,11 +582,10 @@ class ActionChainRunner(ActionRunner):
             LOG.exception('Failed to schedule liveaction.')
             raise e
 
-        while (wait_for_completion and
-               liveaction.status != LIVEACTION_STATUS_SUCCEEDED and
-               liveaction.status != LIVEACTION_STATUS_FAILED):
-            eventlet.sleep(1)
-            liveaction = action_db_util.get_liveaction_by_id(liveaction.id)
+        states = [LIVEACTION_STATUS_SUCCEEDED, LIVEACTION_STATUS_FAILED]
+
+        if wait_for_completion and liveaction.status not in states:
+            liveaction = liveaction_watcher.wait_for_completion(liveaction.id, states=states)
 
         return liveaction
 
@@ -451,5 +654,27 @@ class ActionChainRunner(ActionRunner):
         return result
 
 
+def clear_chain_cache():
+    """
+    Remove all the parsed chain definitions from cache.
+    """
+    _CHAIN_CACHE.clear()
+
+
+def _get_file_signature(file_path):
+    """
+    Return a signature which changes when the provided file is modified or replaced or None if
+    the file can't be accessed.
+
+    :rtype: ``tuple``
+    """
+    try:
+        stat = os.stat(file_path)
+    except (OSError, TypeError):
+        return None
+
+    return (stat.st_mtime, stat.st_size, stat.st_ino)
+
+
 def get_runner():
     return ActionChainRunner(str(uuid.uuid4()))
@@ -18,12 +18,13 @@ import json
 
 import six
 
-from jinja2 import Template, Environment, StrictUndefined, meta, exceptions
+from jinja2 import exceptions
 from st2common import log as logging
 from st2common.constants.action import ACTION_KV_PREFIX
 from st2common.constants.system import SYSTEM_KV_PREFIX
 from st2common.exceptions import actionrunner
-from st2common.services.keyvalues import KeyValueLookup
+from st2common.services.keyvalues import get_key_value_lookup
+from st2common.util import jinja as jinja_utils
 from st2common.util.casts import get_cast
 from st2common.util.compat import to_unicode
 
@@ -120,7 +121,11 @@ def get_resolved_params(runnertype_parameter_info, action_parameter_info, action
 
 def _is_template(template_str):
     template_str = to_unicode(template_str)
-    template = Template(template_str)
+
+    if not jinja_utils.is_template(template_str):
+        return False
+
+    template = jinja_utils.get_template(template_str, allow_undefined=True)
     try:
         return template_str != template.render({})
     except exceptions.UndefinedError:
@@ -195,11 +200,9 @@ def _validate_dependencies(renderable_params, context):
     In this example 'a' requires 'b' for template rendering and vice-versa. There is no way for
     these templates to be rendered and will be flagged with an ActionRunnerException.
     '''
-    env = Environment(undefined=StrictUndefined)
     dependencies = {}
     for k, v in six.iteritems(renderable_params):
-        template_ast = env.parse(v)
-        dependencies[k] = meta.find_undeclared_variables(template_ast)
+        dependencies[k] = jinja_utils.get_undeclared_variables(v)
 
     for k, v in six.iteritems(dependencies):
         if not _check_availability(k, v, renderable_params, context):
@@ -220,7 +223,6 @@ def _do_render_params(renderable_params, context):
     if not renderable_params:
         return renderable_params
     _validate_dependencies(renderable_params, context)
-    env = Environment(undefined=StrictUndefined)
     rendered_params = {}
     rendered_params.update(context)
 
@@ -237,7 +239,7 @@ def _do_render_params(renderable_params, context):
     while len(renderable_params) != 0:
         renderable_params_pre_loop = renderable_params.copy()
         for k, v in six.iteritems(renderable_params):
-            template = env.from_string(v)
+            template = jinja_utils.get_template(v)
 
             try:
                 rendered = template.render(rendered_params)
@@ -304,7 +306,9 @@ def get_rendered_params(runner_parameters, action_parameters, action_context,
     # parameter category references are also rendered correctly. Particularly in the cases where
     # a runner parameter is overridden in an action it is likely that a runner parameter could
     # depend on an action parameter.
-    render_context = {SYSTEM_KV_PREFIX: KeyValueLookup()}
+    # Datastore keys referenced in the parameters are retrieved using a single query
+    kv_lookup = get_key_value_lookup([runner_parameters, action_parameters])
+    render_context = {SYSTEM_KV_PREFIX: kv_lookup}
     render_context[ACTION_KV_PREFIX] = action_context
     renderable_params, context = _renderable_context_param_split(action_parameters,
                                                                  runner_parameters,
@@ -43,6 +43,7 @@ ACTIONRUNNER_CANCEL_Q = liveaction.get_status_management_queue(
 
 class ActionExecutionDispatcher(consumers.MessageHandler):
     message_type = LiveActionDB
+    config_group = 'actionrunner'
 
     def __init__(self, connection, queues):
         super(ActionExecutionDispatcher, self).__init__(connection, queues)
@@ -84,6 +85,14 @@ class ActionExecutionDispatcher(consumers.MessageHandler):
             LOG.exception('Failed to find liveaction %s in the database.', liveaction.id)
             raise
 
+        # Message might be stale (e.g. re-delivered after the action has already been dispatched)
+        # so make sure the action isn't dispatched again
+        if liveaction_db.status != liveaction.status:
+            LOG.info('%s is not dispatching %s (id=%s) with "%s" status since it has "%s" status '
+                     'in the database.', self.__class__.__name__, type(liveaction), liveaction.id,
+                     liveaction.status, liveaction_db.status)
+            return
+
         return (self._run_action(liveaction_db)
                 if liveaction.status == action_constants.LIVEACTION_STATUS_SCHEDULED
                 else self._cancel_action(liveaction_db))
@@ -28,6 +28,7 @@ from st2common.models.system.common import ResourceReference
 from st2common.persistence.keyvalue import KeyValuePair
 from st2common.persistence.runner import RunnerType
 from st2common.services import action as action_service
+from st2common.services import liveaction_watcher
 from st2common.util import action_db as action_db_util
 from st2tests import DbTestCase
 from st2tests.fixturesloader import FixturesLoader
@@ -88,6 +89,8 @@ CHAIN_WITH_PUBLISH = FixturesLoader().get_fixture_file_path_abs(
     FIXTURES_PACK, 'actionchains', 'chain_with_publish.yaml')
 CHAIN_WITH_INVALID_ACTION = FixturesLoader().get_fixture_file_path_abs(
     FIXTURES_PACK, 'actionchains', 'chain_with_invalid_action.yaml')
+CHAIN_PARALLEL = FixturesLoader().get_fixture_file_path_abs(
+    FIXTURES_PACK, 'actionchains', 'chain_parallel.yaml')
 
 CHAIN_NOTIFY_API = {'notify': {'on-complete': {'message': 'foo happened.'}}}
 CHAIN_NOTIFY_DB = NotificationsHelper.to_model(CHAIN_NOTIFY_API)
@@ -170,7 +173,7 @@ class TestActionChainRunner(DbTestCase):
         # based on the chain the callcount is known to be 2.
         self.assertEqual(request.call_count, 2)
 
-    @mock.patch('eventlet.sleep', mock.MagicMock())
+    @mock.patch.object(liveaction_watcher.LiveActionCompletionWatcher, 'start', mock.MagicMock())
     @mock.patch.object(action_db_util, 'get_liveaction_by_id', mock.MagicMock(
         return_value=DummyActionExecution()))
     @mock.patch.object(action_db_util, 'get_action_by_ref',
@@ -543,6 +546,103 @@ class TestActionChainRunner(DbTestCase):
         self.assertTrue(expected_error in output['error'])
         self.assertTrue('Traceback' in output['traceback'], output['traceback'])
 
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_2))
+    @mock.patch.object(action_service, 'request',
+                       return_value=(DummyActionExecution(result={'raw_out': 'published'}), None))
+    def test_chain_runner_parallel(self, request):
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_PARALLEL
+        chain_runner.action = ACTION_2
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, output, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(request.call_count, 4)
+        self.assertEqual([task['name'] for task in output['tasks']], ['c1', 'c2', 'c3', 'c4'])
+
+        # Variables are published in the order in which the parallel tasks are listed
+        mock_args, _ = request.call_args
+        self.assertEqual(mock_args[0].parameters['strtype'], 'c3 published c2')
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_2))
+    @mock.patch.object(action_service, 'request')
+    def test_chain_runner_parallel_join(self, request):
+        def mock_request(liveaction):
+            if liveaction.parameters['strtype'] == 'c2':
+                return (DummyActionExecution(status=LIVEACTION_STATUS_FAILED), None)
+            return (DummyActionExecution(), None)
+
+        request.side_effect = mock_request
+
+        # By default all the parallel tasks need to succeed
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_PARALLEL
+        chain_runner.action = ACTION_2
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, output, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_FAILED)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual([task['state'] for task in output['tasks']],
+                         [LIVEACTION_STATUS_SUCCEEDED, LIVEACTION_STATUS_FAILED,
+                          LIVEACTION_STATUS_SUCCEEDED])
+
+        # With "any" a single successful task is enough
+        request.reset_mock()
+        chain_runner.pre_run()
+        with mock.patch.object(chain_runner.chain_holder.get_node('p1'), 'join', acr.JOIN_ANY):
+            status, output, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(request.call_count, 4)
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
+    def test_chain_is_cached(self, request):
+        acr.clear_chain_cache()
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_1_PATH
+        chain_runner.action = ACTION_1
+        chain_runner.container_service = RunnerContainerService()
+
+        with mock.patch.object(chain_runner._meta_loader, 'load',
+                               wraps=chain_runner._meta_loader.load) as load:
+            chain_runner.pre_run()
+            actionchain = chain_runner.chain_holder.actionchain
+            chain_runner.pre_run()
+            self.assertEqual(load.call_count, 1)
+            self.assertIs(chain_runner.chain_holder.actionchain, actionchain)
+
+            # Chain is re-read once the definition file changes
+            with mock.patch.object(acr, '_get_file_signature', mock.MagicMock(return_value=(1,))):
+                chain_runner.pre_run()
+            self.assertEqual(load.call_count, 2)
+            self.assertIsNot(chain_runner.chain_holder.actionchain, actionchain)
+
+        status, _, _ = chain_runner.run({})
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(request.call_count, 3)
+
+    def test_chain_parallel_invalid_nodes(self):
+        chainspec = {'chain': [{'name': 'p1', 'parallel': ['c1']}]}
+        self.assertRaisesRegexp(Exception, 'Unable to find node with name "c1"',
+                                acr.ChainHolder, chainspec, 'chain')
+
+        chainspec = {'chain': [{'name': 'p1', 'parallel': ['p2']},
+                               {'name': 'p2', 'parallel': ['c1']},
+                               {'name': 'c1', 'ref': 'wolfpack.a2'}]}
+        self.assertRaisesRegexp(Exception, 'can\'t reference another parallel node',
+                                acr.ChainHolder, chainspec, 'chain')
+
+        chainspec = {'chain': [{'name': 'c1'}]}
+        self.assertRaisesRegexp(Exception, 'needs to specify either ref or parallel',
+                                acr.ChainHolder, chainspec, 'chain')
+
     @classmethod
     def tearDownClass(cls):
         FixturesLoader().delete_models_from_db(MODELS)
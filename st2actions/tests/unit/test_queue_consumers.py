@@ -83,6 +83,31 @@ class QueueConsumerTest(DbTestCase):
         self.assertEqual(dispatched_live_action_db.status,
                          action_constants.LIVEACTION_STATUS_FAILED)
 
+    @mock.patch.object(RunnerContainer, 'dispatch', mock.MagicMock(side_effect=Exception('Boom!')))
+    def test_execute_failure_is_not_redelivered(self):
+        live_action_db = self._get_execution_db_model(
+            status=action_constants.LIVEACTION_STATUS_REQUESTED)
+
+        self.scheduler._queue_consumer._process_message(live_action_db)
+        scheduled_live_action_db = action_db.get_liveaction_by_id(live_action_db.id)
+
+        # Failed message is rejected without re-queueing so the action doesn't run again
+        channel = mock.Mock()
+        channel.no_ack_consumers = None
+        message = Message(channel=channel, body='', delivery_tag=1,
+                          delivery_info={'redelivered': False})
+        self.dispatcher._queue_consumer._process_message_and_ack(scheduled_live_action_db, message)
+        channel.basic_reject.assert_called_once_with(1, requeue=False)
+        self.assertEqual(RunnerContainer.dispatch.call_count, 1)
+
+        dispatched_live_action_db = action_db.get_liveaction_by_id(live_action_db.id)
+        self.assertEqual(dispatched_live_action_db.status,
+                         action_constants.LIVEACTION_STATUS_FAILED)
+
+        # Stale message with the "scheduled" status is ignored
+        self.dispatcher._queue_consumer._process_message(scheduled_live_action_db)
+        self.assertEqual(RunnerContainer.dispatch.call_count, 1)
+
     @mock.patch.object(RunnerContainer, 'dispatch', mock.MagicMock(return_value=None))
     def test_execute_no_result(self):
         live_action_db = self._get_execution_db_model(
@@ -27,6 +27,7 @@ from st2common.util.wsgi import shutdown_server_kill_pending_requests
 from st2common.triggers import register_internal_trigger_types
 from st2api.signal_handlers import register_api_signal_handlers
 from st2api.listener import get_listener_if_set
+from st2api.execution_filters import get_store_if_set
 from st2api import config
 from st2api import app
 
@@ -93,6 +94,11 @@ def main():
 
         if listener:
             listener.shutdown()
+
+        store = get_store_if_set()
+
+        if store:
+            store.shutdown()
     except Exception:
         LOG.exception('(PID=%s) ST2 API quit due to exception.', os.getpid())
         return 1
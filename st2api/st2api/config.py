@@ -54,7 +54,26 @@ def _register_app_opts():
         cfg.IntOpt('heartbeat', default=25,
                    help='Send empty message every N seconds to keep connection open'),
         cfg.BoolOpt('mask_secrets', default=True,
-                    help='True to mask secrets in API responses')
+                    help='True to mask secrets in API responses'),
+        cfg.IntOpt('stream_queue_size', default=1000,
+                   help='Maximum number of events buffered for each stream client'),
+        cfg.StrOpt('stream_overflow_policy', default='drop_oldest',
+                   choices=['drop_oldest', 'coalesce', 'disconnect'],
+                   help='What to do when the stream client buffer is full (drop_oldest, '
+                        'coalesce, disconnect)'),
+        cfg.IntOpt('stream_replay_buffer_size', default=1000,
+                   help='Number of most recent events kept in memory so stream clients can '
+                        'resume using Last-Event-ID. 0 disables resuming.'),
+        cfg.IntOpt('stream_replay_idle_timeout', default=60,
+                   help='How long (in seconds) events are still kept for resuming after the '
+                        'last stream client disconnects. Events are not processed at all when '
+                        'no client is connected for longer than that, but a client which '
+                        'reconnects later can\'t resume and needs to retrieve the current '
+                        'state.'),
+        cfg.IntOpt('execution_filters_refresh_interval', default=600,
+                   help='How often (in seconds) to reconcile execution filter values which are '
+                        'kept in memory with the database. 0 disables keeping the values in '
+                        'memory.')
     ]
     CONF.register_opts(api_opts, group='api')
 
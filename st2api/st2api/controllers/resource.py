@@ -16,8 +16,13 @@
 # pylint: disable=no-member
 
 import abc
+import base64
 import copy
+import datetime
+import json
+import operator
 
+from mongoengine import Q
 from mongoengine import ValidationError
 import pecan
 from pecan import rest
@@ -29,6 +34,7 @@ from st2common import log as logging
 from st2common.models.system.common import InvalidResourceReferenceError
 from st2common.models.system.common import ResourceReference
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
+from st2common.util import isotime
 
 LOG = logging.getLogger(__name__)
 
@@ -38,6 +44,13 @@ RESERVED_QUERY_PARAMS = {
     'sort': 'order_by'
 }
 
+# Supported values for the "count" query parameter
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATED = 'estimated'
+COUNT_NONE = 'none'
+
+COUNT_TYPES = [COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE]
+
 
 @six.add_metaclass(abc.ABCMeta)
 class ResourceController(rest.RestController):
@@ -74,11 +87,29 @@ class ResourceController(rest.RestController):
     def get_one(self, id):
         return self._get_one_by_id(id=id)
 
-    def _get_all(self, exclude_fields=None, sort=None, offset=0, limit=None, query_options=None,
-                 **kwargs):
+    def _get_all(self, exclude_fields=None, include_fields=None, sort=None, offset=0, limit=None,
+                 query_options=None, cursor=None, count=None, from_model_func=None, **kwargs):
         """
         :param exclude_fields: A list of object fields to exclude.
         :type exclude_fields: ``list``
+
+        :param include_fields: A list of object fields to include. If provided, only those fields
+                               are retrieved from the database and returned. Nested fields can be
+                               specified using dot notation.
+        :type include_fields: ``list``
+
+        :param cursor: Opaque cursor returned in the X-Next-Cursor header of the previous page.
+                       Using a cursor instead of an offset means the database doesn't need to
+                       skip over all the results of the previous pages.
+        :type cursor: ``str``
+
+        :param count: How to calculate the X-Total-Count header (exact, estimated, none).
+                      Defaults to "none" when a cursor is used and "exact" otherwise.
+        :type count: ``str``
+
+        :param from_model_func: Function used to convert DB objects into the response objects.
+                                Defaults to the "from_model" method of the API model class.
+        :type from_model_func: ``callable``
         """
         kwargs = copy.deepcopy(kwargs)
 
@@ -108,11 +139,19 @@ class ResourceController(rest.RestController):
             db_sort_values.append(sort_value)
 
         default_sort_values = copy.copy(query_options.get('sort'))
-        kwargs['sort'] = db_sort_values if db_sort_values else default_sort_values
+        db_sort_values = db_sort_values if db_sort_values else default_sort_values
+        db_sort_values = _add_sort_tie_breaker(db_sort_values)
+        kwargs['sort'] = db_sort_values
 
         # TODO: To protect us from DoS, we need to make max_limit mandatory
         offset = int(offset)
 
+        count = count or (COUNT_NONE if cursor else COUNT_EXACT)
+
+        if count not in COUNT_TYPES:
+            msg = 'Invalid count type "%s". Valid types are: %s' % (count, ', '.join(COUNT_TYPES))
+            pecan.abort(http_client.BAD_REQUEST, msg)
+
         if limit and int(limit) > self.max_limit:
             limit = self.max_limit
         eop = offset + int(limit) if limit else None
@@ -139,24 +178,105 @@ class ResourceController(rest.RestController):
         }
         LOG.info('GET all %s with filters=%s' % (pecan.request.path, filters), extra=extra)
 
-        instances = self.access.query(exclude_fields=exclude_fields, **filters)
+        if cursor:
+            cursor_query = self._get_cursor_query(cursor=cursor, sort=db_sort_values,
+                                                  offset=offset, filters=filters)
+
+        if include_fields:
+            only_fields = self._get_only_fields(include_fields=include_fields,
+                                                sort=db_sort_values)
+        else:
+            only_fields = None
+
+        instances = self.access.query(exclude_fields=exclude_fields, only_fields=only_fields,
+                                      **filters)
         if limit == 1:
             # Perform the filtering on the DB side
             instances = instances.limit(limit)
 
         if limit:
             pecan.response.headers['X-Limit'] = str(limit)
-        pecan.response.headers['X-Total-Count'] = str(instances.count())
+
+        if count == COUNT_EXACT:
+            pecan.response.headers['X-Total-Count'] = str(instances.count())
+        elif count == COUNT_ESTIMATED:
+            # Counting all the documents which match a filter can't be estimated
+            total_count = instances.count() if filters else self.access.estimated_count()
+            pecan.response.headers['X-Total-Count'] = str(total_count)
+
+        if cursor:
+            instances = instances.filter(cursor_query)
 
         from_model_kwargs = self._get_from_model_kwargs_for_request(request=pecan.request)
+        from_model_func = from_model_func or self.model.from_model
 
         result = []
+        instance = None
         for instance in instances[offset:eop]:
-            item = self.model.from_model(instance, **from_model_kwargs)
+            item = from_model_func(instance, **from_model_kwargs)
+
+            if include_fields:
+                item = _filter_attributes(item=item, include_fields=include_fields)
+
             result.append(item)
 
+        if limit and len(result) == int(limit):
+            next_cursor = _encode_cursor(instance=instance, sort=db_sort_values)
+            pecan.response.headers['X-Next-Cursor'] = next_cursor
+
         return result
 
+    def _get_only_fields(self, include_fields, sort):
+        """
+        Return a list of fields which need to be retrieved from the database for the provided
+        list of included fields.
+
+        Fields which are needed to create the next page cursor are always retrieved.
+        """
+        properties = self.model.schema.get('properties', {})
+
+        for field in include_fields:
+            if field.split('.')[0] not in properties:
+                msg = 'Invalid or unsupported attribute specified: %s' % (field)
+                pecan.abort(http_client.BAD_REQUEST, msg)
+
+        only_fields = list(include_fields)
+
+        for sort_value in sort:
+            field = _parse_sort_value(sort_value)[0]
+            parts = field.split('.')
+
+            # Skip fields which are already retrieved as part of a parent field
+            prefixes = ['.'.join(parts[:index]) for index in range(1, len(parts) + 1)]
+            if not any(prefix in only_fields for prefix in prefixes):
+                only_fields.append(field)
+
+        return only_fields
+
+    def _get_cursor_query(self, cursor, sort, offset, filters):
+        """
+        Return a query which matches all the objects which follow the object the cursor points to.
+        """
+        if offset:
+            pecan.abort(http_client.BAD_REQUEST, 'Cursor and offset can\'t be used together')
+
+        for value in six.itervalues(filters):
+            if isinstance(value, six.string_types) and '..' in value:
+                # Range filters change the sort order on the DB side
+                msg = 'Cursor can\'t be used together with a range filter'
+                pecan.abort(http_client.BAD_REQUEST, msg)
+
+        try:
+            cursor_sort, cursor_values = _decode_cursor(cursor=cursor)
+        except Exception:
+            pecan.abort(http_client.BAD_REQUEST, 'Invalid cursor "%s"' % (cursor))
+
+        if cursor_sort != sort:
+            msg = 'Cursor was created for a different sort order (%s)' % (','.join(cursor_sort))
+            pecan.abort(http_client.BAD_REQUEST, msg)
+
+        return _get_keyset_query(sort=sort, values=cursor_values)
+
     def _get_one(self, id, exclude_fields=None):
         # Note: This is here for backward compatibility reasons
         return self._get_one_by_id(id=id, exclude_fields=exclude_fields)
@@ -240,6 +360,153 @@ class ResourceController(rest.RestController):
         return self.from_model_kwargs
 
 
+def _parse_sort_value(sort_value):
+    """
+    Split sort value (e.g. -start_timestamp) into a field name and a direction.
+
+    :rtype: ``tuple``
+    """
+    if sort_value.startswith('-'):
+        return sort_value[1:], -1
+    elif sort_value.startswith('+'):
+        return sort_value[1:], 1
+
+    return sort_value, 1
+
+
+def _add_sort_tie_breaker(sort):
+    """
+    Add id to the sort values so the order is always deterministic which is required for the
+    cursor pagination to work.
+    """
+    fields = [_parse_sort_value(sort_value)[0] for sort_value in sort]
+
+    if 'id' in fields:
+        return sort
+
+    direction = _parse_sort_value(sort[-1])[1] if sort else 1
+    return sort + ['-id' if direction == -1 else '+id']
+
+
+def _filter_attributes(item, include_fields):
+    """
+    Remove all the attributes which are not included from the provided API object.
+
+    Note: Nested fields (e.g. action.ref) are retrieved from the database on their own so the
+    top level attribute only contains the included nested fields.
+    """
+    attributes = set(field.split('.')[0] for field in include_fields)
+
+    for attribute in list(vars(item).keys()):
+        if attribute != 'id' and attribute not in attributes:
+            delattr(item, attribute)
+
+    return item
+
+
+def _get_field_value(instance, field):
+    value = instance
+
+    for part in field.split('.'):
+        if isinstance(value, dict):
+            value = value.get(part, None)
+        else:
+            value = getattr(value, part, None)
+
+        if value is None:
+            break
+
+    return value
+
+
+def _encode_cursor_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'$date': isotime.format(value, offset=False)}
+    elif value is not None and not isinstance(value, (six.string_types, int, float, bool)):
+        # ObjectId and similar
+        return str(value)
+
+    return value
+
+
+def _decode_cursor_value(value):
+    if isinstance(value, dict) and '$date' in value:
+        return isotime.parse(value['$date'])
+
+    return value
+
+
+def _encode_cursor(instance, sort):
+    """
+    Return an opaque cursor which points to the provided object.
+
+    :rtype: ``str``
+    """
+    values = []
+
+    for sort_value in sort:
+        field, _ = _parse_sort_value(sort_value)
+        values.append(_encode_cursor_value(_get_field_value(instance=instance, field=field)))
+
+    data = {'sort': sort, 'values': values}
+    return base64.urlsafe_b64encode(json.dumps(data))
+
+
+def _decode_cursor(cursor):
+    """
+    :return: Tuple of (sort, values).
+    :rtype: ``tuple``
+    """
+    data = json.loads(base64.urlsafe_b64decode(str(cursor)))
+    values = [_decode_cursor_value(value) for value in data['values']]
+
+    if len(values) != len(data['sort']):
+        raise ValueError('Number of values doesn\'t match the sort order')
+
+    return data['sort'], values
+
+
+def _get_keyset_query(sort, values):
+    """
+    Return a query which matches all the objects which come after the object with the provided
+    sort values.
+
+    For sort (a, b) and values (x, y) this results in: a > x OR (a == x AND b > y).
+
+    Nulls come first in the ascending and last in the descending order so for a descending sort
+    key with a non-null value, objects with a null value also come after the object.
+
+    :rtype: :class:`mongoengine.Q`
+    """
+    clauses = []
+    equals = {}
+
+    for sort_value, value in zip(sort, values):
+        field, direction = _parse_sort_value(sort_value)
+        field = '__'.join(field.split('.'))
+
+        if value is None:
+            # Nulls come first in the ascending order
+            clause = {'%s__ne' % (field): None} if direction == 1 else None
+        else:
+            operator_name = 'gt' if direction == 1 else 'lt'
+            clause = {'%s__%s' % (field, operator_name): value}
+
+        if clause is not None:
+            clause.update(equals)
+            clauses.append(Q(**clause))
+
+        if value is not None and direction == -1:
+            # Nulls come last in the descending order
+            clause = {field: None}
+            clause.update(equals)
+            clauses.append(Q(**clause))
+
+        equals[field] = value
+
+    return reduce(operator.or_, clauses) if clauses else Q(id=None)
+
+
 class ContentPackResourceController(ResourceController):
     include_reference = False
 
@@ -63,6 +63,9 @@ SUPPORTED_EXECUTIONS_FILTERS.update({
 # responses
 SHOW_SECRETS_QUERY_PARAM = 'show_secrets'
 
+# Name of the view which returns a compact representation of the executions
+SUMMARY_VIEW = 'summary'
+
 MONITOR_THREAD_EMPTY_Q_SLEEP_TIME = 5
 MONITOR_THREAD_NO_WORKERS_SLEEP_TIME = 1
 
@@ -159,7 +162,7 @@ class ActionExecutionsControllerMixin(BaseRestControllerMixin):
         action_exec_db = self.access.impl.model.objects.filter(id=id).only(*fields).get()
         return action_exec_db.result
 
-    def _get_children(self, id_, depth=-1, result_fmt=None):
+    def _get_children(self, id_, depth=-1, result_fmt=None, exclude_fields=None):
         # make sure depth is int. Url encoding will make it a string and needs to
         # be converted back in that case.
         depth = int(depth)
@@ -167,7 +170,8 @@ class ActionExecutionsControllerMixin(BaseRestControllerMixin):
         LOG.debug('retrieving children for id: %s with depth: %s', id_, depth)
         descendants = execution_service.get_descendants(actionexecution_id=id_,
                                                         descendant_depth=depth,
-                                                        result_fmt=result_fmt)
+                                                        result_fmt=result_fmt,
+                                                        exclude_fields=exclude_fields)
 
         return [self.model.from_model(descendant, from_model_kwargs) for
                 descendant in descendants]
@@ -190,13 +194,26 @@ class ActionExecutionsControllerMixin(BaseRestControllerMixin):
 class ActionExecutionChildrenController(ActionExecutionsControllerMixin):
     @request_user_has_permission(permission_type=PermissionType.EXECUTION_VIEW)
     @jsexpose(arg_types=[str])
-    def get(self, id, **kwargs):
+    def get(self, id, exclude_attributes=None, **kwargs):
         """
         Retrieve children for the provided action execution.
 
+        Handles requests:
+            GET /actionexecutions/<id>/children[?depth=1&exclude_attributes=result]
+
+        :param exclude_attributes: Comma delimited string of attributes to exclude from the object.
+        :type exclude_attributes: ``str``
+
         :rtype: ``list``
         """
-        return self._get_children(id_=id, **kwargs)
+        if exclude_attributes:
+            exclude_fields = exclude_attributes.split(',')
+        else:
+            exclude_fields = None
+
+        exclude_fields = self._validate_exclude_fields(exclude_fields=exclude_fields)
+
+        return self._get_children(id_=id, exclude_fields=exclude_fields, **kwargs)
 
 
 class ActionExecutionAttributeController(ActionExecutionsControllerMixin):
@@ -287,15 +304,25 @@ class ActionExecutionsController(ActionExecutionsControllerMixin, ResourceContro
 
     @request_user_has_permission(permission_type=PermissionType.EXECUTION_VIEW)
     @jsexpose()
-    def get_all(self, exclude_attributes=None, **kw):
+    def get_all(self, exclude_attributes=None, include_attributes=None, view=None, **kw):
         """
         List all actionexecutions.
 
         Handles requests:
             GET /actionexecutions[?exclude_attributes=result,trigger_instance]
+            GET /actionexecutions[?include_attributes=id,action.ref,status]
+            GET /actionexecutions[?view=summary]
 
         :param exclude_attributes: Comma delimited string of attributes to exclude from the object.
         :type exclude_attributes: ``str``
+
+        :param include_attributes: Comma delimited string of attributes to include in the object.
+                                   Nested attributes can be specified using dot notation.
+        :type include_attributes: ``str``
+
+        :param view: Use "summary" to only return a compact representation with the attributes
+                     needed to display a list of executions.
+        :type view: ``str``
         """
         if exclude_attributes:
             exclude_fields = exclude_attributes.split(',')
@@ -304,6 +331,15 @@ class ActionExecutionsController(ActionExecutionsControllerMixin, ResourceContro
 
         exclude_fields = self._validate_exclude_fields(exclude_fields=exclude_fields)
 
+        if include_attributes:
+            kw['include_fields'] = include_attributes.split(',')
+
+        if view == SUMMARY_VIEW:
+            kw['include_fields'] = self.model.SUMMARY_ATTRIBUTES
+            kw['from_model_func'] = self.model.summary_from_model
+        elif view:
+            abort(http_client.BAD_REQUEST, 'Invalid view "%s"' % (view))
+
         # Use a custom sort order when filtering on a timestamp so we return a correct result as
         # expected by the user
         if 'timestamp_lt' in kw:
@@ -386,6 +422,17 @@ class ActionExecutionsController(ActionExecutionsControllerMixin, ResourceContro
     def options(self, *args, **kw):
         return
 
+    def _get_only_fields(self, include_fields, sort):
+        only_fields = super(ActionExecutionsController, self)._get_only_fields(
+            include_fields=include_fields, sort=sort)
+
+        # Action and runner parameter definitions are needed to mask secret parameters
+        if 'parameters' in only_fields:
+            only_fields.extend([field for field in ['action', 'runner']
+                                if field not in only_fields])
+
+        return only_fields
+
     def _get_action_executions(self, exclude_fields=None, **kw):
         """
         :param exclude_fields: A list of object fields to exclude.
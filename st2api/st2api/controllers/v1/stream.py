@@ -19,7 +19,6 @@ from pecan.rest import RestController
 
 from st2common import log as logging
 from st2common.models.api.base import jsexpose
-from st2common.util.jsonify import json_encode
 
 from st2api.listener import get_listener
 
@@ -30,22 +29,46 @@ def format(gen):
     # Yield initial state so client would receive the headers the moment it connects to the stream
     yield '\n'
 
-    message = '''event: %s\ndata: %s\n\n'''
-
-    for pack in gen:
-        if not pack:
+    for stream_event in gen:
+        if not stream_event:
             yield '\n'
         else:
-            (event, body) = pack
-            yield message % (event, json_encode(body, indent=None))
+            # Events are already serialized by the listener
+            yield stream_event.frame
+
+
+def _get_filter_values(value):
+    if not value:
+        return None
+
+    return [item.strip() for item in value.split(',') if item.strip()]
 
 
 class StreamController(RestController):
     @jsexpose(content_type='text/event-stream')
-    def get_all(self):
+    def get_all(self, **kwargs):
+        """
+        Stream events.
+
+        Handles requests:
+
+            GET /stream?events=st2.execution__update&action=core.local&status=failed
+
+        All the filters are optional and accept a comma separated list of values.
+
+        Clients which reconnect can resume the stream by passing id of the last received event
+        in the Last-Event-ID header (or last_event_id query parameter).
+        """
+        events = _get_filter_values(kwargs.get('events', None))
+        actions = _get_filter_values(kwargs.get('action', None))
+        statuses = _get_filter_values(kwargs.get('status', None))
+        last_event_id = (pecan.request.headers.get('Last-Event-ID', None) or
+                         kwargs.get('last_event_id', None))
+
         def make_response():
-            res = Response(content_type='text/event-stream',
-                           app_iter=format(get_listener().generator()))
+            gen = get_listener().generator(events=events, actions=actions, statuses=statuses,
+                                           last_event_id=last_event_id)
+            res = Response(content_type='text/event-stream', app_iter=format(gen))
             return res
 
         # Prohibit buffering response by eventlet
@@ -0,0 +1,267 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Distinct values for the execution filters which are displayed in the UI.
+
+Calculating the distinct values requires an aggregation over the whole executions collection for
+each filter. To avoid running those on every request, the values are kept in memory and updated
+incrementally using the execution CUD events. The values are periodically reconciled with the
+database to pick up the changes the events don't cover (e.g. purged executions).
+"""
+
+from itertools import chain
+
+import eventlet
+from kombu import Connection
+from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
+import six
+
+from st2common import log as logging
+from st2common.persistence.execution import ActionExecution
+from st2common.transport import execution, publishers, serializers
+from st2common.transport import utils as transport_utils
+
+__all__ = [
+    'SUPPORTED_FILTERS',
+    'IGNORE_FILTERS',
+
+    'ExecutionFiltersStore',
+
+    'get_filter_values',
+    'get_store',
+    'get_store_if_set'
+]
+
+LOG = logging.getLogger(__name__)
+
+# List of supported filters and relation between filter name and execution property it represents.
+# The same list is used both in ActionExecutionController to map filter names to properties and
+# in FiltersController to generate a list of unique values for each filter for UI so user
+# could pick a filter from a drop down.
+# If filter is unique for every execution or repeats very rarely (ex. execution id or parent
+# reference) it should be also added to IGNORE_FILTERS to avoid bloating FiltersController
+# response. Failure to do so will eventually result in Chrome hanging out while opening History
+# tab of st2web.
+SUPPORTED_FILTERS = {
+    'action': 'action.ref',
+    'status': 'status',
+    'liveaction': 'liveaction.id',
+    'parent': 'parent',
+    'rule': 'rule.name',
+    'runner': 'runner.name',
+    'timestamp': 'start_timestamp',
+    'trigger': 'trigger.name',
+    'trigger_type': 'trigger_type.name',
+    'trigger_instance': 'trigger_instance.id',
+    'user': 'liveaction.context.user'
+}
+
+# List of filters that are too broad to distinct by them and are very likely to represent 1 to 1
+# relation between filter and particular history record.
+IGNORE_FILTERS = ['parent', 'timestamp', 'liveaction', 'trigger_instance']
+
+_store = None
+
+
+class ExecutionFiltersStore(ConsumerMixin):
+    """
+    In-memory store of the distinct filter values which is kept up to date using the execution
+    CUD events.
+
+    :param refresh_interval: How often (in seconds) to reconcile values with the database.
+    :type refresh_interval: ``int``
+    """
+
+    def __init__(self, connection, refresh_interval):
+        self.connection = connection
+        self._refresh_interval = refresh_interval
+
+        # Filter name -> set of values. None means values haven't been loaded yet.
+        self._values = None
+
+        # Values received while values are being reconciled with the database. Each reconcile
+        # run collects the values in its own dictionary since the runs can overlap.
+        self._reconcile_values = []
+
+        # Makes sure concurrent requests don't all load the values from the database on first use
+        self._load_lock = eventlet.semaphore.Semaphore()
+
+        self._updates_thread = None
+        self._refresh_thread = None
+
+    def get_consumers(self, consumer, channel):
+        return [
+            consumer(queues=[execution.get_queue(routing_key=publishers.ANY_RK,
+                                                 exclusive=True)],
+                     accept=serializers.ACCEPTED_SERIALIZERS,
+                     callbacks=[self.process])
+        ]
+
+    def process(self, body, message):
+        try:
+            routing_key = message.delivery_info.get('routing_key', '')
+
+            # Status changes are published as updates
+            if routing_key in [publishers.CREATE_RK, publishers.UPDATE_RK]:
+                self.add_execution(body)
+        except Exception:
+            LOG.exception('Failed to update execution filters. Message body: %s', body)
+        finally:
+            message.ack()
+
+    def add_execution(self, execution_db):
+        """
+        Add filter values of the provided execution.
+        """
+        if self._values is None:
+            # Values will be loaded from the database on first use
+            return
+
+        # Only top level executions are displayed in the UI
+        if getattr(execution_db, 'parent', None):
+            return
+
+        for name, field in _get_filters():
+            value = _get_filter_value(execution_db=execution_db, field=field)
+
+            if not value or not isinstance(value, six.string_types):
+                continue
+
+            self._values.setdefault(name, set()).add(value)
+
+            for reconcile_values in self._reconcile_values:
+                reconcile_values.setdefault(name, set()).add(value)
+
+    def get_filters(self):
+        """
+        :return: Dictionary with filter name as a key and a list of distinct values as a value.
+        :rtype: ``dict``
+        """
+        if self._values is None:
+            with self._load_lock:
+                # Values might have been loaded while waiting for the lock
+                if self._values is None:
+                    self.reconcile()
+
+        return {name: list(values) for name, values in six.iteritems(self._values)}
+
+    def reconcile(self):
+        """
+        Replace the values with the current values from the database.
+        """
+        reconcile_values = {}
+        self._reconcile_values.append(reconcile_values)
+
+        try:
+            values = get_filter_values()
+            values = {name: set(filter_values) for name, filter_values in six.iteritems(values)}
+
+            # Include values received while the aggregations were running
+            for name, filter_values in six.iteritems(reconcile_values):
+                values.setdefault(name, set()).update(filter_values)
+        finally:
+            self._reconcile_values.remove(reconcile_values)
+
+        self._values = values
+
+    def start(self):
+        self._updates_thread = eventlet.spawn(self.run)
+        self._refresh_thread = eventlet.spawn(self._refresh)
+
+    def shutdown(self):
+        self.should_stop = True
+
+        for thread in [self._updates_thread, self._refresh_thread]:
+            if thread:
+                eventlet.kill(thread)
+
+    def _refresh(self):
+        while True:
+            eventlet.sleep(self._refresh_interval)
+
+            try:
+                self.reconcile()
+            except Exception:
+                LOG.exception('Failed to reconcile execution filters.')
+
+
+def _get_filters():
+    for name, field in six.iteritems(SUPPORTED_FILTERS):
+        if name not in IGNORE_FILTERS:
+            yield name, field
+
+
+def _get_filter_value(execution_db, field):
+    if not isinstance(field, six.string_types):
+        values = [_get_filter_value(execution_db=execution_db, field=item) for item in field]
+
+        if not all(values):
+            return None
+
+        return '.'.join(values)
+
+    path = field.split('.')
+    value = getattr(execution_db, path[0], None)
+
+    for key in path[1:]:
+        value = value.get(key, None) if isinstance(value, dict) else None
+
+    return value
+
+
+def get_filter_values():
+    """
+    Retrieve distinct values for all the filters from the database.
+
+    :rtype: ``dict``
+    """
+    filters = {}
+
+    for name, field in _get_filters():
+        if isinstance(field, six.string_types):
+            query = '$' + field
+        else:
+            dot_notation = list(chain.from_iterable(
+                ('$' + item, '.') for item in field
+            ))
+            dot_notation.pop(-1)
+            query = {'$concat': dot_notation}
+
+        aggregate = ActionExecution.aggregate([
+            {'$match': {'parent': None}},
+            {'$group': {'_id': query}}
+        ])
+
+        filters[name] = [res['_id'] for res in aggregate['result'] if res['_id']]
+
+    return filters
+
+
+def get_store():
+    global _store
+    if not _store:
+        refresh_interval = cfg.CONF.api.execution_filters_refresh_interval
+
+        with Connection(transport_utils.get_messaging_urls()) as conn:
+            _store = ExecutionFiltersStore(conn, refresh_interval=refresh_interval)
+            _store.start()
+    return _store
+
+
+def get_store_if_set():
+    global _store
+    return _store
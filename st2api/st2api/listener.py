@@ -13,6 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import time
+import uuid
+
 import eventlet
 
 from kombu import Connection, Queue
@@ -21,11 +25,17 @@ from oslo_config import cfg
 
 from st2common.models.api.action import LiveActionAPI
 from st2common.models.api.execution import ActionExecutionAPI
-from st2common.transport import liveaction, execution, publishers
+from st2common.transport import liveaction, execution, publishers, serializers
 from st2common.transport import utils as transport_utils
+from st2common.util.jsonify import json_encode
 from st2common import log as logging
 
 __all__ = [
+    'StreamEvent',
+    'StreamSubscriber',
+
+    'OVERFLOW_POLICIES',
+
     'get_listener',
     'get_listener_if_set'
 ]
@@ -39,26 +49,195 @@ QUEUE = Queue(None,
 
 _listener = None
 
+EVENT_FORMAT = 'id: %s\nevent: %s\ndata: %s\n\n'
+
+# Sent to clients which try to resume from an event which is not available anymore so they know
+# they need to retrieve the current state
+RESET_EVENT = 'st2.stream__reset'
+
+
+OVERFLOW_POLICY_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_POLICY_COALESCE = 'coalesce'
+OVERFLOW_POLICY_DISCONNECT = 'disconnect'
+
+OVERFLOW_POLICIES = [
+    OVERFLOW_POLICY_DROP_OLDEST,
+    OVERFLOW_POLICY_COALESCE,
+    OVERFLOW_POLICY_DISCONNECT
+]
+
+
+class StreamEvent(collections.namedtuple('StreamEvent', ['event', 'id', 'action', 'status',
+                                                         'frame', 'sequence'])):
+    """
+    Event which is shared between all the stream subscribers.
+
+    ``frame`` contains the already serialized event so the event is only serialized once, no
+    matter how many subscribers receive it. ``sequence`` is the position of the event in the
+    stream of this process and is used to resume the stream.
+    """
+
+    __slots__ = ()
+
+
+class StreamSubscriber(object):
+    """
+    Stream client with optional server-side event filters and a bounded event buffer.
+
+    :param events: Names of the events to receive (e.g. st2.execution__update).
+    :type events: ``list``
+
+    :param actions: References of the actions to receive events for.
+    :type actions: ``list``
+
+    :param statuses: Statuses to receive events for.
+    :type statuses: ``list``
+
+    :param max_size: Maximum number of buffered events. Defaults to the value from the config.
+    :type max_size: ``int``
+
+    :param overflow_policy: What to do when the buffer is full (drop_oldest, coalesce,
+                            disconnect). Defaults to the value from the config.
+    :type overflow_policy: ``str``
+    """
+
+    def __init__(self, events=None, actions=None, statuses=None, max_size=None,
+                 overflow_policy=None):
+        self._events = frozenset(events) if events else None
+        self._actions = frozenset(actions) if actions else None
+        self._statuses = frozenset(statuses) if statuses else None
+
+        self.max_size = max_size or cfg.CONF.api.stream_queue_size
+        self.overflow_policy = overflow_policy or cfg.CONF.api.stream_overflow_policy
+
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy "%s". Valid policies are: %s' %
+                             (self.overflow_policy, ', '.join(OVERFLOW_POLICIES)))
+
+        self.dropped = 0
+        self.disconnected = False
+
+        self._buffer = collections.deque()
+
+        # Used to wake up the waiting client when a new event is buffered
+        self._wakeup = eventlet.queue.LightQueue(maxsize=1)
+
+    def matches(self, event, action, status):
+        if self._events and event not in self._events:
+            return False
+
+        if self._actions and action not in self._actions:
+            return False
+
+        if self._statuses and status not in self._statuses:
+            return False
+
+        return True
+
+    def put(self, stream_event):
+        """
+        Buffer the provided event. This method never blocks so a slow client can't slow down
+        the listener.
+        """
+        if self.disconnected:
+            return
+
+        if len(self._buffer) >= self.max_size and not self._handle_overflow(stream_event):
+            return
+
+        self._buffer.append(stream_event)
+        self._notify()
+
+    def get(self, timeout=None):
+        """
+        Return next buffered event or None if the subscriber has been disconnected.
+
+        :raises: ``eventlet.queue.Empty`` if no event is received before the timeout.
+        """
+        while not self._buffer and not self.disconnected:
+            self._wakeup.get(timeout=timeout)
+
+        if self.disconnected:
+            return None
+
+        return self._buffer.popleft()
+
+    def qsize(self):
+        return len(self._buffer)
+
+    def _handle_overflow(self, stream_event):
+        """
+        :return: True if the new event should still be buffered.
+        :rtype: ``bool``
+        """
+        self.dropped += 1
+
+        if self.overflow_policy == OVERFLOW_POLICY_DISCONNECT:
+            LOG.info('Disconnecting slow stream client (buffered events=%s).', len(self._buffer))
+            self.disconnected = True
+            self._buffer.clear()
+            self._notify()
+            return False
+
+        if self.overflow_policy == OVERFLOW_POLICY_COALESCE and stream_event.id:
+            # Replace a pending event for the same object with the latest version. The latest
+            # version is added to the end of the buffer so the events are delivered in the
+            # sequence order and resuming from the last received event doesn't skip any event.
+            for index, buffered_event in enumerate(self._buffer):
+                if (buffered_event.id == stream_event.id and
+                        buffered_event.event == stream_event.event):
+                    del self._buffer[index]
+                    return True
+
+        self._buffer.popleft()
+        return True
+
+    def _notify(self):
+        if self._wakeup.empty():
+            self._wakeup.put_nowait(True)
+
 
 class Listener(ConsumerMixin):
 
-    def __init__(self, connection):
+    def __init__(self, connection, replay_buffer_size=None):
         self.connection = connection
-        self.queues = []
+        self.subscribers = []
         self._stopped = False
 
+        # Number of events dropped by subscribers which are already gone
+        self._dropped = 0
+
+        # Event ids are prefixed with a random stream id so ids from a different process or
+        # from before a restart are never mistaken for ids of this stream
+        self._stream_id = uuid.uuid4().hex[:8]
+        self._sequence = 0
+
+        if replay_buffer_size is None:
+            replay_buffer_size = cfg.CONF.api.stream_replay_buffer_size
+
+        # Most recent events which are replayed to the clients which reconnect
+        self._replay_buffer = collections.deque(maxlen=replay_buffer_size) \
+            if replay_buffer_size > 0 else None
+
+        # Events are only kept for replaying while clients are connected and for a while after
+        # the last one disconnects so no CPU is spent on the events nobody is interested in
+        self._last_disconnect_time = None
+
+        # True if events have been skipped since the last event has been buffered
+        self._replay_gap = False
+
     def get_consumers(self, consumer, channel):
         return [
             consumer(queues=[execution.get_queue(routing_key=publishers.ANY_RK,
                                                  exclusive=True)],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPTED_SERIALIZERS,
                      callbacks=[self.processor(ActionExecutionAPI)]),
 
             consumer(queues=[Queue(None,
                                    liveaction.LIVEACTION_XCHG,
                                    routing_key=publishers.ANY_RK,
                                    exclusive=True)],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPTED_SERIALIZERS,
                      callbacks=[self.processor(LiveActionAPI)])
         ]
 
@@ -69,32 +248,158 @@ class Listener(ConsumerMixin):
             event_name = '%s__%s' % (meta.get('exchange'), meta.get('routing_key'))
 
             try:
-                self.emit(event_name, model.from_model(body, **from_model_kwargs))
+                # Don't bother converting and serializing messages nobody is interested in
+                if self.subscribers or self._is_replay_active():
+                    self.emit(event_name, model.from_model(body, **from_model_kwargs))
+                else:
+                    self._skip_event()
             finally:
                 message.ack()
 
         return process
 
     def emit(self, event, body):
-        pack = (event, body)
-        for queue in self.queues:
-            queue.put(pack)
+        action, status = self._get_filter_attributes(body)
+        subscribers = [subscriber for subscriber in self.subscribers
+                       if subscriber.matches(event, action, status)]
 
-    def generator(self):
-        queue = eventlet.Queue()
-        self.queues.append(queue)
+        replay_active = self._is_replay_active()
+
+        if not subscribers and not replay_active:
+            self._skip_event()
+            return
+
+        self._sequence += 1
+
+        # Event is serialized once and the same immutable frame is shared by all the subscribers
+        frame = EVENT_FORMAT % (self._get_event_id(self._sequence), event,
+                                json_encode(body, indent=None))
+        stream_event = StreamEvent(event=event, id=getattr(body, 'id', None), action=action,
+                                   status=status, frame=frame, sequence=self._sequence)
+
+        if replay_active:
+            self._replay_buffer.append(stream_event)
+            self._replay_gap = False
+
+        for subscriber in subscribers:
+            subscriber.put(stream_event)
+
+    def generator(self, events=None, actions=None, statuses=None, last_event_id=None):
+        """
+        :param last_event_id: Id of the last event the client has received. If provided, events
+                              which have been emitted after that event are replayed first.
+        :type last_event_id: ``str``
+        """
+        subscriber = StreamSubscriber(events=events, actions=actions, statuses=statuses)
+
+        # Note: There is no context switch between replaying and subscribing so no event can be
+        # missed or received twice
+        if last_event_id:
+            self._replay(subscriber=subscriber, last_event_id=last_event_id)
+
+        self.subscribers.append(subscriber)
         try:
             while not self._stopped:
                 try:
-                    yield queue.get(timeout=cfg.CONF.api.heartbeat)
+                    stream_event = subscriber.get(timeout=cfg.CONF.api.heartbeat)
                 except eventlet.queue.Empty:
                     yield
+                    continue
+
+                if subscriber.disconnected:
+                    break
+
+                yield stream_event
         finally:
-            self.queues.remove(queue)
+            self.subscribers.remove(subscriber)
+            self._dropped += subscriber.dropped
+            self._last_disconnect_time = time.time()
+
+    def get_stats(self):
+        """
+        Return gauges for the connected stream clients.
+
+        :rtype: ``dict``
+        """
+        queue_sizes = [subscriber.qsize() for subscriber in self.subscribers]
+
+        return {
+            'subscribers': len(self.subscribers),
+            'queue_depth_total': sum(queue_sizes),
+            'queue_depth_max': max(queue_sizes) if queue_sizes else 0,
+            'dropped': self._dropped + sum(subscriber.dropped for subscriber in self.subscribers)
+        }
 
     def shutdown(self):
         self._stopped = True
 
+    def _is_replay_active(self):
+        """
+        Return True if the events should be kept in the replay buffer.
+        """
+        if self._replay_buffer is None:
+            return False
+
+        if self.subscribers:
+            return True
+
+        return (self._last_disconnect_time is not None and
+                time.time() - self._last_disconnect_time <= cfg.CONF.api.stream_replay_idle_timeout)
+
+    def _skip_event(self):
+        """
+        Record that an event has been skipped without being kept in the replay buffer.
+        """
+        if self._replay_buffer is None or self._replay_gap:
+            return
+
+        # Clients can't resume past the skipped events so the buffered events are dropped and a
+        # sequence number is skipped so the previous event ids can't be used to resume
+        self._replay_gap = True
+        self._replay_buffer.clear()
+        self._sequence += 1
+
+    def _get_event_id(self, sequence):
+        return '%s-%s' % (self._stream_id, sequence)
+
+    def _replay(self, subscriber, last_event_id):
+        stream_id, _, sequence = last_event_id.partition('-')
+
+        try:
+            sequence = int(sequence)
+        except ValueError:
+            sequence = None
+
+        replay_buffer = self._replay_buffer or []
+        oldest_sequence = replay_buffer[0].sequence if replay_buffer else self._sequence + 1
+
+        # Resume is only possible if no event after the last received one has been evicted
+        if (stream_id != self._stream_id or sequence is None or sequence > self._sequence or
+                sequence < oldest_sequence - 1):
+            LOG.debug('Unable to resume stream from event "%s".', last_event_id)
+            frame = EVENT_FORMAT % (self._get_event_id(self._sequence), RESET_EVENT, '{}')
+            subscriber.put(StreamEvent(event=RESET_EVENT, id=None, action=None, status=None,
+                                       frame=frame, sequence=self._sequence))
+            return
+
+        for stream_event in replay_buffer:
+            if stream_event.sequence <= sequence:
+                continue
+
+            if subscriber.matches(stream_event.event, stream_event.action, stream_event.status):
+                subscriber.put(stream_event)
+
+    @staticmethod
+    def _get_filter_attributes(body):
+        action = getattr(body, 'action', None)
+
+        # Executions include the whole action object, live actions only the reference
+        if isinstance(action, dict):
+            action = action.get('ref', None)
+
+        status = getattr(body, 'status', None)
+        return action, status
+
 
 def listen(listener):
     try:
@@ -28,7 +28,7 @@ class TestBase(FunctionalTest):
         self.assertEqual(response.headers['Access-Control-Allow-Headers'],
                          'Content-Type,Authorization,X-Auth-Token,X-Request-ID')
         self.assertEqual(response.headers['Access-Control-Expose-Headers'],
-                         'Content-Type,X-Limit,X-Total-Count,X-Request-ID')
+                         'Content-Type,X-Limit,X-Total-Count,X-Next-Cursor,X-Request-ID')
 
     def test_origin(self):
         response = self.app.get('/', headers={
@@ -0,0 +1,96 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from st2api import execution_filters
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.transport import publishers
+from st2tests import DbTestCase
+
+
+class ExecutionFiltersStoreTest(DbTestCase):
+
+    def _get_execution_db(self, action_ref, status, parent=None):
+        return ActionExecutionDB(action={'ref': action_ref}, runner={'name': 'local-shell-cmd'},
+                                 liveaction={'context': {'user': 'stanley'}}, status=status,
+                                 parent=parent)
+
+    def _get_message(self, routing_key):
+        return type('message', (object,), {
+            'delivery_info': {'routing_key': routing_key},
+            'ack': mock.Mock()
+        })
+
+    @mock.patch.object(execution_filters, 'get_filter_values')
+    def test_incremental_updates(self, get_filter_values):
+        get_filter_values.return_value = {'action': ['core.local'], 'status': ['succeeded']}
+        store = execution_filters.ExecutionFiltersStore(mock.Mock(), refresh_interval=600)
+
+        # Values are loaded from the database on first use
+        filters = store.get_filters()
+        self.assertEqual(get_filter_values.call_count, 1)
+        self.assertEqual(set(filters['action']), set(['core.local']))
+
+        message = self._get_message(publishers.CREATE_RK)
+        store.process(self._get_execution_db('core.remote', 'requested'), message)
+        message.ack.assert_called_once_with()
+
+        message = self._get_message(publishers.UPDATE_RK)
+        store.process(self._get_execution_db('core.remote', 'failed'), message)
+
+        # Child executions are not included
+        message = self._get_message(publishers.CREATE_RK)
+        store.process(self._get_execution_db('core.child', 'requested', parent='p1'), message)
+
+        filters = store.get_filters()
+        self.assertEqual(get_filter_values.call_count, 1)
+        self.assertEqual(set(filters['action']), set(['core.local', 'core.remote']))
+        self.assertEqual(set(filters['status']), set(['succeeded', 'requested', 'failed']))
+        self.assertEqual(set(filters['user']), set(['stanley']))
+        self.assertEqual(set(filters['runner']), set(['local-shell-cmd']))
+
+    @mock.patch.object(execution_filters, 'get_filter_values')
+    def test_reconcile(self, get_filter_values):
+        get_filter_values.return_value = {'action': ['core.local', 'core.remote']}
+        store = execution_filters.ExecutionFiltersStore(mock.Mock(), refresh_interval=600)
+        store.get_filters()
+
+        # Values which are not in the database anymore are removed
+        get_filter_values.return_value = {'action': ['core.local']}
+        store.reconcile()
+
+        self.assertEqual(store.get_filters(), {'action': ['core.local']})
+
+    @mock.patch.object(execution_filters, 'get_filter_values')
+    def test_overlapping_reconciles(self, get_filter_values):
+        get_filter_values.return_value = {'action': ['core.local']}
+        store = execution_filters.ExecutionFiltersStore(mock.Mock(), refresh_interval=600)
+        store.get_filters()
+
+        def mock_get_filter_values():
+            if get_filter_values.call_count == 2:
+                # Another reconcile runs and an execution is received while the aggregations of
+                # the first one are running
+                store.reconcile()
+                store.add_execution(self._get_execution_db('core.remote', 'requested'))
+
+            return {'action': ['core.local']}
+
+        get_filter_values.side_effect = mock_get_filter_values
+        store.reconcile()
+
+        self.assertEqual(get_filter_values.call_count, 3)
+        self.assertEqual(set(store.get_filters()['action']), set(['core.local', 'core.remote']))
@@ -114,6 +114,41 @@ class TestActionExecutionFilters(FunctionalTest):
         self.assertEqual(response.status_int, 200)
         self.assertFalse('result' in response.json[0])
 
+    def test_get_all_include_attributes(self):
+        path = '/v1/executions?action=executions.local&limit=1&include_attributes=status,action.ref'
+        response = self.app.get(path)
+
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(sorted(response.json[0].keys()), ['action', 'id', 'status'])
+        self.assertEqual(response.json[0]['action'], {'ref': 'executions.local'})
+
+        path = '/v1/executions?limit=1&include_attributes=invalid'
+        response = self.app.get(path, expect_errors=True)
+        self.assertEqual(response.status_int, http_client.BAD_REQUEST)
+
+    def test_get_all_summary_view(self):
+        response = self.app.get('/v1/executions?action=executions.chain&limit=1')
+        expected = response.json[0]
+
+        response = self.app.get('/v1/executions?action=executions.chain&limit=1&view=summary')
+        self.assertEqual(response.status_int, 200)
+
+        summary = response.json[0]
+        self.assertEqual(summary['id'], expected['id'])
+        self.assertEqual(summary['action'], {'ref': expected['action']['ref']})
+        self.assertEqual(summary['status'], expected['status'])
+        self.assertEqual(summary['start_timestamp'], expected['start_timestamp'])
+        self.assertTrue(set(summary.keys()).issubset(set(['id', 'action', 'status',
+                                                          'start_timestamp', 'end_timestamp',
+                                                          'parent', 'children', 'rule',
+                                                          'liveaction'])))
+        self.assertFalse('result' in summary)
+        self.assertFalse('runner' in summary)
+        self.assertFalse('trigger_instance' in summary)
+
+        response = self.app.get('/v1/executions?limit=1&view=invalid', expect_errors=True)
+        self.assertEqual(response.status_int, http_client.BAD_REQUEST)
+
     def test_get_one(self):
         obj_id = random.choice(self.refs.keys())
         response = self.app.get('/v1/executions/%s' % obj_id)
@@ -214,6 +249,86 @@ class TestActionExecutionFilters(FunctionalTest):
             retrieved += ids
         self.assertListEqual(sorted(retrieved), sorted(self.refs.keys()))
 
+    def test_cursor_pagination(self):
+        retrieved = []
+        page_size = 10
+        path = '/v1/executions?limit=%s' % (page_size)
+        response = self.app.get(path)
+        expected_ids = [item['id'] for item in
+                        self.app.get('/v1/executions?limit=%s' % (self.num_records)).json]
+
+        while True:
+            self.assertEqual(response.status_int, 200)
+            retrieved += [item['id'] for item in response.json]
+
+            cursor = response.headers.get('X-Next-Cursor', None)
+            if not cursor:
+                break
+
+            response = self.app.get('%s&cursor=%s' % (path, cursor))
+
+            # Counting is skipped by default when using a cursor
+            self.assertFalse('X-Total-Count' in response.headers)
+
+        self.assertListEqual(retrieved, expected_ids)
+
+    def test_cursor_pagination_with_sort_and_filter(self):
+        refs = [k for k, v in six.iteritems(self.refs) if v.action['name'] == 'chain']
+        path = '/v1/executions?action=executions.chain&sort=timestamp&limit=5&count=exact'
+        response = self.app.get(path)
+        retrieved = [item['id'] for item in response.json]
+        timestamps = [item['start_timestamp'] for item in response.json]
+
+        while 'X-Next-Cursor' in response.headers:
+            response = self.app.get('%s&cursor=%s' % (path, response.headers['X-Next-Cursor']))
+            self.assertEqual(response.headers['X-Total-Count'], str(len(refs)))
+            retrieved += [item['id'] for item in response.json]
+            timestamps += [item['start_timestamp'] for item in response.json]
+
+        self.assertListEqual(sorted(retrieved), sorted(refs))
+        self.assertListEqual(timestamps, sorted(timestamps))
+
+    def test_cursor_pagination_sort_key_with_nulls(self):
+        # Only the chain executions have a rule so the rest is sorted last in descending order
+        path = '/v1/executions?sort=-rule&limit=7'
+        response = self.app.get(path)
+        retrieved = [item['id'] for item in response.json]
+        rules = [(item.get('rule') or {}).get('name', None) for item in response.json]
+
+        while 'X-Next-Cursor' in response.headers:
+            response = self.app.get('%s&cursor=%s' % (path, response.headers['X-Next-Cursor']))
+            retrieved += [item['id'] for item in response.json]
+            rules += [(item.get('rule') or {}).get('name', None) for item in response.json]
+
+        self.assertEqual(len(retrieved), len(set(retrieved)))
+        self.assertListEqual(sorted(retrieved), sorted(self.refs.keys()))
+        self.assertTrue(None in rules)
+        self.assertListEqual(rules, sorted(rules, key=lambda rule: rule is None))
+
+    def test_cursor_pagination_invalid_cursor(self):
+        response = self.app.get('/v1/executions?limit=10&cursor=invalid', expect_errors=True)
+        self.assertEqual(response.status_int, http_client.BAD_REQUEST)
+
+        # Cursor is tied to the sort order
+        cursor = self.app.get('/v1/executions?limit=10').headers['X-Next-Cursor']
+        response = self.app.get('/v1/executions?limit=10&sort=timestamp&cursor=%s' %
+                                (cursor), expect_errors=True)
+        self.assertEqual(response.status_int, http_client.BAD_REQUEST)
+
+        response = self.app.get('/v1/executions?limit=10&offset=10&cursor=%s' % (cursor),
+                                expect_errors=True)
+        self.assertEqual(response.status_int, http_client.BAD_REQUEST)
+
+    def test_count_types(self):
+        response = self.app.get('/v1/executions?limit=10&count=estimated')
+        self.assertEqual(response.headers['X-Total-Count'], str(self.num_records))
+
+        response = self.app.get('/v1/executions?limit=10&count=none')
+        self.assertFalse('X-Total-Count' in response.headers)
+
+        response = self.app.get('/v1/executions?limit=10&count=invalid', expect_errors=True)
+        self.assertEqual(response.status_int, http_client.BAD_REQUEST)
+
     def test_datetime_range(self):
         dt_range = '2014-12-25T00:00:10Z..2014-12-25T00:00:19Z'
         response = self.app.get('/v1/executions?timestamp=%s' % dt_range)
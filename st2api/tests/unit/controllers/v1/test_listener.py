@@ -13,7 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import mock
+from oslo_config import cfg
 
 from st2api import listener
 from st2tests import DbTestCase
@@ -28,7 +31,9 @@ class ListenerTest(DbTestCase):
         })
         ack = mock.Mock()
 
-        process = listener.Listener(mock.Mock()).processor(model)
+        listen = listener.Listener(mock.Mock())
+        listen.subscribers = [listener.StreamSubscriber()]
+        process = listen.processor(model)
 
         self.assertTrue(hasattr(process, '__call__'))
 
@@ -43,20 +48,211 @@ class ListenerTest(DbTestCase):
         emit.assert_called_once_with('exchange__routing_key', 'model')
         ack.assert_called_once_with()
 
+    @mock.patch.object(listener.Listener, 'emit')
+    def test_processor_no_subscribers(self, emit):
+        model = type('Model', (object,), {
+            'from_model': mock.Mock(return_value='model')
+        })
+        ack = mock.Mock()
+
+        process = listener.Listener(mock.Mock(), replay_buffer_size=0).processor(model)
+        process('body', type('message', (object,), {
+            'delivery_info': {
+                'exchange': 'exchange',
+                'routing_key': 'routing_key'
+            },
+            'ack': ack
+        }))
+
+        self.assertFalse(model.from_model.called)
+        self.assertFalse(emit.called)
+        ack.assert_called_once_with()
+
+    @mock.patch.object(listener, 'json_encode', mock.Mock(return_value='{}'))
     def test_emit(self):
         listen = listener.Listener(mock.Mock())
-        put1 = mock.Mock()
-        put2 = mock.Mock()
-        queue1 = type('queue', (object,), {
-            'put': put1
+        subscriber1 = listener.StreamSubscriber()
+        subscriber2 = listener.StreamSubscriber()
+        listen.subscribers = [subscriber1, subscriber2]
+
+        listen.emit('event', 'body')
+
+        # Body is only serialized once and the same event is shared between subscribers
+        self.assertEqual(listener.json_encode.call_count, 1)
+        event1 = subscriber1.get(timeout=1)
+        event2 = subscriber2.get(timeout=1)
+        self.assertIs(event1, event2)
+        self.assertEqual(event1.frame,
+                         'id: %s-1\nevent: event\ndata: {}\n\n' % (listen._stream_id))
+
+    def test_emit_filters(self):
+        listen = listener.Listener(mock.Mock())
+        all_events = listener.StreamSubscriber()
+        updates = listener.StreamSubscriber(events=['st2.execution__update'])
+        failed_local = listener.StreamSubscriber(actions=['core.local'], statuses=['failed'])
+        listen.subscribers = [all_events, updates, failed_local]
+
+        body = type('body', (object,), {
+            'action': {'ref': 'core.local'},
+            'status': 'failed',
+            '__json__': lambda self: {}
+        })()
+        listen.emit('st2.execution__create', body)
+
+        self.assertEqual(all_events.qsize(), 1)
+        self.assertEqual(updates.qsize(), 0)
+        self.assertEqual(failed_local.qsize(), 1)
+
+        body.status = 'succeeded'
+        listen.emit('st2.execution__update', body)
+
+        self.assertEqual(all_events.qsize(), 2)
+        self.assertEqual(updates.qsize(), 1)
+        self.assertEqual(failed_local.qsize(), 1)
+
+    def _get_stream_event(self, id, event='st2.execution__update'):
+        return listener.StreamEvent(event=event, id=id, action=None, status=None, frame=id,
+                                    sequence=0)
+
+    def test_subscriber_drop_oldest(self):
+        subscriber = listener.StreamSubscriber(max_size=2, overflow_policy='drop_oldest')
+
+        for id in ['a', 'b', 'c']:
+            subscriber.put(self._get_stream_event(id))
+
+        self.assertEqual(subscriber.qsize(), 2)
+        self.assertEqual(subscriber.dropped, 1)
+        self.assertEqual(subscriber.get(timeout=1).id, 'b')
+        self.assertEqual(subscriber.get(timeout=1).id, 'c')
+
+    def test_subscriber_coalesce(self):
+        subscriber = listener.StreamSubscriber(max_size=2, overflow_policy='coalesce')
+
+        subscriber.put(self._get_stream_event('a'))
+        subscriber.put(self._get_stream_event('b'))
+        subscriber.put(self._get_stream_event('a'))
+
+        # Pending event for the same object is replaced with the latest one at the end
+        self.assertEqual(subscriber.qsize(), 2)
+        self.assertEqual(subscriber.dropped, 1)
+        self.assertEqual(subscriber.get(timeout=1).id, 'b')
+
+        # There is nothing to coalesce with so the oldest event is dropped
+        subscriber.put(self._get_stream_event('c'))
+        subscriber.put(self._get_stream_event('d'))
+        self.assertEqual([subscriber.get(timeout=1).id for _ in range(2)], ['c', 'd'])
+
+    def test_subscriber_disconnect(self):
+        subscriber = listener.StreamSubscriber(max_size=1, overflow_policy='disconnect')
+
+        subscriber.put(self._get_stream_event('a'))
+        subscriber.put(self._get_stream_event('b'))
+
+        self.assertTrue(subscriber.disconnected)
+        self.assertEqual(subscriber.get(timeout=1), None)
+
+    def test_get_stats(self):
+        listen = listener.Listener(mock.Mock())
+        subscriber1 = listener.StreamSubscriber(max_size=1)
+        subscriber2 = listener.StreamSubscriber()
+        listen.subscribers = [subscriber1, subscriber2]
+
+        for id in ['a', 'b', 'c']:
+            subscriber1.put(self._get_stream_event(id))
+            subscriber2.put(self._get_stream_event(id))
+
+        self.assertEqual(listen.get_stats(), {
+            'subscribers': 2,
+            'queue_depth_total': 4,
+            'queue_depth_max': 3,
+            'dropped': 2
+        })
+
+    @mock.patch.object(listener, 'json_encode', mock.Mock(side_effect=lambda body, indent: body))
+    def test_generator_resume(self):
+        listen = listener.Listener(mock.Mock(), replay_buffer_size=2)
+        listen.subscribers = [listener.StreamSubscriber()]
+
+        for body in ['a', 'b', 'c']:
+            listen.emit('event', body)
+
+        listen.subscribers = []
+
+        # Events after the last received one are replayed
+        gen = listen.generator(last_event_id='%s-2' % (listen._stream_id))
+        stream_event = gen.next()
+        self.assertEqual(stream_event.sequence, 3)
+        self.assertTrue(stream_event.frame.endswith('data: c\n\n'))
+        self.assertEqual(len(listen.subscribers), 1)
+        gen.close()
+
+        # Event "a" has been evicted from the buffer so it's not possible to resume
+        gen = listen.generator(last_event_id='%s-0' % (listen._stream_id))
+        self.assertEqual(gen.next().event, listener.RESET_EVENT)
+        gen.close()
+
+        # Id from a different process
+        gen = listen.generator(last_event_id='abcd-2')
+        self.assertEqual(gen.next().event, listener.RESET_EVENT)
+        gen.close()
+
+        self.assertEqual(len(listen.subscribers), 0)
+
+    @mock.patch.object(listener, 'json_encode', mock.Mock(side_effect=lambda body, indent: body.id))
+    def test_generator_resume_after_coalesce(self):
+        listen = listener.Listener(mock.Mock(), replay_buffer_size=10)
+        subscriber = listener.StreamSubscriber(max_size=2, overflow_policy='coalesce')
+        listen.subscribers = [subscriber]
+
+        for id in ['a', 'b', 'a']:
+            listen.emit('event', type('body', (object,), {'id': id})())
+
+        # Coalesced event is delivered after the older events of other objects
+        stream_event = subscriber.get(timeout=1)
+        self.assertEqual((stream_event.id, stream_event.sequence), ('b', 2))
+        listen.subscribers = []
+
+        # Client which disconnects and resumes from the received event gets the coalesced one
+        gen = listen.generator(last_event_id='%s-2' % (listen._stream_id))
+        stream_event = gen.next()
+        self.assertEqual((stream_event.id, stream_event.sequence), ('a', 3))
+        gen.close()
+
+    @mock.patch.object(listener, 'json_encode', mock.Mock(side_effect=lambda body, indent: body))
+    def test_replay_buffer_idle(self):
+        model = type('Model', (object,), {
+            'from_model': mock.Mock(side_effect=lambda body, **kwargs: body)
         })
-        queue2 = type('queue', (object,), {
-            'put': put2
+        message = type('message', (object,), {
+            'delivery_info': {'exchange': 'exchange', 'routing_key': 'routing_key'},
+            'ack': mock.Mock()
         })
 
-        listen.queues = [queue1, queue2]
+        listen = listener.Listener(mock.Mock(), replay_buffer_size=10)
+        process = listen.processor(model)
 
-        listen.emit('event', 'body')
+        # No client has been connected so the events are not processed at all
+        process('a', message)
+        self.assertFalse(model.from_model.called)
+
+        # Events are kept while a client is connected and for a while after it disconnects
+        listen.subscribers = [listener.StreamSubscriber()]
+        process('b', message)
+        listen.subscribers = []
+        listen._last_disconnect_time = time.time()
+
+        process('c', message)
+        self.assertEqual(model.from_model.call_count, 2)
+        self.assertEqual([event.frame.split('data: ')[1] for event in listen._replay_buffer],
+                         ['b\n\n', 'c\n\n'])
+        last_event_id = listen._get_event_id(listen._replay_buffer[0].sequence)
+
+        # Events are skipped once the client has been disconnected for too long
+        listen._last_disconnect_time -= cfg.CONF.api.stream_replay_idle_timeout + 1
+        process('d', message)
+        self.assertEqual(model.from_model.call_count, 2)
 
-        put1.assert_called_once_with(('event', 'body'))
-        put2.assert_called_once_with(('event', 'body'))
+        # Client which missed the skipped events can't resume
+        gen = listen.generator(last_event_id=last_event_id)
+        self.assertEqual(gen.next().event, listener.RESET_EVENT)
+        gen.close()
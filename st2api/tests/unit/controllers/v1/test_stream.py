@@ -21,7 +21,7 @@ from st2api import listener
 from tests import FunctionalTest
 
 
-@mock.patch.object(pecan, 'request', type('request', (object,), {'environ': {}}))
+@mock.patch.object(pecan, 'request', type('request', (object,), {'environ': {}, 'headers': {}}))
 @mock.patch.object(pecan, 'response', mock.MagicMock())
 class TestStreamController(FunctionalTest):
 
@@ -32,3 +32,9 @@ class TestStreamController(FunctionalTest):
         self.assertIsInstance(resp._app_iter, mock.Mock)
         self.assertEqual(resp._status, '200 OK')
         self.assertIn(('Content-Type', 'text/event-stream; charset=UTF-8'), resp._headerlist)
+
+    def test_format(self):
+        stream_event = listener.StreamEvent(event='event', id=None, action=None, status=None,
+                                            frame='event: event\ndata: {}\n\n', sequence=1)
+        result = list(stream.format(iter([stream_event, None])))
+        self.assertEqual(result, ['\n', 'event: event\ndata: {}\n\n', '\n'])
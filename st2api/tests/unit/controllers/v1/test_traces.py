@@ -54,6 +54,21 @@ class TestTraces(FunctionalTest):
                          [self.trace1.trace_tag, self.trace2.trace_tag, self.trace3.trace_tag],
                          'Incorrect traces retrieved.')
 
+    def test_get_all_cursor_pagination(self):
+        resp = self.app.get('/v1/traces?limit=2')
+        self.assertEqual(resp.status_int, 200)
+        self.assertEqual(len(resp.json), 2)
+        retrieved_trace_tags = [trace['trace_tag'] for trace in resp.json]
+
+        resp = self.app.get('/v1/traces?limit=2&cursor=%s' % (resp.headers['X-Next-Cursor']))
+        self.assertEqual(resp.status_int, 200)
+        self.assertEqual(len(resp.json), 1)
+        self.assertFalse('X-Next-Cursor' in resp.headers)
+        retrieved_trace_tags += [trace['trace_tag'] for trace in resp.json]
+
+        self.assertEqual(retrieved_trace_tags,
+                         [self.trace1.trace_tag, self.trace2.trace_tag, self.trace3.trace_tag])
+
     def test_get_by_id(self):
         resp = self.app.get('/v1/traces/%s' % self.trace1.id)
         self.assertEqual(resp.status_int, 200)
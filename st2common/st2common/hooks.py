@@ -85,7 +85,7 @@ class CorsHook(PecanHook):
         methods_allowed = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
         request_headers_allowed = ['Content-Type', 'Authorization', 'X-Auth-Token',
                                    REQUEST_ID_HEADER]
-        response_headers_allowed = ['Content-Type', 'X-Limit', 'X-Total-Count',
+        response_headers_allowed = ['Content-Type', 'X-Limit', 'X-Total-Count', 'X-Next-Cursor',
                                     REQUEST_ID_HEADER]
 
         headers['Access-Control-Allow-Origin'] = origin_allowed
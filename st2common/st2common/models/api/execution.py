@@ -42,6 +42,18 @@ for k, v in six.iteritems(REQUIRED_ATTR_SCHEMAS):
 class ActionExecutionAPI(BaseAPI):
     model = ActionExecutionDB
     SKIP = ['start_timestamp', 'end_timestamp']
+
+    # Attributes included in the summary representation. Nested attributes use dot notation.
+    SUMMARY_ATTRIBUTES = [
+        'action.ref',
+        'status',
+        'start_timestamp',
+        'end_timestamp',
+        'parent',
+        'children',
+        'rule.ref',
+        'liveaction.context.user'
+    ]
     schema = {
         "title": "ActionExecution",
         "description": "Record of the execution of an action.",
@@ -123,6 +135,39 @@ class ActionExecutionAPI(BaseAPI):
         attrs = {attr: value for attr, value in six.iteritems(doc) if value}
         return cls(**attrs)
 
+    @classmethod
+    def summary_from_model(cls, model, **kwargs):
+        """
+        Create a compact representation of the provided execution which only contains
+        SUMMARY_ATTRIBUTES.
+
+        This is much cheaper than from_model since the whole document doesn't need to be
+        serialized so the model only needs to contain the summary attributes.
+
+        :rtype: :class:`ActionExecutionAPI`
+        """
+        doc = {'id': str(model.id)}
+
+        for attribute in cls.SUMMARY_ATTRIBUTES:
+            path = attribute.split('.')
+            value = getattr(model, path[0], None)
+
+            for key in path[1:]:
+                value = value.get(key, None) if isinstance(value, dict) else None
+
+            if value is None:
+                continue
+
+            if attribute in ['start_timestamp', 'end_timestamp']:
+                value = isotime.format(value, offset=False)
+
+            item = doc
+            for key in path[:-1]:
+                item = item.setdefault(key, {})
+            item[path[-1]] = value
+
+        return cls(**doc)
+
     @classmethod
     def to_model(cls, instance):
         values = {}
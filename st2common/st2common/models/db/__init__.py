@@ -115,8 +115,20 @@ class MongoDBAccess(object):
     def count(self, *args, **kwargs):
         return self.model.objects(**kwargs).count()
 
-    def query(self, offset=0, limit=None, order_by=None, exclude_fields=None,
+    def estimated_count(self):
+        """
+        Return number of documents in the collection using the collection metadata instead of
+        scanning the index.
+        """
+        return self.model._get_collection().count()
+
+    def query(self, offset=0, limit=None, order_by=None, exclude_fields=None, only_fields=None,
               **filters):
+        """
+        :param only_fields: If provided, only those fields are retrieved from the database.
+                            Nested fields can be specified using dot notation.
+        :type only_fields: ``list``
+        """
         order_by = order_by or []
         exclude_fields = exclude_fields or []
         eop = offset + int(limit) if limit else None
@@ -132,6 +144,9 @@ class MongoDBAccess(object):
         if exclude_fields:
             result = result.exclude(*exclude_fields)
 
+        if only_fields:
+            result = result.only(*only_fields)
+
         result = result.order_by(*order_by)
         result = result[offset:eop]
 
@@ -155,6 +170,66 @@ class MongoDBAccess(object):
     def update(self, instance, **kwargs):
         return instance.update(**kwargs)
 
+    def update_fields(self, instance, fields):
+        """
+        Persist only the provided fields of an existing instance using a single targeted
+        $set / $unset operation instead of re-writing the whole document.
+
+        Values are taken from the instance. Attributes which are not model fields are ignored.
+
+        :param fields: Names of the fields to persist.
+        :type fields: ``list``
+        """
+        to_set = {}
+        to_unset = {}
+
+        for name in fields:
+            field = instance._fields.get(name, None)
+
+            if not field:
+                continue
+
+            value = getattr(instance, name)
+
+            if value is None:
+                to_unset[field.db_field] = 1
+                continue
+
+            field.validate(value)
+            to_set[field.db_field] = field.to_mongo(value)
+
+        document = {}
+
+        if to_set:
+            document['$set'] = to_set
+
+        if to_unset:
+            document['$unset'] = to_unset
+
+        if document:
+            self.model._get_collection().update({'_id': instance.id}, document)
+
+        instance._clear_changed_fields()
+        return instance
+
+    def get_dirty_fields(self, instance):
+        """
+        Return names of the top-level fields which have been modified since the instance has been
+        retrieved from or persisted to the database.
+
+        :rtype: ``list``
+        """
+        result = []
+
+        for key in instance._get_changed_fields():
+            db_field = key.split('.')[0]
+            name = instance._reverse_db_field_map.get(db_field, db_field)
+
+            if name not in result:
+                result.append(name)
+
+        return result
+
     def delete(self, instance):
         instance.delete()
 
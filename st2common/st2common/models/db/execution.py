@@ -74,7 +74,9 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
             {'fields': ['end_timestamp']},
             {'fields': ['status']},
             {'fields': ['parent']},
-            {'fields': ['-start_timestamp', 'action.ref', 'status']}
+            {'fields': ['-start_timestamp', 'action.ref', 'status']},
+            # Covers the default API sort order including the id tie breaker
+            {'fields': ['-start_timestamp', 'action.ref', 'id']}
         ]
     }
 
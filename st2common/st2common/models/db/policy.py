@@ -23,7 +23,8 @@ from st2common.models.system import common as common_models
 
 __all__ = ['PolicyTypeReference',
            'PolicyTypeDB',
-           'PolicyDB']
+           'PolicyDB',
+           'ConcurrencySlotsDB']
 
 LOG = logging.getLogger(__name__)
 
@@ -179,4 +180,21 @@ class PolicyDB(stormbase.StormFoundationDB, stormbase.ContentPackResourceMixin):
                                                                        name=self.name)
 
 
-MODELS = [PolicyTypeDB, PolicyDB]
+class ConcurrencySlotsDB(stormbase.StormFoundationDB):
+    """
+    Slots of a resource governed by a concurrency policy.
+
+    Attribute:
+        key: Unique key which identifies the resource (and attribute values) the slots belong to.
+        holders: IDs of the executions which are currently holding a slot.
+    """
+    key = me.StringField(
+        required=True,
+        unique=True,
+        help_text='Unique key which identifies the resource the slots belong to.')
+    holders = me.ListField(
+        field=me.StringField(),
+        help_text='IDs of the executions which are currently holding a slot.')
+
+
+MODELS = [PolicyTypeDB, PolicyDB, ConcurrencySlotsDB]
@@ -73,7 +73,8 @@ class TraceDB(stormbase.StormFoundationDB):
 
     meta = {
         'indexes': [
-            {'fields': ['trace_tag']},
+            # Also covers the default API sort order including the id tie breaker
+            {'fields': ['trace_tag', 'id']},
             {'fields': ['start_timestamp']},
             {'fields': ['action_executions.object_id']},
             {'fields': ['trigger_instances.object_id']},
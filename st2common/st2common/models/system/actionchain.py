@@ -36,8 +36,8 @@ class Node(object):
             },
             "ref": {
                 "type": "string",
-                "description": "Ref of the action to be executed.",
-                "required": True
+                "description": "Ref of the action to be executed. Required unless the node is a"
+                               " parallel node."
             },
             "params": {
                 "type": "object",
@@ -56,6 +56,25 @@ class Node(object):
                                " node.",
                 "default": ""
             },
+            "parallel": {
+                "type": "array",
+                "description": "Names of the nodes to execute concurrently. Once all of them"
+                               " complete the chain continues with the on-success or on-failure"
+                               " node of this node.",
+                "items": {
+                    "type": "string"
+                },
+                "minItems": 1,
+                "uniqueItems": True
+            },
+            "join": {
+                "type": "string",
+                "description": "Determines when a parallel node succeeds. \"all\" - all the"
+                               " nodes need to succeed, \"any\" - at least one of the nodes"
+                               " needs to succeed.",
+                "enum": ["all", "any"],
+                "default": "all"
+            },
             "publish": {
                 "description": "The variables to publish from the result. Should be of the form"
                                " name.foo. o1: {{node_name.foo}} will result in creation of a"
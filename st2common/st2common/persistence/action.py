@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from st2common import transport
 from st2common.models.db.action import action_access
 from st2common.persistence import base as persistence
 from st2common.persistence.actionalias import ActionAlias
@@ -20,6 +21,7 @@ from st2common.persistence.execution import ActionExecution
 from st2common.persistence.executionstate import ActionExecutionState
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.runner import RunnerType
+from st2common.transport import utils as transport_utils
 
 __all__ = [
     'Action',
@@ -33,7 +35,15 @@ __all__ = [
 
 class Action(persistence.ContentPackResource):
     impl = action_access
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
+
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.action.ActionCUDPublisher(
+                urls=transport_utils.get_messaging_urls())
+        return cls.publisher
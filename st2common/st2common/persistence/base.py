@@ -99,6 +99,10 @@ class Access(object):
     def count(cls, *args, **kwargs):
         return cls._get_impl().count(*args, **kwargs)
 
+    @classmethod
+    def estimated_count(cls):
+        return cls._get_impl().estimated_count()
+
     @classmethod
     def query(cls, *args, **kwargs):
         return cls._get_impl().query(*args, **kwargs)
@@ -219,6 +223,36 @@ class Access(object):
 
         return model_object
 
+    @classmethod
+    def update_fields(cls, model_object, fields=None, publish=True, dispatch_trigger=True):
+        """
+        Persist only the provided fields of an existing object using a targeted $set operation.
+
+        If fields are not provided, fields which have been modified since the object has been
+        retrieved from the database (dirty fields) are persisted. Unlike ``update`` the object is
+        not re-read from the database.
+        """
+        if fields is None:
+            fields = cls._get_impl().get_dirty_fields(model_object)
+
+        model_object = cls._get_impl().update_fields(model_object, fields=fields)
+
+        # Publish internal event on the message bus
+        if publish:
+            try:
+                cls.publish_update(model_object)
+            except:
+                LOG.exception('Publish failed.')
+
+        # Dispatch trigger
+        if dispatch_trigger:
+            try:
+                cls.dispatch_update_trigger(model_object)
+            except:
+                LOG.exception('Trigger dispatch failed.')
+
+        return model_object
+
     @classmethod
     def delete(cls, model_object, publish=True, dispatch_trigger=True):
         persisted_object = cls._get_impl().delete(model_object)
@@ -13,12 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from st2common import log as logging
 from st2common import transport
 from st2common.models.db import MongoDBAccess
 from st2common.models.db.execution import ActionExecutionDB
 from st2common.persistence.base import Access
 from st2common.transport import utils as transport_utils
 
+LOG = logging.getLogger(__name__)
+
 
 class ActionExecution(Access):
     impl = MongoDBAccess(ActionExecutionDB)
@@ -34,3 +37,22 @@ class ActionExecution(Access):
             cls.publisher = transport.execution.ActionExecutionPublisher(
                 urls=transport_utils.get_messaging_urls())
         return cls.publisher
+
+    @classmethod
+    def push_child(cls, instance, child_id, publish=True):
+        """
+        Atomically add a child execution id to the provided execution.
+
+        Unlike ``update`` this doesn't re-read the whole document from the database, the provided
+        instance is updated in place.
+        """
+        cls._get_impl().update(instance, push__children=child_id)
+        instance.children.append(child_id)
+
+        if publish:
+            try:
+                cls.publish_update(instance)
+            except:
+                LOG.exception('Publish failed.')
+
+        return instance
@@ -13,9 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from st2common import transport
 from st2common.models.db import MongoDBAccess
 from st2common.models.db.policy import PolicyTypeReference, PolicyTypeDB, PolicyDB
+from st2common.models.db.policy import ConcurrencySlotsDB
 from st2common.persistence.base import Access, ContentPackResource
+from st2common.transport import utils as transport_utils
 
 
 class PolicyType(Access):
@@ -44,6 +47,22 @@ class PolicyType(Access):
 
 class Policy(ContentPackResource):
     impl = MongoDBAccess(PolicyDB)
+    publisher = None
+
+    @classmethod
+    def _get_impl(cls):
+        return cls.impl
+
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.policy.PolicyCUDPublisher(
+                urls=transport_utils.get_messaging_urls())
+        return cls.publisher
+
+
+class ConcurrencySlots(Access):
+    impl = MongoDBAccess(ConcurrencySlotsDB)
 
     @classmethod
     def _get_impl(cls):
@@ -13,17 +13,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from st2common import transport
 from st2common.models.db.rule import rule_access, rule_type_access
 from st2common.persistence.base import Access, ContentPackResource
+from st2common.transport import utils as transport_utils
 
 
 class Rule(ContentPackResource):
     impl = rule_access
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.reactor.RuleCUDPublisher(
+                urls=transport_utils.get_messaging_urls())
+        return cls.publisher
+
 
 class RuleType(Access):
     impl = rule_type_access
@@ -0,0 +1,239 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrency policies are enforced using slots. Each resource governed by a concurrency policy has
+a document with a list of executions which are holding a slot. Slots are acquired and released
+using atomic updates so enforcing the policy doesn't require a distributed lock or counting the
+executions in the database.
+"""
+
+import abc
+
+import pymongo
+import six
+
+from st2common import log as logging
+from st2common.constants import action as action_constants
+from st2common.persistence.liveaction import LiveAction
+from st2common.persistence.policy import ConcurrencySlots
+from st2common.policies import base
+from st2common.services import action as action_service
+
+__all__ = [
+    'BaseConcurrencyApplicator',
+
+    'acquire_slot',
+    'release_slot',
+    'reconcile_slots'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Statuses of the executions which are holding a slot
+SLOT_HOLDER_STATES = [
+    action_constants.LIVEACTION_STATUS_SCHEDULED,
+    action_constants.LIVEACTION_STATUS_RUNNING
+]
+
+
+def _get_collection():
+    return ConcurrencySlots.impl.model._get_collection()
+
+
+def acquire_slot(key, holder, threshold, get_holders=None):
+    """
+    Try to acquire one of the slots for the provided key.
+
+    :param key: Key which identifies the slots.
+    :type key: ``str``
+
+    :param holder: ID of the execution which is acquiring a slot.
+    :type holder: ``str``
+
+    :param threshold: Number of available slots.
+    :type threshold: ``int``
+
+    :param get_holders: Function which returns IDs of the executions which are already holding a
+                        slot. It's only called when the slots for the key are first created.
+    :type get_holders: ``callable``
+
+    :return: True if the slot has been acquired, False otherwise.
+    :rtype: ``bool``
+    """
+    if threshold <= 0:
+        return False
+
+    collection = _get_collection()
+
+    # Slot is available if there are less than threshold holders or the execution is already
+    # holding one
+    query = {
+        'key': key,
+        '$or': [
+            {'holders.%s' % (threshold - 1): {'$exists': False}},
+            {'holders': holder}
+        ]
+    }
+    update = {'$addToSet': {'holders': holder}}
+
+    if collection.update(query, update)['n'] > 0:
+        return True
+
+    if collection.find_one({'key': key}) is not None:
+        return False
+
+    holders = get_holders() if get_holders else []
+
+    try:
+        collection.insert({'key': key, 'holders': holders})
+    except pymongo.errors.DuplicateKeyError:
+        # Slots have been created by a different process in the mean time
+        pass
+
+    return collection.update(query, update)['n'] > 0
+
+
+def release_slot(key, holder):
+    """
+    Release the slot held by the provided execution.
+
+    :return: Number of the executions which are still holding a slot.
+    :rtype: ``int``
+    """
+    slots = _get_collection().find_and_modify({'key': key}, {'$pull': {'holders': holder}},
+                                              new=True)
+    return len(slots['holders']) if slots else 0
+
+
+def reconcile_slots():
+    """
+    Release the slots which are held by the executions which have already completed or don't
+    exist anymore (e.g. because the post run policies have not been applied for them).
+
+    :return: Number of the released slots.
+    :rtype: ``int``
+    """
+    collection = _get_collection()
+    released = 0
+
+    for slots_db in ConcurrencySlots.get_all():
+        if not slots_db.holders:
+            continue
+
+        liveaction_dbs = LiveAction.query(id__in=slots_db.holders,
+                                          status__nin=action_constants.COMPLETED_STATES,
+                                          only_fields=['id'])
+        active = set([str(liveaction_db.id) for liveaction_db in liveaction_dbs])
+        stale = [holder for holder in slots_db.holders if holder not in active]
+
+        if not stale:
+            continue
+
+        LOG.info('Releasing %s concurrency slots held by completed executions (key=%s).',
+                 len(stale), slots_db.key)
+        collection.update({'key': slots_db.key}, {'$pullAll': {'holders': stale}})
+        released += len(stale)
+
+    return released
+
+
+@six.add_metaclass(abc.ABCMeta)
+class BaseConcurrencyApplicator(base.ResourcePolicyApplicator):
+    """
+    Base class for the policies which limit the number of executions which are scheduled or
+    running at the same time.
+    """
+
+    def __init__(self, policy_ref, policy_type, *args, **kwargs):
+        super(BaseConcurrencyApplicator, self).__init__(policy_ref, policy_type,
+                                                        *args, **kwargs)
+        self.threshold = kwargs.get('threshold', 0)
+
+    @abc.abstractmethod
+    def _get_slots_key(self, target):
+        """
+        Return a key which identifies the slots the provided execution competes for.
+
+        :rtype: ``str``
+        """
+        pass
+
+    def _get_filters(self, target):
+        """
+        Return filters which match the executions competing for the same slots as the provided
+        execution.
+
+        :rtype: ``dict``
+        """
+        return {'action': target.action}
+
+    def _get_holders(self, target):
+        filters = self._get_filters(target)
+        liveaction_dbs = LiveAction.query(status__in=SLOT_HOLDER_STATES, only_fields=['id'],
+                                          **filters)
+        return [str(liveaction_db.id) for liveaction_db in liveaction_dbs]
+
+    def apply_before(self, target):
+        # Exit if target not in schedulable state.
+        if target.status != action_constants.LIVEACTION_STATUS_REQUESTED:
+            LOG.debug('The live action is not schedulable therefore the policy '
+                      '"%s" cannot be applied. %s', self._policy_ref, target)
+            return target
+
+        key = self._get_slots_key(target)
+        acquired = acquire_slot(key=key, holder=str(target.id), threshold=self.threshold,
+                                get_holders=lambda: self._get_holders(target))
+
+        # Mark the execution as scheduled if a slot is acquired or delayed otherwise.
+        if acquired:
+            LOG.debug('Slot for %s has been acquired. Threshold of %s is not reached. Action '
+                      'execution will be scheduled.', target.action, self._policy_ref)
+            status = action_constants.LIVEACTION_STATUS_SCHEDULED
+        else:
+            LOG.debug('All the slots for %s are taken. Threshold of %s is reached. Action '
+                      'execution will be delayed.', target.action, self._policy_ref)
+            status = action_constants.LIVEACTION_STATUS_DELAYED
+
+        # Update the status in the database but do not publish.
+        target = action_service.update_status(target, status, publish=False)
+
+        return target
+
+    def apply_after(self, target):
+        key = self._get_slots_key(target)
+        available = self.threshold - release_slot(key=key, holder=str(target.id))
+
+        if available <= 0:
+            return target
+
+        # Reschedule the oldest delayed executions in bulk.
+        filters = self._get_filters(target)
+        filters['status'] = action_constants.LIVEACTION_STATUS_DELAYED
+        requests = LiveAction.query(order_by=['start_timestamp'], limit=available, **filters)
+
+        for request in requests:
+            # Make sure the request is not rescheduled by a different process at the same time
+            claimed = LiveAction.impl.model.objects(
+                id=request.id, status=action_constants.LIVEACTION_STATUS_DELAYED).update(
+                    set__status=action_constants.LIVEACTION_STATUS_REQUESTED)
+
+            if not claimed:
+                continue
+
+            action_service.update_status(
+                request, action_constants.LIVEACTION_STATUS_REQUESTED, publish=True)
+
+        return target
@@ -30,6 +30,9 @@ from st2common.constants.logging import DEFAULT_LOGGING_CONF_PATH
 from st2common.logging.misc import set_log_level_for_all_loggers
 from st2common.transport.bootstrap_utils import register_exchanges
 from st2common.signal_handlers import register_common_signal_handlers
+from st2common.services import action_cache
+from st2common.services import keyvalue_cache
+from st2common.services import policy_cache
 
 from st2common.rbac.migrations import insert_system_roles
 
@@ -45,7 +48,7 @@ LOG = logging.getLogger(__name__)
 
 
 def setup(service, config, setup_db=True, register_mq_exchanges=True,
-          register_signal_handlers=True, run_migrations=True):
+          register_signal_handlers=True, run_migrations=True, setup_caches=True):
     """
     Common setup function.
 
@@ -56,6 +59,7 @@ def setup(service, config, setup_db=True, register_mq_exchanges=True,
     3. Set log level for all the loggers to DEBUG if --debug flag is present
     4. Registers RabbitMQ exchanges
     5. Registers common signal handlers
+    6. Sets up action, runner type and datastore caches
 
     :param service: Name of the service.
     :param config: Config object to use to parse args.
@@ -92,6 +96,15 @@ def setup(service, config, setup_db=True, register_mq_exchanges=True,
     if register_signal_handlers:
         register_common_signal_handlers()
 
+    if setup_caches and cfg.CONF.action_cache.enable:
+        action_cache.setup()
+
+    if setup_caches and cfg.CONF.datastore_cache.enable:
+        keyvalue_cache.setup()
+
+    if setup_caches and cfg.CONF.policy_cache.enable:
+        policy_cache.setup()
+
     # TODO: This is a "not so nice" workaround until we have a proper migration system in place
     if run_migrations:
         insert_system_roles()
@@ -106,6 +119,9 @@ def teardown():
     """
     Common teardown function.
     """
+    action_cache.teardown()
+    keyvalue_cache.teardown()
+    policy_cache.teardown()
     db_teardown()
 
 
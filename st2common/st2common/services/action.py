@@ -42,10 +42,31 @@ def _get_immutable_params(parameters):
     return [k for k, v in six.iteritems(parameters) if v.get('immutable', False)]
 
 
-def request(liveaction):
+def request(liveaction, trace_db=None, rule_db=None, trigger_instance_db=None,
+            trigger_db=None, trigger_type_db=None):
     """
     Request an action execution.
 
+    Objects referenced by the liveaction context which the caller has already loaded (e.g. the
+    rules engine) can be passed in so they don't need to be retrieved from the database again.
+    Creating an execution results in two document writes (liveaction and execution), parent
+    execution and an existing trace are updated using atomic $push updates.
+
+    :param trace_db: Trace the execution belongs to.
+    :type trace_db: ``TraceDB``
+
+    :param rule_db: Rule referenced in the liveaction context.
+    :type rule_db: ``RuleDB``
+
+    :param trigger_instance_db: Trigger instance referenced in the liveaction context.
+    :type trigger_instance_db: ``TriggerInstanceDB``
+
+    :param trigger_db: Trigger of the trigger instance.
+    :type trigger_db: ``TriggerDB``
+
+    :param trigger_type_db: Trigger type of the trigger.
+    :type trigger_type_db: ``TriggerTypeDB``
+
     :return: (liveaction, execution)
     :rtype: tuple
     """
@@ -99,14 +120,20 @@ def request(liveaction):
 
     # Get trace_db if it exists. This could throw. If it throws, we have to cleanup
     # liveaction object so we don't see things in requested mode.
-    trace_db = None
-    try:
-        _, trace_db = trace_service.get_trace_db_by_live_action(liveaction)
-    except StackStormDBObjectNotFoundError as e:
-        _cleanup_liveaction(liveaction)
-        raise TraceNotFoundException(str(e))
-
-    execution = executions.create_execution_object(liveaction, publish=False)
+    if not trace_db:
+        try:
+            _, trace_db = trace_service.get_trace_db_by_live_action(liveaction)
+        except StackStormDBObjectNotFoundError as e:
+            _cleanup_liveaction(liveaction)
+            raise TraceNotFoundException(str(e))
+
+    execution = executions.create_execution_object(liveaction, publish=False,
+                                                   action_db=action_db,
+                                                   runnertype_db=runnertype_db,
+                                                   rule_db=rule_db,
+                                                   trigger_instance_db=trigger_instance_db,
+                                                   trigger_db=trigger_db,
+                                                   trigger_type_db=trigger_type_db)
 
     if trace_db:
         trace_service.add_or_update_given_trace_db(
@@ -0,0 +1,237 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide cache for action and runner type definitions.
+
+Action and runner type definitions are looked up multiple times for every execution, but they
+change rarely. The cache is only used once ``setup()`` has been called. ``setup()`` also starts a
+watcher which keeps the cache in sync with the database using the action and runner type CUD
+events so the cache entries are updated as soon as a definition is changed. Entry TTL only acts
+as a safety net in case an event is missed.
+
+Note: Cached objects are shared so callers need to treat them as read-only.
+"""
+
+import uuid
+
+import eventlet
+from kombu import Connection
+from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.transport import action as action_transport
+from st2common.transport import publishers, serializers
+from st2common.transport import utils as transport_utils
+from st2common.util.cache import LRUCache
+
+__all__ = [
+    'ActionCacheWatcher',
+
+    'setup',
+    'teardown',
+    'is_enabled',
+    'get_stats',
+
+    'get_action',
+    'set_action',
+    'invalidate_action',
+
+    'get_runnertype',
+    'set_runnertype',
+    'invalidate_runnertype'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Action ref -> ActionDB
+_ACTION_CACHE = None
+
+# RunnerType name -> RunnerTypeDB
+_RUNNERTYPE_CACHE = None
+
+# Maps object id to the cache key so entries can be invalidated when a name or ref changes
+_ACTION_REFS = {}
+_RUNNERTYPE_NAMES = {}
+
+_WATCHER = None
+
+
+class ActionCacheWatcher(ConsumerMixin):
+    """
+    Listens for action and runner type CUD events and updates the cache accordingly.
+    """
+
+    def __init__(self):
+        self.connection = None
+        self._updates_thread = None
+
+        queue_suffix = uuid.uuid4().hex[-10:]
+        self._action_q = action_transport.get_action_cud_queue(
+            name='st2.action.cache.%s' % (queue_suffix), routing_key='#', exclusive=True)
+        self._runnertype_q = action_transport.get_runnertype_cud_queue(
+            name='st2.runnertype.cache.%s' % (queue_suffix), routing_key='#', exclusive=True)
+
+    def get_consumers(self, Consumer, channel):
+        return [
+            Consumer(queues=[self._action_q], accept=serializers.ACCEPTED_SERIALIZERS,
+                     callbacks=[self.process_action_task]),
+            Consumer(queues=[self._runnertype_q], accept=serializers.ACCEPTED_SERIALIZERS,
+                     callbacks=[self.process_runnertype_task])
+        ]
+
+    def process_action_task(self, body, message):
+        self._process_task(body=body, message=message, set_func=set_action,
+                           invalidate_func=invalidate_action)
+
+    def process_runnertype_task(self, body, message):
+        self._process_task(body=body, message=message, set_func=set_runnertype,
+                           invalidate_func=invalidate_runnertype)
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start action cache watcher.')
+            self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+    def _process_task(self, body, message, set_func, invalidate_func):
+        routing_key = message.delivery_info.get('routing_key', '')
+
+        try:
+            # Invalidate first so a renamed object doesn't leave a stale entry behind
+            invalidate_func(body)
+
+            if routing_key in [publishers.CREATE_RK, publishers.UPDATE_RK]:
+                set_func(body)
+        except Exception:
+            LOG.exception('Failed to update action cache. Message body: %s', body)
+        finally:
+            message.ack()
+
+
+def setup():
+    """
+    Enable the cache and start the watcher which keeps it in sync with the database.
+    """
+    global _ACTION_CACHE, _RUNNERTYPE_CACHE, _WATCHER
+
+    size = cfg.CONF.action_cache.size
+    ttl = cfg.CONF.action_cache.ttl
+
+    _ACTION_CACHE = LRUCache(max_size=size, ttl=ttl)
+    _RUNNERTYPE_CACHE = LRUCache(max_size=size, ttl=ttl)
+
+    _WATCHER = ActionCacheWatcher()
+    _WATCHER.start()
+
+
+def teardown():
+    global _ACTION_CACHE, _RUNNERTYPE_CACHE, _WATCHER
+
+    if _WATCHER:
+        _WATCHER.stop()
+
+    if is_enabled():
+        LOG.debug('Action cache stats: %s', get_stats())
+
+    _ACTION_CACHE = None
+    _RUNNERTYPE_CACHE = None
+    _WATCHER = None
+    _ACTION_REFS.clear()
+    _RUNNERTYPE_NAMES.clear()
+
+
+def is_enabled():
+    return _ACTION_CACHE is not None
+
+
+def get_stats():
+    """
+    Return hit / miss statistics for action and runner type caches.
+
+    :rtype: ``dict``
+    """
+    if not is_enabled():
+        return {}
+
+    return {
+        'action': _ACTION_CACHE.get_stats(),
+        'runnertype': _RUNNERTYPE_CACHE.get_stats()
+    }
+
+
+def get_action(ref):
+    if not is_enabled():
+        return None
+
+    return _ACTION_CACHE.get(ref)
+
+
+def set_action(action_db):
+    if not is_enabled():
+        return
+
+    _ACTION_REFS[str(action_db.id)] = action_db.ref
+    _ACTION_CACHE.set(action_db.ref, action_db)
+
+
+def invalidate_action(action_db):
+    if not is_enabled():
+        return
+
+    ref = _ACTION_REFS.pop(str(action_db.id), None)
+
+    if ref:
+        _ACTION_CACHE.delete(ref)
+
+    _ACTION_CACHE.delete(action_db.ref)
+
+
+def get_runnertype(name):
+    if not is_enabled():
+        return None
+
+    return _RUNNERTYPE_CACHE.get(name)
+
+
+def set_runnertype(runnertype_db):
+    if not is_enabled():
+        return
+
+    _RUNNERTYPE_NAMES[str(runnertype_db.id)] = runnertype_db.name
+    _RUNNERTYPE_CACHE.set(runnertype_db.name, runnertype_db)
+
+
+def invalidate_runnertype(runnertype_db):
+    if not is_enabled():
+        return
+
+    name = _RUNNERTYPE_NAMES.pop(str(runnertype_db.id), None)
+
+    if name:
+        _RUNNERTYPE_CACHE.delete(name)
+
+    _RUNNERTYPE_CACHE.delete(runnertype_db.name)
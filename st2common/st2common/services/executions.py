@@ -34,7 +34,6 @@ from st2common.util import reference
 import st2common.util.action_db as action_utils
 from st2common.constants.action import LIVEACTION_STATUS_CANCELED
 from st2common.persistence.execution import ActionExecution
-from st2common.persistence.runner import RunnerType
 from st2common.persistence.rule import Rule
 from st2common.persistence.trigger import TriggerType, Trigger, TriggerInstance
 from st2common.models.api.action import RunnerTypeAPI, ActionAPI, LiveActionAPI
@@ -71,33 +70,50 @@ def _decompose_liveaction(liveaction_db):
     return decomposed
 
 
-def create_execution_object(liveaction, publish=True):
-    action_db = action_utils.get_action_by_ref(liveaction.action)
-    runner = RunnerType.get_by_name(action_db.runner_type['name'])
+def create_execution_object(liveaction, publish=True, action_db=None, runnertype_db=None,
+                            rule_db=None, trigger_instance_db=None, trigger_db=None,
+                            trigger_type_db=None):
+    """
+    Create an ActionExecution for the provided liveaction.
+
+    Objects referenced by the liveaction which the caller has already loaded can be passed in to
+    avoid additional database lookups.
+
+    :rtype: ``ActionExecutionDB``
+    """
+    if not action_db:
+        action_db = action_utils.get_action_by_ref(liveaction.action)
+
+    if not runnertype_db:
+        runnertype_db = action_utils.get_runnertype_by_name(action_db.runner_type['name'])
 
     attrs = {
         'action': vars(ActionAPI.from_model(action_db)),
-        'runner': vars(RunnerTypeAPI.from_model(runner))
+        'runner': vars(RunnerTypeAPI.from_model(runnertype_db))
     }
     attrs.update(_decompose_liveaction(liveaction))
 
     if 'rule' in liveaction.context:
-        rule = reference.get_model_from_ref(Rule, liveaction.context.get('rule', {}))
-        attrs['rule'] = vars(RuleAPI.from_model(rule))
+        if not rule_db:
+            rule_db = reference.get_model_from_ref(Rule, liveaction.context.get('rule', {}))
+        attrs['rule'] = vars(RuleAPI.from_model(rule_db))
 
     if 'trigger_instance' in liveaction.context:
-        trigger_instance_id = liveaction.context.get('trigger_instance', {})
-        trigger_instance_id = trigger_instance_id.get('id', None)
-        trigger_instance = TriggerInstance.get_by_id(trigger_instance_id)
-        trigger = reference.get_model_by_resource_ref(db_api=Trigger,
-                                                      ref=trigger_instance.trigger)
-        trigger_type = reference.get_model_by_resource_ref(db_api=TriggerType,
-                                                           ref=trigger.type)
-        trigger_instance = reference.get_model_from_ref(
-            TriggerInstance, liveaction.context.get('trigger_instance', {}))
-        attrs['trigger_instance'] = vars(TriggerInstanceAPI.from_model(trigger_instance))
-        attrs['trigger'] = vars(TriggerAPI.from_model(trigger))
-        attrs['trigger_type'] = vars(TriggerTypeAPI.from_model(trigger_type))
+        if not trigger_instance_db:
+            trigger_instance_db = reference.get_model_from_ref(
+                TriggerInstance, liveaction.context.get('trigger_instance', {}))
+
+        if not trigger_db:
+            trigger_db = reference.get_model_by_resource_ref(db_api=Trigger,
+                                                             ref=trigger_instance_db.trigger)
+
+        if not trigger_type_db:
+            trigger_type_db = reference.get_model_by_resource_ref(db_api=TriggerType,
+                                                                  ref=trigger_db.type)
+
+        attrs['trigger_instance'] = vars(TriggerInstanceAPI.from_model(trigger_instance_db))
+        attrs['trigger'] = vars(TriggerAPI.from_model(trigger_db))
+        attrs['trigger_type'] = vars(TriggerTypeAPI.from_model(trigger_type_db))
 
     parent = _get_parent_execution(liveaction)
     if parent:
@@ -108,8 +124,8 @@ def create_execution_object(liveaction, publish=True):
 
     if parent:
         if str(execution.id) not in parent.children:
-            parent.children.append(str(execution.id))
-            ActionExecution.add_or_update(parent)
+            # Atomic $push instead of re-writing the whole parent document
+            ActionExecution.push_child(parent, str(execution.id))
 
     return execution
 
@@ -128,11 +144,22 @@ def _get_parent_execution(child_liveaction_db):
 
 
 def update_execution(liveaction_db, publish=True):
+    """
+    Update the ActionExecution corresponding to the provided liveaction.
+
+    Only the fields whose value has changed (e.g. status, end_timestamp and result on a status
+    transition) are written to the database.
+    """
     execution = ActionExecution.get(liveaction__id=str(liveaction_db.id))
     decomposed = _decompose_liveaction(liveaction_db)
+
+    dirty_fields = []
     for k, v in six.iteritems(decomposed):
-        setattr(execution, k, v)
-    execution = ActionExecution.add_or_update(execution, publish=publish)
+        if getattr(execution, k, None) != v:
+            setattr(execution, k, v)
+            dirty_fields.append(k)
+
+    execution = ActionExecution.update_fields(execution, fields=dirty_fields, publish=publish)
     return execution
 
 
@@ -168,34 +195,66 @@ class DFSDescendantView(object):
         return self._result
 
 
+# Fields which are always retrieved when retrieving descendants
+DESCENDANT_TREE_FIELDS = ['id', 'parent', 'children', 'start_timestamp']
+
 DESCENDANT_VIEWS = {
     'sorted': AscendingSortedDescendantView,
     'default': DFSDescendantView
 }
 
 
-def get_descendants(actionexecution_id, descendant_depth=-1, result_fmt=None):
+def get_descendants(actionexecution_id, descendant_depth=-1, result_fmt=None,
+                    exclude_fields=None, only_fields=None):
     """
     Returns all descendant executions upto the specified descendant_depth for
     the supplied actionexecution_id.
+
+    Descendants are retrieved using a single query per level of the tree and the tree is then
+    traversed in memory.
+
+    :param exclude_fields: A list of fields to exclude from the returned executions.
+    :type exclude_fields: ``list``
+
+    :param only_fields: If provided, only those fields are retrieved for the returned executions.
+    :type only_fields: ``list``
     """
+    if only_fields:
+        # Those fields are needed to build the tree
+        only_fields = list(only_fields) + [field for field in DESCENDANT_TREE_FIELDS
+                                           if field not in only_fields]
+
+    if exclude_fields:
+        exclude_fields = [field for field in exclude_fields
+                          if field not in DESCENDANT_TREE_FIELDS]
+
+    # Parent id -> children sorted by start_timestamp
+    children_by_parent = {}
+
+    parent_ids = [actionexecution_id]
+    level = 0
+
+    while parent_ids and (descendant_depth <= 0 or level < descendant_depth):
+        level += 1
+        children = ActionExecution.query(parent__in=parent_ids, order_by=['start_timestamp'],
+                                         exclude_fields=exclude_fields, only_fields=only_fields)
+        LOG.debug('Found %s descendants on level %s for id %s.', len(children), level,
+                  actionexecution_id)
+
+        parent_ids = []
+        for child in children:
+            children_by_parent.setdefault(child.parent, []).append(child)
+
+            if child.children:
+                parent_ids.append(str(child.id))
+
+    # DFS using a stack so each execution is only visited once
     descendants = DESCENDANT_VIEWS.get(result_fmt, DFSDescendantView)()
-    children = ActionExecution.query(parent=actionexecution_id,
-                                     **{'order_by': ['start_timestamp']})
-    LOG.debug('Found %s children for id %s.', len(children), actionexecution_id)
-    current_level = [(child, 1) for child in children]
-
-    while current_level:
-        parent, level = current_level.pop(0)
-        parent_id = str(parent.id)
-        descendants.add(parent)
-        if not parent.children:
-            continue
-        if level != -1 and level == descendant_depth:
-            continue
-        children = ActionExecution.query(parent=parent_id, **{'order_by': ['start_timestamp']})
-        LOG.debug('Found %s children for id %s.', len(children), parent_id)
-        # prepend for DFS
-        for idx in range(len(children)):
-            current_level.insert(idx, (children[idx], level + 1))
+    stack = list(reversed(children_by_parent.get(actionexecution_id, [])))
+
+    while stack:
+        execution = stack.pop()
+        descendants.add(execution)
+        stack.extend(reversed(children_by_parent.get(str(execution.id), [])))
+
     return descendants.result
@@ -0,0 +1,220 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide cache for datastore key value pairs.
+
+Datastore values referenced in templates (``{{system.key}}``) are looked up every time a rule,
+an action chain or a set of action parameters is rendered. The cache is only used once
+``setup()`` has been called. ``setup()`` also starts a watcher which keeps the cache in sync with
+the database using the key value pair CUD events. Lookups for keys which don't exist are cached
+as well so they don't result in a database query every time. Entry TTL only acts as a safety net
+in case an event is missed.
+
+Items which have ``expire_timestamp`` set are treated as missing as soon as they expire, even if
+the database hasn't removed them yet.
+"""
+
+import uuid
+
+import eventlet
+from kombu import Connection
+from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.transport import keyvalue as keyvalue_transport
+from st2common.transport import publishers, serializers
+from st2common.transport import utils as transport_utils
+from st2common.util import date as date_utils
+from st2common.util.cache import LRUCache
+
+__all__ = [
+    'KeyValuePairCacheWatcher',
+
+    'setup',
+    'teardown',
+    'is_enabled',
+    'get_stats',
+
+    'get_item',
+    'set_item',
+    'set_missing',
+    'invalidate_item'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Key name -> (value, expire_timestamp). Value is None for keys which don't exist.
+_CACHE = None
+
+# Maps object id to the key name so entries can be invalidated when a name changes
+_NAMES = {}
+
+_WATCHER = None
+
+
+class KeyValuePairCacheWatcher(ConsumerMixin):
+    """
+    Listens for key value pair CUD events and updates the cache accordingly.
+    """
+
+    def __init__(self):
+        self.connection = None
+        self._updates_thread = None
+
+        queue_suffix = uuid.uuid4().hex[-10:]
+        self._kvp_q = keyvalue_transport.get_keyvaluepair_cud_queue(
+            name='st2.keyvalue.cache.%s' % (queue_suffix), routing_key='#', exclusive=True)
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=[self._kvp_q], accept=serializers.ACCEPTED_SERIALIZERS,
+                         callbacks=[self.process_task])]
+
+    def process_task(self, body, message):
+        routing_key = message.delivery_info.get('routing_key', '')
+
+        try:
+            # Invalidate first so a renamed item doesn't leave a stale entry behind
+            invalidate_item(body)
+
+            if routing_key in [publishers.CREATE_RK, publishers.UPDATE_RK]:
+                set_item(body)
+            elif routing_key == publishers.DELETE_RK:
+                set_missing(body.name)
+        except Exception:
+            LOG.exception('Failed to update datastore cache. Message body: %s', body)
+        finally:
+            message.ack()
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start datastore cache watcher.')
+            self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+
+def setup():
+    """
+    Enable the cache and start the watcher which keeps it in sync with the database.
+    """
+    global _CACHE, _WATCHER
+
+    _CACHE = LRUCache(max_size=cfg.CONF.datastore_cache.size, ttl=cfg.CONF.datastore_cache.ttl)
+
+    _WATCHER = KeyValuePairCacheWatcher()
+    _WATCHER.start()
+
+
+def teardown():
+    global _CACHE, _WATCHER
+
+    if _WATCHER:
+        _WATCHER.stop()
+
+    if is_enabled():
+        LOG.debug('Datastore cache stats: %s', get_stats())
+
+    _CACHE = None
+    _WATCHER = None
+    _NAMES.clear()
+
+
+def is_enabled():
+    return _CACHE is not None
+
+
+def get_stats():
+    """
+    Return hit / miss statistics for the datastore cache.
+
+    :rtype: ``dict``
+    """
+    if not is_enabled():
+        return {}
+
+    return _CACHE.get_stats()
+
+
+def get_item(name):
+    """
+    Retrieve cached value for the provided key.
+
+    :return: Tuple of (cached, value). ``value`` is None if the key is known not to exist.
+    :rtype: ``tuple``
+    """
+    if not is_enabled():
+        return (False, None)
+
+    entry = _CACHE.get(name)
+
+    if entry is None:
+        return (False, None)
+
+    value, expire_timestamp = entry
+
+    if expire_timestamp and _is_expired(expire_timestamp):
+        # Item has expired, but the database might not have removed it yet
+        _CACHE.set(name, (None, None))
+        return (True, None)
+
+    return (True, value)
+
+
+def set_item(kvp_db):
+    if not is_enabled():
+        return
+
+    _NAMES[str(kvp_db.id)] = kvp_db.name
+    _CACHE.set(kvp_db.name, (kvp_db.value, getattr(kvp_db, 'expire_timestamp', None)))
+
+
+def set_missing(name):
+    """
+    Record that the key with the provided name doesn't exist.
+    """
+    if not is_enabled():
+        return
+
+    _CACHE.set(name, (None, None))
+
+
+def invalidate_item(kvp_db):
+    if not is_enabled():
+        return
+
+    name = _NAMES.pop(str(kvp_db.id), None)
+
+    if name:
+        _CACHE.delete(name)
+
+    _CACHE.delete(kvp_db.name)
+
+
+def _is_expired(expire_timestamp):
+    if not expire_timestamp.tzinfo:
+        expire_timestamp = date_utils.add_utc_tz(expire_timestamp)
+
+    return expire_timestamp <= date_utils.get_datetime_utc_now()
@@ -13,7 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import six
+
+from st2common.constants.system import SYSTEM_KV_PREFIX
 from st2common.persistence.keyvalue import KeyValuePair
+from st2common.services import keyvalue_cache
+from st2common.util import jinja as jinja_utils
+
+__all__ = [
+    'KeyValueLookup',
+
+    'get_referenced_keys',
+    'get_key_value_lookup'
+]
 
 
 class KeyValueLookup(object):
@@ -33,11 +45,43 @@ class KeyValueLookup(object):
     def __getattr__(self, name):
         return self._get(name)
 
+    def prefetch(self, names):
+        """
+        Retrieve values for the provided keys using a single database query.
+
+        Keys which are already present in the process wide datastore cache are not queried.
+
+        :param names: Names of the keys to retrieve.
+        :type names: ``list``
+        """
+        names = [name for name in names if name not in self._value_cache]
+        query_names = []
+
+        for name in names:
+            cached, value = keyvalue_cache.get_item(name)
+
+            if cached:
+                self._value_cache[name] = value if value is not None else ''
+            else:
+                query_names.append(name)
+
+        if not query_names:
+            return
+
+        for kvp in KeyValuePair.query(name__in=query_names):
+            keyvalue_cache.set_item(kvp)
+            self._value_cache[kvp.name] = kvp.value
+
+        for name in query_names:
+            if name not in self._value_cache:
+                keyvalue_cache.set_missing(name)
+                self._value_cache[name] = ''
+
     def _get(self, name):
         # get the value for this key and save in value_cache
         key = '%s.%s' % (self._key_prefix, name) if self._key_prefix else name
-        value = self._get_kv(key)
-        self._value_cache[key] = value
+        if key not in self._value_cache:
+            self._value_cache[key] = self._get_kv(key)
         # return a KeyValueLookup as response since the lookup may not be complete e.g. if
         # the lookup is for 'key_base.key_value' it is likely that the calling code, e.g. Jinja,
         # will expect to do a dictionary style lookup for key_base and key_value as subsequent
@@ -45,12 +89,78 @@ class KeyValueLookup(object):
         return KeyValueLookup(key, self._value_cache)
 
     def _get_kv(self, key):
+        cached, value = keyvalue_cache.get_item(key)
+        if cached:
+            return value if value is not None else ''
+
         kvp = None
         try:
             kvp = KeyValuePair.get_by_name(key)
         except ValueError:
             # ValueErrors are expected in case of partial lookups
             pass
+
+        if kvp:
+            keyvalue_cache.set_item(kvp)
+        else:
+            keyvalue_cache.set_missing(key)
+
         # A good default value for un-matched value is empty string since that will be used
         # for rendering templates.
         return kvp.value if kvp else ''
+
+
+def get_referenced_keys(values):
+    """
+    Return names of the datastore keys which are referenced in the provided template(s).
+
+    Keys are found by statically analyzing the templates so only lookups which don't use a
+    dynamic key are returned. For ``{{system.a.b}}`` both ``a`` and ``a.b`` are returned since
+    the lookup resolves the key one level at a time.
+
+    :param values: Template string or a (nested) dict / list which contains template strings.
+
+    :rtype: ``set``
+    """
+    keys = set()
+
+    if isinstance(values, dict):
+        for value in six.itervalues(values):
+            keys.update(get_referenced_keys(value))
+    elif isinstance(values, (list, tuple)):
+        for value in values:
+            keys.update(get_referenced_keys(value))
+    elif isinstance(values, six.string_types) and jinja_utils.is_template(values):
+        if SYSTEM_KV_PREFIX not in values:
+            return keys
+
+        try:
+            paths = jinja_utils.get_attribute_paths(values, SYSTEM_KV_PREFIX)
+        except Exception:
+            # Invalid templates are reported when they are rendered
+            return keys
+
+        for path in paths:
+            for index in range(1, len(path) + 1):
+                keys.add('.'.join(path[:index]))
+
+    return keys
+
+
+def get_key_value_lookup(values=None):
+    """
+    Return a KeyValueLookup with all the keys referenced in the provided template(s) prefetched.
+
+    :param values: Template string or a (nested) dict / list which contains template strings.
+
+    :rtype: :class:`KeyValueLookup`
+    """
+    lookup = KeyValueLookup()
+
+    if values:
+        keys = get_referenced_keys(values)
+
+        if keys:
+            lookup.prefetch(keys)
+
+    return lookup
@@ -0,0 +1,168 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide watcher which notifies code waiting for live actions to complete.
+
+Instead of polling the database, waiters subscribe to the live action they are interested in
+and are woken up as soon as the watcher receives a status message for it. Database is only
+polled (with backoff) as a fallback in case a message has been missed.
+"""
+
+import uuid
+
+import eventlet
+from eventlet import queue
+from kombu import Connection
+from kombu.mixins import ConsumerMixin
+
+from st2common import log as logging
+from st2common.constants import action as action_constants
+from st2common.transport import liveaction as liveaction_transport
+from st2common.transport import serializers
+from st2common.transport import utils as transport_utils
+from st2common.util import action_db as action_utils
+
+__all__ = [
+    'LiveActionCompletionWatcher',
+
+    'get_watcher',
+    'wait_for_completion'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Fallback database polling interval bounds in seconds
+POLL_INTERVAL_MIN = 1
+POLL_INTERVAL_MAX = 10
+
+_WATCHER = None
+
+
+class LiveActionCompletionWatcher(ConsumerMixin):
+    """
+    Listens for live action status messages of the completed states and forwards them to the
+    subscribers.
+    """
+
+    def __init__(self):
+        self.connection = None
+        self._updates_thread = None
+
+        # Live action id -> list of subscriber queues
+        self._subscribers = {}
+
+        queue_suffix = uuid.uuid4().hex[-10:]
+        self._status_q = liveaction_transport.get_status_management_queue(
+            name='st2.liveaction.completion.%s' % (queue_suffix),
+            routing_key=action_constants.COMPLETED_STATES, exclusive=True)
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=[self._status_q], accept=serializers.ACCEPTED_SERIALIZERS,
+                         callbacks=[self.process_task])]
+
+    def process_task(self, body, message):
+        try:
+            for subscriber in self._subscribers.get(str(body.id), []):
+                subscriber.put(body)
+        except Exception:
+            LOG.exception('Failed to notify subscribers. Message body: %s', body)
+        finally:
+            message.ack()
+
+    def subscribe(self, liveaction_id):
+        """
+        Subscribe to the status messages of the provided live action.
+
+        :rtype: :class:`eventlet.queue.LightQueue`
+        """
+        subscriber = queue.LightQueue()
+        self._subscribers.setdefault(liveaction_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, liveaction_id, subscriber):
+        subscribers = self._subscribers.get(liveaction_id, [])
+
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+
+        if not subscribers:
+            self._subscribers.pop(liveaction_id, None)
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start live action completion watcher.')
+            self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+
+def get_watcher():
+    """
+    Return the watcher for this process, starting it on first use.
+    """
+    global _WATCHER
+
+    if not _WATCHER:
+        _WATCHER = LiveActionCompletionWatcher()
+        _WATCHER.start()
+
+    return _WATCHER
+
+
+def wait_for_completion(liveaction_id, states=None):
+    """
+    Block the current green thread until the provided live action reaches one of the states.
+
+    :param states: States to wait for. Defaults to all the completed states.
+    :type states: ``list``
+
+    :rtype: :class:`LiveActionDB`
+    """
+    states = states or action_constants.COMPLETED_STATES
+    liveaction_id = str(liveaction_id)
+
+    watcher = get_watcher()
+    subscriber = watcher.subscribe(liveaction_id)
+
+    try:
+        # Live action could have completed before we subscribed
+        liveaction_db = action_utils.get_liveaction_by_id(liveaction_id)
+        interval = POLL_INTERVAL_MIN
+
+        while liveaction_db.status not in states:
+            try:
+                message = subscriber.get(timeout=interval)
+            except queue.Empty:
+                # Fall back to polling in case a message has been missed
+                interval = min(interval * 2, POLL_INTERVAL_MAX)
+                liveaction_db = action_utils.get_liveaction_by_id(liveaction_id)
+                continue
+
+            if message.status in states:
+                liveaction_db = action_utils.get_liveaction_by_id(liveaction_id)
+    finally:
+        watcher.unsubscribe(liveaction_id, subscriber)
+
+    return liveaction_db
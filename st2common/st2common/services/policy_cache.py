@@ -0,0 +1,264 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide index of policies and their instantiated drivers keyed by the resource reference.
+
+Policies are looked up for every execution which is scheduled and completed, but they change
+rarely. The index is only used once ``setup()`` has been called. It's loaded using a single query
+on first use and kept in sync with the database using the policy CUD events. The whole index is
+reloaded after ``ttl`` seconds in case an event is missed.
+
+Note: Drivers are shared between callers so they need to be stateless.
+"""
+
+import time
+import uuid
+
+import eventlet
+from kombu import Connection
+from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common import policies
+from st2common.persistence.policy import Policy
+from st2common.transport import policy as policy_transport
+from st2common.transport import publishers, serializers
+from st2common.transport import utils as transport_utils
+
+__all__ = [
+    'PolicyCacheWatcher',
+
+    'setup',
+    'teardown',
+    'is_enabled',
+
+    'get_drivers',
+    'set_policy',
+    'invalidate_policy'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Resource ref -> list of (PolicyDB, driver) tuples
+_INDEX = None
+
+# Time when the index has been loaded
+_INDEX_LOADED_AT = None
+
+# Policy id -> resource ref
+_RESOURCE_REFS = {}
+
+# Makes sure only one caller at a time loads the index from the database
+_LOAD_LOCK = eventlet.semaphore.Semaphore()
+
+# Policy CUD events received while the index is being loaded. Each load collects the events in
+# its own list and applies them to the new index once it has been loaded.
+_PENDING_EVENTS = []
+
+_ENABLED = False
+_WATCHER = None
+
+
+class PolicyCacheWatcher(ConsumerMixin):
+    """
+    Listens for policy CUD events and updates the index accordingly.
+    """
+
+    def __init__(self):
+        self.connection = None
+        self._updates_thread = None
+
+        queue_suffix = uuid.uuid4().hex[-10:]
+        self._policy_q = policy_transport.get_policy_cud_queue(
+            name='st2.policy.cache.%s' % (queue_suffix), routing_key='#', exclusive=True)
+
+    def get_consumers(self, Consumer, channel):
+        return [
+            Consumer(queues=[self._policy_q], accept=serializers.ACCEPTED_SERIALIZERS,
+                     callbacks=[self.process_task])
+        ]
+
+    def process_task(self, body, message):
+        routing_key = message.delivery_info.get('routing_key', '')
+
+        try:
+            invalidate_policy(body)
+
+            if routing_key in [publishers.CREATE_RK, publishers.UPDATE_RK]:
+                set_policy(body)
+        except Exception:
+            LOG.exception('Failed to update policy cache. Message body: %s', body)
+        finally:
+            message.ack()
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start policy cache watcher.')
+            self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+
+def setup():
+    """
+    Enable the cache and start the watcher which keeps it in sync with the database.
+    """
+    global _ENABLED, _WATCHER
+
+    _ENABLED = True
+    _WATCHER = PolicyCacheWatcher()
+    _WATCHER.start()
+
+
+def teardown():
+    global _ENABLED, _WATCHER
+
+    if _WATCHER:
+        _WATCHER.stop()
+
+    _ENABLED = False
+    _WATCHER = None
+    _reset_index()
+
+
+def is_enabled():
+    return _ENABLED
+
+
+def get_drivers(resource_ref):
+    """
+    Return policies and instantiated drivers for the provided resource.
+
+    If the cache is not enabled, policies are retrieved from the database and new drivers are
+    instantiated on every call.
+
+    :rtype: ``list`` of (``PolicyDB``, ``ResourcePolicyApplicator``) tuples
+    """
+    if not is_enabled():
+        return [(policy_db, _get_driver(policy_db))
+                for policy_db in Policy.query(resource_ref=resource_ref)]
+
+    # While the expired index is being reloaded, other callers keep using it instead of waiting
+    if _is_index_expired() and (_INDEX is None or not _LOAD_LOCK.locked()):
+        with _LOAD_LOCK:
+            # Index might have been loaded while waiting for the lock
+            if _is_index_expired():
+                _load_index()
+
+    return _INDEX.get(resource_ref, [])
+
+
+def set_policy(policy_db):
+    if not is_enabled():
+        return
+
+    for pending_events in _PENDING_EVENTS:
+        pending_events.append((_set_policy, policy_db))
+
+    if _INDEX is not None:
+        _set_policy(index=_INDEX, resource_refs=_RESOURCE_REFS, policy_db=policy_db)
+
+
+def invalidate_policy(policy_db):
+    if not is_enabled():
+        return
+
+    for pending_events in _PENDING_EVENTS:
+        pending_events.append((_invalidate_policy, policy_db))
+
+    if _INDEX is not None:
+        _invalidate_policy(index=_INDEX, resource_refs=_RESOURCE_REFS, policy_db=policy_db)
+
+
+def _set_policy(index, resource_refs, policy_db):
+    try:
+        driver = _get_driver(policy_db)
+    except Exception:
+        LOG.exception('Failed to instantiate driver for policy "%s".', policy_db.ref)
+        return
+
+    resource_refs[str(policy_db.id)] = policy_db.resource_ref
+    index.setdefault(policy_db.resource_ref, []).append((policy_db, driver))
+
+
+def _invalidate_policy(index, resource_refs, policy_db):
+    policy_id = str(policy_db.id)
+    resource_ref = resource_refs.pop(policy_id, None)
+
+    for ref in set([resource_ref, policy_db.resource_ref]):
+        entries = [entry for entry in index.get(ref, []) if str(entry[0].id) != policy_id]
+
+        if entries:
+            index[ref] = entries
+        else:
+            index.pop(ref, None)
+
+
+def _get_driver(policy_db):
+    return policies.get_driver(policy_db.ref, policy_db.policy_type, **policy_db.parameters)
+
+
+def _is_index_expired():
+    return _INDEX is None or time.time() - _INDEX_LOADED_AT > cfg.CONF.policy_cache.ttl
+
+
+def _load_index():
+    """
+    Load the index from the database.
+
+    New index is built on the side and swapped in once it's complete so the current index stays
+    usable and keeps receiving the updates while the policies are being retrieved.
+    """
+    global _INDEX, _INDEX_LOADED_AT, _RESOURCE_REFS
+
+    index = {}
+    resource_refs = {}
+    pending_events = []
+    _PENDING_EVENTS.append(pending_events)
+
+    try:
+        for policy_db in Policy.get_all():
+            _set_policy(index=index, resource_refs=resource_refs, policy_db=policy_db)
+
+        # Apply the events which were received while the policies were being retrieved
+        for func, policy_db in pending_events:
+            func(index=index, resource_refs=resource_refs, policy_db=policy_db)
+    finally:
+        _PENDING_EVENTS.remove(pending_events)
+
+    LOG.debug('Loaded %s policies for %s resources.', len(resource_refs), len(index))
+
+    _INDEX = index
+    _RESOURCE_REFS = resource_refs
+    _INDEX_LOADED_AT = time.time()
+
+
+def _reset_index():
+    global _INDEX, _INDEX_LOADED_AT, _RESOURCE_REFS
+
+    _INDEX = None
+    _INDEX_LOADED_AT = None
+    _RESOURCE_REFS = {}
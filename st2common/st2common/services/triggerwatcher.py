@@ -20,7 +20,7 @@ from kombu import Connection
 
 from st2common import log as logging
 from st2common.persistence.trigger import Trigger
-from st2common.transport import reactor, publishers
+from st2common.transport import reactor, publishers, serializers
 from st2common.transport import utils as transport_utils
 
 LOG = logging.getLogger(__name__)
@@ -66,7 +66,7 @@ class TriggerWatcher(ConsumerMixin):
 
     def get_consumers(self, Consumer, channel):
         return [Consumer(queues=[self._trigger_watch_q],
-                         accept=['pickle'],
+                         accept=serializers.ACCEPTED_SERIALIZERS,
                          callbacks=[self.process_task])]
 
     def process_task(self, body, message):
@@ -129,6 +129,13 @@ class TriggerWatcher(ConsumerMixin):
         eventlet.sleep(seconds=self.sleep_interval)
 
     def _load_triggers_from_db(self):
+        if not self._trigger_types:
+            # No trigger type filter, handler is interested in all the triggers
+            for trigger in Trigger.get_all():
+                LOG.debug('Found existing trigger: %s in db.' % trigger)
+                self._handlers[publishers.CREATE_RK](trigger)
+            return
+
         for trigger_type in self._trigger_types:
             for trigger in Trigger.query(type=trigger_type):
                 LOG.debug('Found existing trigger: %s in db.' % trigger)
@@ -14,16 +14,22 @@
 # limitations under the License.
 
 from st2common.transport import liveaction, actionexecutionstate, execution, publishers, reactor
+from st2common.transport import action, keyvalue, policy
+from st2common.transport import serializers
 from st2common.transport import bootstrap_utils, utils, connection_retry_wrapper
 
 # TODO(manas) : Exchanges, Queues and RoutingKey design discussion pending.
 
 __all__ = [
+    'action',
     'liveaction',
     'actionexecutionstate',
     'execution',
+    'keyvalue',
+    'policy',
     'publishers',
     'reactor',
+    'serializers',
     'bootstrap_utils',
     'utils',
     'connection_retry_wrapper'
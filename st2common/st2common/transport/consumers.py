@@ -14,12 +14,15 @@
 # limitations under the License.
 
 import abc
+import collections
+
 import eventlet
 import six
-
 from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
 
 from st2common import log as logging
+from st2common.transport import serializers
 from st2common.util.greenpooldispatch import BufferedDispatcher
 
 
@@ -27,31 +30,137 @@ LOG = logging.getLogger(__name__)
 
 
 class QueueConsumer(ConsumerMixin):
-    def __init__(self, connection, queues, handler):
+    def __init__(self, connection, queues, handler, prefetch_count=1, batch_acks=False,
+                 requeue_failed=False):
+        """
+        :param prefetch_count: Maximum number of unacknowledged messages the broker delivers to
+                               this consumer.
+        :type prefetch_count: ``int``
+
+        :param batch_acks: If True, messages are acknowledged in order and a contiguous run of
+                           processed messages is acknowledged using a single "multiple" ack.
+                           Otherwise each message is acknowledged as soon as it's processed.
+        :type batch_acks: ``bool``
+
+        :param requeue_failed: If True, a message which fails to process is re-queued once.
+                               Otherwise it's rejected without re-queueing.
+        :type requeue_failed: ``bool``
+        """
         self.connection = connection
-        self._dispatcher = BufferedDispatcher()
+        self._dispatcher = BufferedDispatcher(
+            name=handler.__class__.__name__,
+            stats_log_interval=cfg.CONF.messaging.dispatcher_stats_interval)
         self._queues = queues
         self._handler = handler
+        self._prefetch_count = prefetch_count
+        self._batch_acks = batch_acks
+        self._requeue_failed = requeue_failed
+
+        # Messages which have been received, but not acknowledged yet (in delivery order)
+        self._pending_messages = collections.deque()
+        self._processed_messages = set()
+        self._ack_lock = eventlet.semaphore.Semaphore()
 
     def shutdown(self):
         self._dispatcher.shutdown()
 
     def get_consumers(self, Consumer, channel):
-        consumer = Consumer(queues=self._queues, accept=['pickle'], callbacks=[self.process])
+        consumer = Consumer(queues=self._queues,
+                            accept=serializers.ACCEPTED_SERIALIZERS,
+                            callbacks=[self.process])
 
-        # use prefetch_count=1 for fair dispatch. This way workers that finish an item get the next
-        # task and the work does not get queued behind any single large item.
-        consumer.qos(prefetch_count=1)
+        # use prefetch_count=1 (default) for fair dispatch. This way workers that finish an item
+        # get the next task and the work does not get queued behind any single large item.
+        consumer.qos(prefetch_count=self._prefetch_count)
 
         return [consumer]
 
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        # Delivery tags are channel specific. Unacknowledged messages from a previous channel
+        # will be re-delivered by the broker.
+        self._pending_messages.clear()
+        self._processed_messages.clear()
+
     def process(self, body, message):
-        try:
-            self._dispatcher.dispatch(self._process_message, body)
-        finally:
+        if self._batch_acks:
+            self._pending_messages.append(message)
+
+        self._dispatcher.dispatch(self._process_message_and_ack, body, message)
+
+    def _process_message_and_ack(self, body, message):
+        # Message is only acknowledged after it has been processed successfully so it's
+        # re-delivered if the service dies while processing it.
+        succeeded = self._process_message(body)
+
+        with self._ack_lock:
+            try:
+                if succeeded:
+                    self._ack(message)
+                else:
+                    self._reject(message)
+            except Exception:
+                LOG.exception('%s failed to acknowledge message: %s',
+                              self.__class__.__name__, body)
+
+    def _ack(self, message):
+        if not self._batch_acks:
             message.ack()
+            return
+
+        self._processed_messages.add(id(message))
+        self._ack_processed_messages()
+
+    def _reject(self, message):
+        # If enabled, message which failed to process is re-queued once so transient failures
+        # (e.g. database not being available) are retried. Otherwise or if it fails again, it's
+        # rejected without re-queueing (the broker dead-letters it if the queue has a dead letter
+        # exchange configured) so a message which can't be processed doesn't get re-delivered
+        # forever.
+        requeue = self._requeue_failed and not message.delivery_info.get('redelivered', False)
+
+        if self._batch_acks and message in self._pending_messages:
+            # Rejected message is settled and must not be covered by a later "multiple" ack
+            self._pending_messages.remove(message)
+
+        LOG.warning('%s rejecting message (requeue=%s): %s', self.__class__.__name__, requeue,
+                    message.delivery_tag)
+        message.reject(requeue=requeue)
+
+        if self._batch_acks:
+            # Rejected message might have been blocking acknowledgement of the following ones
+            self._ack_processed_messages()
+
+    def _ack_processed_messages(self):
+        to_ack = []
+        while self._pending_messages and id(self._pending_messages[0]) in self._processed_messages:
+            pending_message = self._pending_messages.popleft()
+            self._processed_messages.discard(id(pending_message))
+            to_ack.append(pending_message)
+
+        if not to_ack:
+            return
+
+        if len(to_ack) == 1:
+            to_ack[0].ack()
+            return
+
+        # Single ack for all the messages up to and including the last one. Note: Message.ack
+        # doesn't support "multiple" acks in the kombu version we use so the channel is used
+        # directly and the covered messages are marked as acknowledged the same way Message.ack
+        # does it.
+        last_message = to_ack[-1]
+        last_message.channel.basic_ack(last_message.delivery_tag, multiple=True)
+
+        for acked_message in to_ack:
+            acked_message._state = 'ACK'
 
     def _process_message(self, body):
+        """
+        Process the message using the handler.
+
+        :return: True if the message has been processed successfully, False otherwise.
+        :rtype: ``bool``
+        """
         try:
             if not isinstance(body, self._handler.message_type):
                 raise TypeError('Received an unexpected type "%s" for payload.' % type(body))
@@ -59,14 +168,33 @@ class QueueConsumer(ConsumerMixin):
             self._handler.process(body)
         except:
             LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
+            return False
+
+        return True
 
 
 @six.add_metaclass(abc.ABCMeta)
 class MessageHandler(object):
     message_type = None
 
+    # Name of the service config group which holds the "prefetch_count" option
+    config_group = None
+
+    # True to acknowledge processed messages in order using "multiple" acks. Only suitable for
+    # handlers which process messages quickly since a slow message blocks acknowledgement of all
+    # the messages received after it.
+    batch_acks = False
+
+    # True to re-queue a message which fails to process once. Only suitable for handlers which
+    # can safely process the same message again (e.g. the processing has no side effects which
+    # are not reflected in the database before the failure).
+    requeue_failed = False
+
     def __init__(self, connection, queues):
-        self._queue_consumer = QueueConsumer(connection, queues, self)
+        self._queue_consumer = QueueConsumer(connection, queues, self,
+                                             prefetch_count=self._get_prefetch_count(),
+                                             batch_acks=self.batch_acks,
+                                             requeue_failed=self.requeue_failed)
         self._consumer_thread = None
 
     def start(self, wait=False):
@@ -86,3 +214,9 @@ class MessageHandler(object):
     @abc.abstractmethod
     def process(self, message):
         pass
+
+    def _get_prefetch_count(self):
+        if not self.config_group:
+            return 1
+
+        return getattr(cfg.CONF, self.config_group).prefetch_count
@@ -0,0 +1,42 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# All Exchanges and Queues related to datastore key value pairs.
+
+from kombu import Exchange, Queue
+
+from st2common.transport import publishers
+
+__all__ = [
+    'KeyValuePairCUDPublisher',
+
+    'get_keyvaluepair_cud_queue'
+]
+
+# Exchange for KeyValuePair CUD events
+KEY_VALUE_PAIR_CUD_XCHG = Exchange('st2.keyvalue', type='topic')
+
+
+class KeyValuePairCUDPublisher(publishers.CUDPublisher):
+    """
+    Publisher responsible for publishing KeyValuePair model CUD events.
+    """
+
+    def __init__(self, urls):
+        super(KeyValuePairCUDPublisher, self).__init__(urls, KEY_VALUE_PAIR_CUD_XCHG)
+
+
+def get_keyvaluepair_cud_queue(name, routing_key, exclusive=False):
+    return Queue(name, KEY_VALUE_PAIR_CUD_XCHG, routing_key=routing_key, exclusive=exclusive)
@@ -15,7 +15,7 @@
 
 # All Exchanges and Queues related to liveaction.
 
-from kombu import Exchange, Queue
+from kombu import Exchange, Queue, binding
 from st2common.transport import publishers
 
 
@@ -34,5 +34,10 @@ def get_queue(name, routing_key):
     return Queue(name, LIVEACTION_XCHG, routing_key=routing_key)
 
 
-def get_status_management_queue(name, routing_key):
-    return Queue(name, LIVEACTION_STATUS_MGMT_XCHG, routing_key=routing_key)
+def get_status_management_queue(name, routing_key, exclusive=False):
+    # Queue can be bound to multiple states at once
+    if isinstance(routing_key, (list, tuple)):
+        bindings = [binding(LIVEACTION_STATUS_MGMT_XCHG, routing_key=key) for key in routing_key]
+        return Queue(name, bindings=bindings, exclusive=exclusive)
+
+    return Queue(name, LIVEACTION_STATUS_MGMT_XCHG, routing_key=routing_key, exclusive=exclusive)
@@ -20,6 +20,7 @@ from kombu.messaging import Producer
 
 from st2common import log as logging
 from st2common.transport.connection_retry_wrapper import ConnectionRetryWrapper
+from st2common.transport import serializers
 
 ANY_RK = '*'
 CREATE_RK = 'create'
@@ -51,7 +52,7 @@ class PoolPublisher(object):
                     'body': payload,
                     'exchange': exchange,
                     'routing_key': routing_key,
-                    'serializer': 'pickle'
+                    'serializer': serializers.get_serializer()
                 }
                 retry_wrapper.ensured(connection=connection,
                                       obj=producer,
@@ -22,11 +22,13 @@ from st2common.transport import publishers
 from st2common.transport import utils as transport_utils
 
 __all__ = [
+    'RuleCUDPublisher',
     'TriggerCUDPublisher',
     'TriggerInstancePublisher',
 
     'TriggerDispatcher',
 
+    'get_rule_cud_queue',
     'get_sensor_cud_queue',
     'get_trigger_cud_queue',
     'get_trigger_instances_queue'
@@ -43,6 +45,9 @@ TRIGGER_INSTANCE_XCHG = Exchange('st2.trigger_instances_dispatch', type='topic')
 # Exchane for Sensor CUD events
 SENSOR_CUD_XCHG = Exchange('st2.sensor', type='topic')
 
+# Exchange for Rule CUD events
+RULE_CUD_XCHG = Exchange('st2.rule', type='topic')
+
 
 class SensorCUDPublisher(publishers.CUDPublisher):
     """
@@ -62,6 +67,15 @@ class TriggerCUDPublisher(publishers.CUDPublisher):
         super(TriggerCUDPublisher, self).__init__(urls, TRIGGER_CUD_XCHG)
 
 
+class RuleCUDPublisher(publishers.CUDPublisher):
+    """
+    Publisher responsible for publishing Rule model CUD events.
+    """
+
+    def __init__(self, urls):
+        super(RuleCUDPublisher, self).__init__(urls, RULE_CUD_XCHG)
+
+
 class TriggerInstancePublisher(object):
     def __init__(self, urls):
         self._publisher = publishers.PoolPublisher(urls=urls)
@@ -117,3 +131,7 @@ def get_trigger_instances_queue(name, routing_key):
 
 def get_sensor_cud_queue(name, routing_key):
     return Queue(name, SENSOR_CUD_XCHG, routing_key=routing_key)
+
+
+def get_rule_cud_queue(name, routing_key):
+    return Queue(name, RULE_CUD_XCHG, routing_key=routing_key)
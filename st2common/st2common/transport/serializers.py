@@ -0,0 +1,158 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Serializers (codecs) for messages which are sent over the message bus.
+
+Historically all the messages have been serialized using pickle. This module adds a compact,
+versioned JSON based serializer which is aware of the StackStorm database models. Model objects
+are encoded using their Mongo (SON) representation which means only fields which are set are
+included on the wire and the message can only be decoded into one of the known model classes.
+
+For rolling upgrades, consumers accept both serializers while publishers use the serializer
+configured using the ``messaging.serializer`` option (``pickle`` by default). Once all the
+services have been upgraded, the option can be switched to ``st2json``.
+"""
+
+import json
+
+import six
+from bson import json_util
+from kombu import serialization
+from oslo_config import cfg
+
+from st2common.models.api.trace import TraceContext
+
+__all__ = [
+    'PICKLE_SERIALIZER',
+    'JSON_SERIALIZER',
+    'ACCEPTED_SERIALIZERS',
+
+    'get_serializer',
+    'encode',
+    'decode',
+    'register_serializers'
+]
+
+PICKLE_SERIALIZER = 'pickle'
+JSON_SERIALIZER = 'st2json'
+JSON_CONTENT_TYPE = 'application/x-st2-json'
+
+# Serializers consumers accept. Both serializers are accepted to support rolling upgrades.
+ACCEPTED_SERIALIZERS = [PICKLE_SERIALIZER, JSON_SERIALIZER]
+
+# Version of the message format. Needs to be bumped on backward incompatible changes.
+FORMAT_VERSION = 1
+
+MODEL_KEY = '$st2_model'
+MODEL_DATA_KEY = '$st2_data'
+TRACE_CONTEXT_KEY = '$st2_trace_context'
+
+# Model class name -> model class, populated lazily
+_MODEL_CLASSES = {}
+
+
+def get_serializer():
+    """
+    Return name of the serializer which is used when publishing messages.
+
+    :rtype: ``str``
+    """
+    return cfg.CONF.messaging.serializer
+
+
+def encode(payload):
+    """
+    Encode the provided payload into a JSON string.
+
+    :rtype: ``str``
+    """
+    data = {
+        'v': FORMAT_VERSION,
+        'body': _encode_value(payload)
+    }
+    return json.dumps(data, default=json_util.default, separators=(',', ':'))
+
+
+def decode(data):
+    """
+    Decode the provided JSON string into the original payload.
+    """
+    if isinstance(data, six.binary_type):
+        data = data.decode('utf-8')
+
+    data = json.loads(data, object_hook=_object_hook)
+    version = data.get('v', None)
+
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported message format version: %s' % (version))
+
+    return data['body']
+
+
+def register_serializers():
+    serialization.register(JSON_SERIALIZER, encode, decode, content_type=JSON_CONTENT_TYPE,
+                           content_encoding='utf-8')
+
+
+def _encode_value(value):
+    if isinstance(value, dict):
+        return dict([(k, _encode_value(v)) for k, v in six.iteritems(value)])
+    elif isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    elif isinstance(value, TraceContext):
+        return {TRACE_CONTEXT_KEY: {'id_': value.id_, 'trace_tag': value.trace_tag}}
+    elif hasattr(value, 'to_mongo') and hasattr(value, '_from_son'):
+        model_cls = value.__class__.__name__
+
+        if model_cls not in _get_model_classes():
+            raise TypeError('Model class "%s" can\'t be serialized' % (model_cls))
+
+        return {MODEL_KEY: model_cls, MODEL_DATA_KEY: value.to_mongo()}
+
+    return value
+
+
+def _object_hook(value):
+    value = json_util.object_hook(value)
+
+    if not isinstance(value, dict):
+        return value
+
+    if MODEL_KEY in value:
+        model_cls = _get_model_classes().get(value[MODEL_KEY], None)
+
+        if not model_cls:
+            raise TypeError('Unknown model class "%s"' % (value[MODEL_KEY]))
+
+        return model_cls._from_son(value[MODEL_DATA_KEY])
+    elif TRACE_CONTEXT_KEY in value:
+        return TraceContext(**value[TRACE_CONTEXT_KEY])
+
+    return value
+
+
+def _get_model_classes():
+    if not _MODEL_CLASSES:
+        # Imported here to avoid a cyclic import
+        from st2common.models.db import get_model_classes
+
+        for model_cls in get_model_classes():
+            _MODEL_CLASSES[model_cls.__name__] = model_cls
+
+    return _MODEL_CLASSES
+
+
+register_serializers()
@@ -24,6 +24,7 @@ from st2common.exceptions.db import StackStormDBObjectNotFoundError
 from st2common.persistence.action import Action
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.runner import RunnerType
+from st2common.services import action_cache
 
 LOG = logging.getLogger(__name__)
 
@@ -75,7 +76,14 @@ def get_runnertype_by_name(runnertype_name):
     """
         Get an runnertype by name.
         On error, raise ST2ObjectNotFoundError.
+
+        Note: If the action cache is enabled, the returned object is shared and should be treated
+        as read-only.
     """
+    runnertype_db = action_cache.get_runnertype(runnertype_name)
+    if runnertype_db:
+        return runnertype_db
+
     try:
         runnertypes = RunnerType.query(name=runnertype_name)
     except (ValueError, ValidationError) as e:
@@ -92,6 +100,7 @@ def get_runnertype_by_name(runnertype_name):
         LOG.warning('More than one RunnerType returned from DB lookup by name. '
                     'Result list is: %s', runnertypes)
 
+    action_cache.set_runnertype(runnertypes[0])
     return runnertypes[0]
 
 
@@ -118,18 +127,30 @@ def get_action_by_ref(ref):
     """
     Returns the action object from db given a string ref.
 
+    Note: If the action cache is enabled, the returned object is shared and should be treated
+    as read-only.
+
     :param ref: Reference to the trigger type db object.
     :type ref: ``str``
 
     :rtype action: ``object``
     """
+    action_db = action_cache.get_action(ref)
+    if action_db:
+        return action_db
+
     try:
-        return Action.get_by_ref(ref)
+        action_db = Action.get_by_ref(ref)
     except ValueError as e:
         LOG.debug('Database lookup for ref="%s" resulted ' +
                   'in exception : %s.', ref, e, exc_info=True)
         return None
 
+    if action_db:
+        action_cache.set_action(action_db)
+
+    return action_db
+
 
 def get_liveaction_by_id(liveaction_id):
     """
@@ -179,20 +200,29 @@ def update_liveaction_status(status=None, result=None, context=None, end_timesta
 
     old_status = liveaction_db.status
     liveaction_db.status = status
+    dirty_fields = ['status']
 
     if result:
         liveaction_db.result = result
+        dirty_fields.append('result')
 
     if context:
         liveaction_db.context.update(context)
+        dirty_fields.append('context')
 
     if end_timestamp:
         liveaction_db.end_timestamp = end_timestamp
+        dirty_fields.append('end_timestamp')
 
     if runner_info:
         liveaction_db.runner_info = runner_info
+        dirty_fields.append('runner_info')
 
-    liveaction_db = LiveAction.add_or_update(liveaction_db)
+    # Only persist the fields which have been updated
+    if liveaction_db.id:
+        liveaction_db = LiveAction.update_fields(liveaction_db, fields=dirty_fields)
+    else:
+        liveaction_db = LiveAction.add_or_update(liveaction_db)
 
     LOG.debug('Updated status for LiveAction object.', extra=extra)
 
@@ -0,0 +1,117 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from collections import OrderedDict
+
+__all__ = [
+    'LRUCache'
+]
+
+# Sentinel used to tell apart missing entries from entries with a None value
+_MISSING = object()
+
+
+class LRUCache(object):
+    """
+    Size bounded in-memory cache with an optional per entry TTL.
+
+    When the cache is full, the least recently used entry is evicted. Entries which are older than
+    ``ttl`` seconds are treated as missing.
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        """
+        :param max_size: Maximum number of entries in the cache.
+        :type max_size: ``int``
+
+        :param ttl: Number of seconds after which an entry expires. If not provided, entries only
+                    get evicted when the cache is full or when they are explicitly deleted.
+        :type ttl: ``int``
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Retrieve a value for the provided key and mark it as most recently used.
+        """
+        entry = self._entries.pop(key, _MISSING)
+
+        if entry is _MISSING:
+            self._misses += 1
+            return default
+
+        (value, expire_time) = entry
+
+        if expire_time and expire_time <= time.time():
+            self._misses += 1
+            self._evictions += 1
+            return default
+
+        self._entries[key] = entry
+        self._hits += 1
+        return value
+
+    def set(self, key, value):
+        self._entries.pop(key, None)
+
+        while self._entries and len(self._entries) >= self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+        expire_time = (time.time() + self._ttl) if self._ttl else None
+        self._entries[key] = (value, expire_time)
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        """
+        Return cache statistics.
+
+        :rtype: ``dict``
+        """
+        lookups = self._hits + self._misses
+        hit_rate = (float(self._hits) / lookups) if lookups else 0.0
+
+        return {
+            'size': len(self._entries),
+            'max_size': self._max_size,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'hit_rate': hit_rate
+        }
+
+    def __contains__(self, key):
+        entry = self._entries.get(key, _MISSING)
+
+        if entry is _MISSING:
+            return False
+
+        expire_time = entry[1]
+        return not expire_time or expire_time > time.time()
+
+    def __len__(self):
+        return len(self._entries)
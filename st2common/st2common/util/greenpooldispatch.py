@@ -13,39 +13,123 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import eventlet
-import Queue
+from eventlet.queue import LightQueue
+from eventlet.semaphore import Semaphore
+
+from st2common import log as logging
+
+__all__ = [
+    'BufferedDispatcher'
+]
+
+LOG = logging.getLogger(__name__)
 
 
 class BufferedDispatcher(object):
+    """
+    Dispatches work to a green thread pool. Work which can't be dispatched right away because
+    all the pool workers are busy is buffered.
+
+    Dispatching is event driven - buffered work is picked up as soon as a pool slot is released.
+    If the buffer is full, ``dispatch`` blocks until there is room which applies backpressure to
+    the caller (e.g. the message bus consumer).
+    """
+
+    def __init__(self, dispatch_pool_size=50, buffer_size=None, name=None,
+                 stats_log_interval=None):
+        """
+        :param dispatch_pool_size: Maximum number of work items which are processed concurrently.
+        :type dispatch_pool_size: ``int``
 
-    def __init__(self, dispatch_pool_size=50, monitor_thread_empty_q_sleep_time=5,
-                 monitor_thread_no_workers_sleep_time=1):
+        :param buffer_size: Maximum number of work items which are waiting for a free pool
+                            worker. Defaults to the pool size.
+        :type buffer_size: ``int``
+
+        :param name: Name of the dispatcher which is used in the log messages.
+        :type name: ``str``
+
+        :param stats_log_interval: How often (in seconds) to log the dispatcher stats. If not
+                                   provided, stats are not logged.
+        :type stats_log_interval: ``int``
+        """
         self._pool_limit = dispatch_pool_size
         self._dispatcher_pool = eventlet.GreenPool(dispatch_pool_size)
+        # Tracks free pool workers. Work is only taken from the buffer once a worker is available
+        # so the buffer is the only place where pending work is held.
+        self._pool_slots = Semaphore(dispatch_pool_size)
+        self._work_buffer = LightQueue(maxsize=buffer_size or dispatch_pool_size)
+
+        self._dispatched_count = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+        self._name = name or self.__class__.__name__
+        self._stats_log_interval = stats_log_interval
+
         self._dispatch_monitor_thread = eventlet.greenthread.spawn(self._flush)
-        self._monitor_thread_empty_q_sleep_time = monitor_thread_empty_q_sleep_time
-        self._monitor_thread_no_workers_sleep_time = monitor_thread_no_workers_sleep_time
-        self._work_buffer = Queue.Queue()
+        self._stats_thread = (eventlet.greenthread.spawn(self._log_stats)
+                              if stats_log_interval else None)
 
     def dispatch(self, handler, *args):
-        self._work_buffer.put((handler, args), block=True, timeout=1)
-        self._flush_now()
+        # Blocks if the buffer is full
+        self._work_buffer.put((handler, args, time.time()))
 
     def shutdown(self):
         self._dispatch_monitor_thread.kill()
 
+        if self._stats_thread:
+            self._stats_thread.kill()
+
+    def get_stats(self):
+        """
+        Return gauges which describe the state of the dispatcher.
+
+        :rtype: ``dict``
+        """
+        running = self._dispatcher_pool.running()
+        avg_wait_time = (self._total_wait_time / self._dispatched_count
+                         if self._dispatched_count else 0.0)
+
+        return {
+            'queue_depth': self._work_buffer.qsize(),
+            'pool_size': self._pool_limit,
+            'pool_running': running,
+            'pool_utilization': float(running) / self._pool_limit,
+            'dispatched': self._dispatched_count,
+            'avg_wait_time': avg_wait_time,
+            'max_wait_time': self._max_wait_time
+        }
+
     def _flush(self):
         while True:
-            while self._work_buffer.empty():
-                eventlet.greenthread.sleep(self._monitor_thread_empty_q_sleep_time)
-            while self._dispatcher_pool.free() <= 0:
-                eventlet.greenthread.sleep(self._monitor_thread_no_workers_sleep_time)
-            self._flush_now()
-
-    def _flush_now(self):
-        if self._dispatcher_pool.free() <= 0:
-            return
-        while not self._work_buffer.empty() and self._dispatcher_pool.free() > 0:
-            (handler, args) = self._work_buffer.get_nowait()
-            self._dispatcher_pool.spawn(handler, *args)
+            # Blocks until a pool slot is released if all the workers are busy
+            self._pool_slots.acquire()
+
+            try:
+                # Wakes up as soon as work is enqueued
+                (handler, args, enqueue_time) = self._work_buffer.get()
+            except:
+                self._pool_slots.release()
+                raise
+
+            self._dispatcher_pool.spawn(self._run, handler, args)
+            self._record_wait_time(time.time() - enqueue_time)
+
+    def _run(self, handler, args):
+        try:
+            handler(*args)
+        finally:
+            self._pool_slots.release()
+
+    def _log_stats(self):
+        while True:
+            eventlet.sleep(self._stats_log_interval)
+            LOG.info('%s dispatcher stats: %s', self._name, self.get_stats())
+
+    def _record_wait_time(self, wait_time):
+        self._dispatched_count += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
@@ -19,6 +19,41 @@ import six
 import re
 
 import semver
+from jinja2 import meta
+from jinja2 import nodes
+
+from st2common.util.cache import LRUCache
+
+__all__ = [
+    'CustomFilters',
+
+    'get_jinja_environment',
+    'is_template',
+    'get_template',
+    'get_undeclared_variables',
+    'get_attribute_paths',
+    'get_template_cache_stats',
+    'render_values'
+]
+
+# Strings which don't contain any of those markers can't be templates
+TEMPLATE_MARKERS = ['{{', '{%', '{#']
+
+# Maximum number of compiled templates which are cached per process
+TEMPLATE_CACHE_SIZE = 1000
+
+# Long-lived environments keyed by allow_undefined. Environments are only used for compiling
+# templates so they can be shared.
+_ENVIRONMENTS = {}
+
+# Compiled templates keyed by (template source, allow_undefined)
+_TEMPLATE_CACHE = LRUCache(max_size=TEMPLATE_CACHE_SIZE)
+
+# Undeclared variables keyed by template source
+_VARIABLES_CACHE = LRUCache(max_size=TEMPLATE_CACHE_SIZE)
+
+# Attribute paths keyed by (template source, variable name)
+_ATTRIBUTE_PATHS_CACHE = LRUCache(max_size=TEMPLATE_CACHE_SIZE)
 
 
 class CustomFilters(object):
@@ -124,6 +159,132 @@ def get_jinja_environment(allow_undefined=False):
     return env
 
 
+def is_template(value):
+    """
+    Return True if the provided string contains Jinja markup and needs to be rendered.
+
+    This is a fast check which doesn't require lexing or rendering the value.
+
+    :rtype: ``bool``
+    """
+    return any(marker in value for marker in TEMPLATE_MARKERS)
+
+
+def get_template(value, allow_undefined=False):
+    """
+    Return a compiled template for the provided template string.
+
+    Compiled templates are cached so the same template string is only lexed and compiled once
+    per process.
+
+    :param value: Template string.
+    :type value: ``str``
+
+    :param allow_undefined: If should allow undefined variables in templates.
+    :type allow_undefined: ``bool``
+
+    :rtype: :class:`jinja2.Template`
+    """
+    key = (value, allow_undefined)
+    template = _TEMPLATE_CACHE.get(key)
+
+    if template is None:
+        template = _get_shared_environment(allow_undefined=allow_undefined).from_string(value)
+        _TEMPLATE_CACHE.set(key, template)
+
+    return template
+
+
+def get_undeclared_variables(value):
+    """
+    Return names of the variables which are referenced in the provided template string.
+
+    :rtype: ``frozenset``
+    """
+    variables = _VARIABLES_CACHE.get(value)
+
+    if variables is None:
+        template_ast = _get_shared_environment().parse(value)
+        variables = frozenset(meta.find_undeclared_variables(template_ast))
+        _VARIABLES_CACHE.set(value, variables)
+
+    return variables
+
+
+def get_attribute_paths(value, name):
+    """
+    Return attribute paths which are statically referenced on the provided variable.
+
+    For example, ``{{system.a.b}} {{system['c']}}`` results in ``('a', 'b')`` and ``('c', )``
+    for variable ``system``. Lookups which use a dynamic key are only followed up to the dynamic
+    part.
+
+    :param value: Template string.
+    :type value: ``str``
+
+    :param name: Name of the variable.
+    :type name: ``str``
+
+    :rtype: ``frozenset`` of ``tuple``
+    """
+    key = (value, name)
+    paths = _ATTRIBUTE_PATHS_CACHE.get(key)
+
+    if paths is None:
+        template_ast = _get_shared_environment().parse(value)
+        paths = set()
+
+        for node in template_ast.find_all((nodes.Getattr, nodes.Getitem)):
+            path = _get_attribute_path(node=node, name=name)
+
+            if path:
+                paths.add(path)
+
+        paths = frozenset(paths)
+        _ATTRIBUTE_PATHS_CACHE.set(key, paths)
+
+    return paths
+
+
+def get_template_cache_stats():
+    """
+    Return hit / miss statistics for the compiled template cache.
+
+    :rtype: ``dict``
+    """
+    return _TEMPLATE_CACHE.get_stats()
+
+
+def _get_shared_environment(allow_undefined=False):
+    env = _ENVIRONMENTS.get(allow_undefined, None)
+
+    if not env:
+        env = get_jinja_environment(allow_undefined=allow_undefined)
+        _ENVIRONMENTS[allow_undefined] = env
+
+    return env
+
+
+def _get_attribute_path(node, name):
+    parts = []
+
+    while isinstance(node, (nodes.Getattr, nodes.Getitem)):
+        if isinstance(node, nodes.Getattr):
+            parts.append(node.attr)
+        elif isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, six.string_types):
+            parts.append(node.arg.value)
+        else:
+            # Dynamic lookup, everything after it is unknown
+            parts = []
+
+        node = node.node
+
+    if not isinstance(node, nodes.Name) or node.name != name:
+        return None
+
+    return tuple(reversed(parts))
+
+
 def render_values(mapping=None, context=None, allow_undefined=False):
     """
     Render an incoming mapping using context provided in context using Jinja2. Returns a dict
@@ -141,17 +302,18 @@ def render_values(mapping=None, context=None, allow_undefined=False):
     if not context or not mapping:
         return mapping
 
-    env = get_jinja_environment(allow_undefined=allow_undefined)
     rendered_mapping = {}
     for k, v in six.iteritems(mapping):
         # jinja2 works with string so transform list and dict to strings.
-        reverse_json_dumps = False
-        if isinstance(v, dict) or isinstance(v, list):
-            v = json.dumps(v)
-            reverse_json_dumps = True
-        else:
-            v = str(v)
-        rendered_v = env.from_string(v).render(context)
+        reverse_json_dumps = isinstance(v, dict) or isinstance(v, list)
+        v = _get_template_string(v)
+
+        # not a template therefore pick params from original to retain original type
+        if not is_template(v):
+            rendered_mapping[k] = mapping[k]
+            continue
+
+        rendered_v = get_template(v, allow_undefined=allow_undefined).render(context)
         # no change therefore no templatization so pick params from original to retain
         # original type
         if rendered_v == v:
@@ -161,3 +323,41 @@ def render_values(mapping=None, context=None, allow_undefined=False):
             rendered_v = json.loads(rendered_v)
         rendered_mapping[k] = rendered_v
     return rendered_mapping
+
+
+def compile_values(mapping=None, allow_undefined=False):
+    """
+    Compile and cache templates for all the values in the provided mapping which contain Jinja
+    markup.
+
+    This way the templates don't need to be compiled once the mapping is rendered using
+    render_values. Invalid templates are skipped so the error is reported when the mapping is
+    rendered.
+
+    :param mapping: Input as a dictionary of key value pairs.
+    :type mapping: ``dict``
+
+    :param allow_undefined: If should allow undefined variables in templates.
+    :type allow_undefined: ``bool``
+    """
+    if not mapping:
+        return
+
+    for v in six.itervalues(mapping):
+        try:
+            v = _get_template_string(v)
+
+            if is_template(v):
+                get_template(v, allow_undefined=allow_undefined)
+        except Exception:
+            continue
+
+
+def _get_template_string(value):
+    """
+    Return a string representation of the provided mapping value which is used as a template.
+    """
+    if isinstance(value, dict) or isinstance(value, list):
+        return json.dumps(value)
+
+    return str(value)
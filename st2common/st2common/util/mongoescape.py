@@ -13,7 +13,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
 import six
 
 # http://docs.mongodb.org/manual/faq/developers/#faq-dollar-sign-escaping
@@ -30,49 +29,78 @@ RULE_CRITERIA_ESCAPE_TRANSLATION = dict(zip(RULE_CRITERIA_UNESCAPED,
 RULE_CRITERIA_UNESCAPE_TRANSLATION = dict(zip(RULE_CRITERIA_ESCAPED,
                                               RULE_CRITERIA_UNESCAPED))
 
+# Unescaped characters are never escaped again so the translations can be applied in one go
+ALL_UNESCAPE_TRANSLATION = dict(list(UNESCAPE_TRANSLATION.items()) +
+                                list(RULE_CRITERIA_UNESCAPE_TRANSLATION.items()))
 
-def _prep_work_items(d):
-    return [(k, v, d) for k, v in six.iteritems(d)]
+
+def _translate_key(key, translation):
+    if not isinstance(key, six.string_types):
+        return key
+
+    for t_k, t_v in six.iteritems(translation):
+        if t_k in key:
+            key = key.replace(t_k, t_v)
+
+    return key
 
 
 def _translate_chars(field, translation):
-    # Only translate the fields of a dict
-    if not isinstance(field, dict):
-        return field
+    """
+    Translate the dictionary keys in the provided field.
+
+    The field is walked once and only the dictionaries and lists which (directly or through one
+    of their children) contain a key which needs to be translated are copied. All the other
+    values are shared with the original field which is never modified.
+    """
+    if isinstance(field, dict):
+        changes = None
+
+        for key, value in six.iteritems(field):
+            new_key = _translate_key(key, translation)
+
+            if isinstance(value, (dict, list)):
+                new_value = _translate_chars(value, translation)
+            else:
+                new_value = value
+
+            if new_key != key or new_value is not value:
+                if changes is None:
+                    changes = {}
+                changes[key] = (new_key, new_value)
+
+        if not changes:
+            return field
+
+        result = {}
+        for key, value in six.iteritems(field):
+            if key in changes:
+                key, value = changes[key]
+            result[key] = value
 
-    work_items = _prep_work_items(field)
+        return result
+    elif isinstance(field, list):
+        result = None
 
-    while len(work_items) > 0:
-        work_item = work_items.pop(0)
-        oldkey = work_item[0]
-        value = work_item[1]
-        work_field = work_item[2]
-        newkey = oldkey
+        for index, value in enumerate(field):
+            if not isinstance(value, (dict, list)):
+                continue
 
-        for t_k, t_v in six.iteritems(translation):
-            newkey = newkey.replace(t_k, t_v)
+            new_value = _translate_chars(value, translation)
 
-        if newkey != oldkey:
-            work_field[newkey] = value
-            del work_field[oldkey]
+            if new_value is not value:
+                if result is None:
+                    result = list(field)
+                result[index] = new_value
 
-        if isinstance(value, dict):
-            work_items.extend(_prep_work_items(value))
-        elif isinstance(value, list):
-            for item in value:
-                if isinstance(item, dict):
-                    work_items.extend(_prep_work_items(item))
+        return field if result is None else result
 
     return field
 
 
 def escape_chars(field):
-    value = copy.deepcopy(field)
-    return _translate_chars(value, ESCAPE_TRANSLATION)
+    return _translate_chars(field, ESCAPE_TRANSLATION)
 
 
 def unescape_chars(field):
-    value = copy.deepcopy(field)
-    translated = _translate_chars(value, UNESCAPE_TRANSLATION)
-    translated = _translate_chars(value, RULE_CRITERIA_UNESCAPE_TRANSLATION)
-    return translated
+    return _translate_chars(field, ALL_UNESCAPE_TRANSLATION)
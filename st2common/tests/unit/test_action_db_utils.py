@@ -27,6 +27,7 @@ from st2common.models.system.common import ResourceReference
 from st2common.persistence.action import Action
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.runner import RunnerType
+from st2common.services import action_cache
 from st2common.transport.liveaction import LiveActionPublisher
 from st2common.util.date import get_datetime_utc_now
 import st2common.util.action_db as action_db_utils
@@ -239,6 +240,40 @@ class ActionDBUtilsTestCase(DbTestCase):
         self.assertTrue('actionstr' not in named_args)
         self.assertEqual(named_args.get('runnerint'), 555)
 
+    @mock.patch.object(action_cache.ActionCacheWatcher, 'start', mock.MagicMock())
+    def test_get_action_and_runnertype_with_cache_enabled(self):
+        action_cache.setup()
+        self.addCleanup(action_cache.teardown)
+
+        action_ref = ActionDBUtilsTestCase.action_db.ref
+        runner_name = ActionDBUtilsTestCase.runnertype_db.name
+
+        with mock.patch.object(Action, 'get_by_ref', mock.MagicMock(
+                return_value=ActionDBUtilsTestCase.action_db)) as mock_get_by_ref:
+            for _ in range(3):
+                action = action_db_utils.get_action_by_ref(action_ref)
+                self.assertEqual(action.id, ActionDBUtilsTestCase.action_db.id)
+
+            self.assertEqual(mock_get_by_ref.call_count, 1)
+
+        with mock.patch.object(RunnerType, 'query', mock.MagicMock(
+                return_value=[ActionDBUtilsTestCase.runnertype_db])) as mock_query:
+            for _ in range(3):
+                runner = action_db_utils.get_runnertype_by_name(runner_name)
+                self.assertEqual(runner.id, ActionDBUtilsTestCase.runnertype_db.id)
+
+            self.assertEqual(mock_query.call_count, 1)
+
+        stats = action_cache.get_stats()
+        self.assertEqual(stats['action']['hits'], 2)
+        self.assertEqual(stats['action']['misses'], 1)
+        self.assertEqual(stats['runnertype']['hits'], 2)
+        self.assertEqual(stats['runnertype']['misses'], 1)
+
+        # Delete event invalidates the cached entry
+        action_cache.invalidate_action(ActionDBUtilsTestCase.action_db)
+        self.assertEqual(action_cache.get_action(action_ref), None)
+
     @classmethod
     def _setup_test_models(cls):
         ActionDBUtilsTestCase.setup_runner()
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
 import six
 
 from st2common.constants import action as action_constants
@@ -20,7 +21,9 @@ from st2common.models.api.action import RunnerTypeAPI, ActionAPI, LiveActionAPI
 from st2common.models.api.trigger import TriggerTypeAPI, TriggerAPI, TriggerInstanceAPI
 from st2common.models.api.rule import RuleAPI
 from st2common.persistence.liveaction import LiveAction
+from st2common.persistence.rule import Rule
 from st2common.persistence.runner import RunnerType
+from st2common.persistence.trigger import Trigger, TriggerInstance, TriggerType
 from st2common.persistence.execution import ActionExecution
 import st2common.services.executions as executions_util
 import st2common.util.action_db as action_utils
@@ -119,6 +122,64 @@ class ExecutionsUtilTestCase(CleanDbTestCase):
         child_execs = parent_execution.children
         self.assertTrue(str(child_exec.id) in child_execs)
 
+    def test_execution_creation_chains_parent_is_not_rewritten(self):
+        childliveaction = self.MODELS['liveactions']['childliveaction.yaml']
+
+        with mock.patch.object(ActionExecution, 'add_or_update',
+                               mock.MagicMock(side_effect=ActionExecution.add_or_update)) as m:
+            child_exec = executions_util.create_execution_object(childliveaction)
+
+        # Only the child execution is written, parent is updated using $push
+        self.assertEqual(m.call_count, 1)
+
+        parent_execution_id = childliveaction.context['parent']['execution_id']
+        parent_execution = ActionExecution.get_by_id(parent_execution_id)
+        self.assertEqual(parent_execution.children.count(str(child_exec.id)), 1)
+
+    def test_execution_creation_with_preloaded_objects(self):
+        trigger_type = self.MODELS['triggertypes']['triggertype2.yaml']
+        trigger = self.MODELS['triggers']['trigger2.yaml']
+        trigger_instance = self.MODELS['triggerinstances']['trigger_instance_1.yaml']
+        test_liveaction = self.FIXTURES['liveactions']['liveaction3.yaml']
+        rule = self.MODELS['rules']['rule3.yaml']
+        test_liveaction['context']['rule']['id'] = str(rule.id)
+        test_liveaction['context']['trigger_instance']['id'] = str(trigger_instance.id)
+        test_liveaction_api = LiveActionAPI(**test_liveaction)
+        liveaction = LiveAction.add_or_update(LiveActionAPI.to_model(test_liveaction_api))
+
+        with mock.patch.object(Rule, 'get_by_id') as rule_get, \
+                mock.patch.object(TriggerInstance, 'get_by_id') as trigger_instance_get, \
+                mock.patch.object(Trigger, 'query') as trigger_query, \
+                mock.patch.object(TriggerType, 'query') as trigger_type_query:
+            execution = executions_util.create_execution_object(
+                liveaction, rule_db=rule, trigger_instance_db=trigger_instance,
+                trigger_db=trigger, trigger_type_db=trigger_type)
+
+        self.assertFalse(rule_get.called)
+        self.assertFalse(trigger_instance_get.called)
+        self.assertFalse(trigger_query.called)
+        self.assertFalse(trigger_type_query.called)
+
+        self.assertDictEqual(execution.rule, vars(RuleAPI.from_model(rule)))
+        self.assertDictEqual(execution.trigger, vars(TriggerAPI.from_model(trigger)))
+        self.assertDictEqual(execution.trigger_type, vars(TriggerTypeAPI.from_model(trigger_type)))
+
+    def test_update_execution_only_writes_modified_fields(self):
+        liveaction = self.MODELS['liveactions']['liveaction1.yaml']
+        executions_util.create_execution_object(liveaction)
+
+        liveaction.status = action_constants.LIVEACTION_STATUS_RUNNING
+
+        with mock.patch.object(ActionExecution, 'update_fields',
+                               mock.MagicMock(side_effect=ActionExecution.update_fields)) as m:
+            executions_util.update_execution(liveaction)
+
+        self.assertEqual(m.call_args[1]['fields'], ['status'])
+
+        execution = self._get_action_execution(liveaction__id=str(liveaction.id),
+                                               raise_exception=True)
+        self.assertEqual(execution.status, action_constants.LIVEACTION_STATUS_RUNNING)
+
     def _get_action_execution(self, **kwargs):
         return ActionExecution.get(**kwargs)
 
@@ -222,6 +283,45 @@ class ExecutionsUtilDescendantsTestCase(CleanDbTestCase):
 
         self.assertListEqual(all_descendants_ids, expected_ids)
 
+    def test_get_all_descendants_single_query_per_level(self):
+        root_execution = self.MODELS['executions']['root_execution.yaml']
+
+        with mock.patch.object(ActionExecution, 'query',
+                               side_effect=ActionExecution.query) as query:
+            all_descendants = executions_util.get_descendants(str(root_execution.id))
+
+        # One query per level of the tree
+        self.assertEqual(query.call_count, self._get_tree_depth(str(root_execution.id)))
+
+        # Children are returned depth first, siblings sorted by start_timestamp
+        expected_ids = []
+        traverse = [str(root_execution.id)]
+        while traverse:
+            node_id = traverse.pop()
+            if node_id != str(root_execution.id):
+                expected_ids.append(node_id)
+            children = [self._get_action_execution(child_id) for child_id in
+                        self._get_action_execution(node_id).children or []]
+            children = sorted(children, key=lambda child: child.start_timestamp, reverse=True)
+            traverse.extend([str(child.id) for child in children])
+
+        all_descendants_ids = [str(descendant.id) for descendant in all_descendants]
+        self.assertListEqual(all_descendants_ids, expected_ids)
+
+    def test_get_all_descendants_exclude_fields(self):
+        root_execution = self.MODELS['executions']['root_execution.yaml']
+        all_descendants = executions_util.get_descendants(str(root_execution.id),
+                                                          exclude_fields=['result', 'children'])
+
+        # Fields required to build the tree are always retrieved
+        self.assertEqual(len(all_descendants), len(self.MODELS['executions']) - 1)
+
+    def _get_tree_depth(self, ae_id):
+        children = self._get_action_execution(ae_id).children
+        if not children:
+            return 0
+        return 1 + max([self._get_tree_depth(child_id) for child_id in children])
+
     def _get_action_execution(self, ae_id):
         for _, execution in six.iteritems(self.MODELS['executions']):
             if str(execution.id) == ae_id:
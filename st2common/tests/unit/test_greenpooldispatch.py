@@ -16,6 +16,7 @@
 import eventlet
 import mock
 
+from st2common.util import greenpooldispatch
 from st2common.util.greenpooldispatch import BufferedDispatcher
 from unittest2 import TestCase
 
@@ -36,9 +37,7 @@ class TestGreenPoolDispatch(TestCase):
         self.assertItemsEqual(expected, call_args_list)
 
     def test_dispatch_starved(self):
-        dispatcher = BufferedDispatcher(dispatch_pool_size=2,
-                                        monitor_thread_empty_q_sleep_time=0.01,
-                                        monitor_thread_no_workers_sleep_time=0.01)
+        dispatcher = BufferedDispatcher(dispatch_pool_size=2)
         mock_handler = mock.MagicMock()
         expected = []
         for i in range(10):
@@ -49,3 +48,39 @@ class TestGreenPoolDispatch(TestCase):
         dispatcher.shutdown()
         call_args_list = [(args[0][0], args[0][1]) for args in mock_handler.call_args_list]
         self.assertItemsEqual(expected, call_args_list)
+
+    def test_dispatch_blocks_when_buffer_is_full(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1, buffer_size=1)
+        event = eventlet.event.Event()
+
+        def handler():
+            event.wait()
+
+        # First item occupies the only pool worker, second one the buffer
+        dispatcher.dispatch(handler)
+        eventlet.sleep(0)
+        dispatcher.dispatch(handler)
+
+        blocked_dispatch = eventlet.spawn(dispatcher.dispatch, handler)
+        eventlet.sleep(0.01)
+        self.assertFalse(blocked_dispatch.dead)
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['pool_running'], 1)
+        self.assertEqual(stats['pool_utilization'], 1.0)
+
+        # Releasing the worker unblocks the dispatch
+        event.send()
+        blocked_dispatch.wait()
+        dispatcher.shutdown()
+
+    def test_stats_are_logged_periodically(self):
+        with mock.patch.object(greenpooldispatch, 'LOG') as mock_log:
+            dispatcher = BufferedDispatcher(name='test', stats_log_interval=0.01)
+            eventlet.sleep(0.05)
+            dispatcher.shutdown()
+
+        self.assertTrue(mock_log.info.called)
+        _, name, stats = mock_log.info.call_args[0]
+        self.assertEqual(name, 'test')
+        self.assertEqual(stats['pool_size'], 50)
@@ -13,10 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
+
+import mock
+
 from st2tests.base import CleanDbTestCase
 from st2common.models.db.keyvalue import KeyValuePairDB
 from st2common.persistence.keyvalue import KeyValuePair
+from st2common.services import keyvalue_cache
 from st2common.services.keyvalues import KeyValueLookup
+from st2common.services.keyvalues import get_referenced_keys
+from st2common.services.keyvalues import get_key_value_lookup
+from st2common.util import date as date_utils
+from st2common.util import jinja as jinja_utils
 
 
 class TestKeyValueLookup(CleanDbTestCase):
@@ -57,3 +66,54 @@ class TestKeyValueLookup(CleanDbTestCase):
         lookup = KeyValueLookup()
         self.assertEquals(str(lookup.missing_key), '')
         self.assertTrue(lookup.missing_key, 'Should be not none.')
+
+    def test_get_referenced_keys(self):
+        self.assertEqual(get_referenced_keys('{{system.a.b}} {{system["c"]}}'),
+                         set(['a', 'a.b', 'c']))
+        self.assertEqual(get_referenced_keys({'x': ['{{system.a}}', 'y'], 'z': 1}), set(['a']))
+        self.assertEqual(get_referenced_keys('{{system[name].b}} {{trigger.a}}'), set([]))
+        self.assertEqual(get_referenced_keys('system.a'), set([]))
+
+    def test_prefetch_uses_single_query(self):
+        KeyValuePair.add_or_update(KeyValuePairDB(name='a.b', value='v1'))
+        KeyValuePair.add_or_update(KeyValuePairDB(name='c', value='v2'))
+
+        with mock.patch.object(KeyValuePair, 'query', wraps=KeyValuePair.query) as query, \
+                mock.patch.object(KeyValuePair, 'get_by_name') as get_by_name:
+            lookup = get_key_value_lookup('{{system.a.b}} {{system.c}} {{system.d}}')
+            self.assertEqual(query.call_count, 1)
+
+            self.assertEqual(str(lookup.a.b), 'v1')
+            self.assertEqual(str(lookup.c), 'v2')
+            self.assertEqual(str(lookup.d), '')
+            self.assertEqual(str(lookup.a), '')
+            self.assertEqual(get_by_name.call_count, 0)
+
+        rendered = jinja_utils.render_values(mapping={'k': '{{system.a.b}}-{{system.c}}'},
+                                             context={'system': lookup})
+        self.assertEqual(rendered['k'], 'v1-v2')
+
+    @mock.patch.object(keyvalue_cache.KeyValuePairCacheWatcher, 'start', mock.MagicMock())
+    def test_lookup_with_cache_enabled(self):
+        keyvalue_cache.setup()
+        self.addCleanup(keyvalue_cache.teardown)
+
+        kvp = KeyValuePair.add_or_update(KeyValuePairDB(name='k1', value='v1'))
+
+        self.assertEqual(str(KeyValueLookup().k1), 'v1')
+        self.assertEqual(str(KeyValueLookup().k2), '')
+
+        # Both existing and missing keys are served from the cache
+        with mock.patch.object(KeyValuePair, 'get_by_name') as get_by_name:
+            self.assertEqual(str(KeyValueLookup().k1), 'v1')
+            self.assertEqual(str(KeyValueLookup().k2), '')
+            self.assertEqual(get_by_name.call_count, 0)
+
+        # Expired items are treated as missing
+        kvp.expire_timestamp = date_utils.get_datetime_utc_now() - datetime.timedelta(seconds=1)
+        keyvalue_cache.set_item(kvp)
+        self.assertEqual(keyvalue_cache.get_item('k1'), (True, None))
+        self.assertEqual(str(KeyValueLookup().k1), '')
+
+        keyvalue_cache.invalidate_item(kvp)
+        self.assertEqual(keyvalue_cache.get_item('k1'), (False, None))
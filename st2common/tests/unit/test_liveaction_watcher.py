@@ -0,0 +1,69 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import mock
+
+from st2common.constants import action as action_constants
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.services import liveaction_watcher
+from st2common.util import action_db as action_utils
+from st2tests.base import EventletTestCase
+
+RUNNING = LiveActionDB(id='5f0e4a6dd0e3b9a2b4f2a001',
+                       status=action_constants.LIVEACTION_STATUS_RUNNING)
+SUCCEEDED = LiveActionDB(id='5f0e4a6dd0e3b9a2b4f2a001',
+                         status=action_constants.LIVEACTION_STATUS_SUCCEEDED)
+
+
+@mock.patch.object(liveaction_watcher.LiveActionCompletionWatcher, 'start', mock.MagicMock())
+class LiveActionCompletionWatcherTestCase(EventletTestCase):
+
+    def test_wait_for_completion_already_completed(self):
+        with mock.patch.object(action_utils, 'get_liveaction_by_id',
+                               mock.MagicMock(return_value=SUCCEEDED)) as get_liveaction:
+            result = liveaction_watcher.wait_for_completion(SUCCEEDED.id)
+
+        self.assertEqual(result.status, action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(get_liveaction.call_count, 1)
+
+    def test_wait_for_completion_notified(self):
+        watcher = liveaction_watcher.get_watcher()
+
+        with mock.patch.object(action_utils, 'get_liveaction_by_id',
+                               mock.MagicMock(side_effect=[RUNNING, SUCCEEDED])) as get_liveaction:
+            waiter = eventlet.spawn(liveaction_watcher.wait_for_completion, RUNNING.id)
+            eventlet.sleep(0)
+
+            message = mock.MagicMock()
+            watcher.process_task(SUCCEEDED, message)
+
+            with eventlet.Timeout(liveaction_watcher.POLL_INTERVAL_MIN / 2.0):
+                result = waiter.wait()
+
+        self.assertEqual(result.status, action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(get_liveaction.call_count, 2)
+        message.ack.assert_called_once_with()
+
+        # Subscription is removed once the waiter returns
+        self.assertEqual(watcher._subscribers, {})
+
+    @mock.patch.object(liveaction_watcher, 'POLL_INTERVAL_MIN', 0.01)
+    def test_wait_for_completion_polling_fallback(self):
+        with mock.patch.object(action_utils, 'get_liveaction_by_id',
+                               mock.MagicMock(side_effect=[RUNNING, RUNNING, SUCCEEDED])):
+            result = liveaction_watcher.wait_for_completion(RUNNING.id)
+
+        self.assertEqual(result.status, action_constants.LIVEACTION_STATUS_SUCCEEDED)
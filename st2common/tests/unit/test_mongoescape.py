@@ -89,3 +89,40 @@ class TestMongoEscape(unittest.TestCase):
 
         unescaped = mongoescape.unescape_chars(escaped)
         self.assertDictEqual(field, unescaped)
+
+    def test_nested_lists(self):
+        field = {'k1': [[{'l1.l2': '123'}], [1, 2]]}
+        expected = {'k1': [[{u'l1\uff0el2': '123'}], [1, 2]]}
+
+        escaped = mongoescape.escape_chars(field)
+        self.assertDictEqual(expected, escaped)
+
+        unescaped = mongoescape.unescape_chars(escaped)
+        self.assertDictEqual(field, unescaped)
+
+    def test_untouched_values_are_shared(self):
+        field = {
+            'k1.k2': {'l1': 'v1'},
+            'k3': {'l2.l3': 'v2'},
+            'k4': [{'l4': 'v3'}, {'l5.l6': 'v4'}],
+            'k5': ['a', 'b']
+        }
+
+        escaped = mongoescape.escape_chars(field)
+
+        # Original value is not modified
+        self.assertIn('k1.k2', field)
+        self.assertIn('l2.l3', field['k3'])
+        self.assertIn('l5.l6', field['k4'][1])
+
+        # Values which don't need to be translated are not copied
+        self.assertIs(escaped[u'k1\uff0ek2'], field['k1.k2'])
+        self.assertIs(escaped['k4'][0], field['k4'][0])
+        self.assertIs(escaped['k5'], field['k5'])
+        self.assertIsNot(escaped['k3'], field['k3'])
+        self.assertIsNot(escaped['k4'], field['k4'])
+
+        # Nothing to translate, same value is returned
+        field = {'k1': {'l1': ['v1', {'l2': 'v2'}]}}
+        self.assertIs(mongoescape.escape_chars(field), field)
+        self.assertIs(mongoescape.unescape_chars(field), field)
@@ -29,6 +29,7 @@ class TestPersistence(DbTestCase):
     def setUpClass(cls):
         super(TestPersistence, cls).setUpClass()
         cls.access = FakeModel()
+        cls.impl = FakeModel.impl
 
     def tearDown(self):
         FakeModelDB.drop_collection()
@@ -196,3 +197,35 @@ class TestPersistence(DbTestCase):
         self.assertIsNotNone(obj3)
         self.assertEqual(obj3.id, obj2.id)
         self.assertDictEqual(obj3.context, context)
+
+    def test_update_fields(self):
+        obj1 = FakeModelDB(name=uuid.uuid4().hex, context={'a.b': 1}, index=1, category='a')
+        obj1 = self.access.add_or_update(obj1)
+
+        # Modify the object in the database so we can verify only provided fields are written
+        self.access.update(obj1, set__category='b')
+
+        obj1.context = {'a.b': 2}
+        obj1.index = None
+        obj1 = self.access.update_fields(obj1, fields=['context', 'index'])
+
+        obj2 = self.access.get_by_id(str(obj1.id))
+        self.assertDictEqual(obj2.context, {'a.b': 2})
+        self.assertEqual(obj2.index, None)
+        self.assertEqual(obj2.category, 'b')
+
+    def test_update_fields_dirty_fields(self):
+        obj1 = FakeModelDB(name=uuid.uuid4().hex, context={'user': 'system'}, index=1)
+        obj1 = self.access.add_or_update(obj1)
+
+        obj2 = self.access.get_by_id(str(obj1.id))
+        self.assertEqual(self.impl.get_dirty_fields(obj2), [])
+
+        obj2.index = 2
+        self.assertEqual(self.impl.get_dirty_fields(obj2), ['index'])
+
+        self.access.update_fields(obj2)
+        self.assertEqual(self.impl.get_dirty_fields(obj2), [])
+
+        obj3 = self.access.get_by_id(str(obj1.id))
+        self.assertEqual(obj3.index, 2)
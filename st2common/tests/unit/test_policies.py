@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
 import os
 import six
 
@@ -25,6 +26,7 @@ from st2common.persistence.action import Action
 from st2common.persistence.policy import PolicyType, Policy
 from st2common.persistence.runner import RunnerType
 from st2common.policies import ResourcePolicyApplicator, get_driver
+from st2common.services import policy_cache
 from st2tests import DbTestCase, fixturesloader
 
 
@@ -92,6 +94,76 @@ class PolicyTest(DbTestCase):
         self.assertTrue(hasattr(policy, 'threshold'))
         self.assertEqual(policy.threshold, 3)
 
+    def test_get_drivers_cache_disabled(self):
+        drivers = policy_cache.get_drivers('wolfpack.action-1')
+        self.assertEqual(len(drivers), 2)
+
+        # New drivers are instantiated on every call
+        self.assertIsNot(policy_cache.get_drivers('wolfpack.action-1')[0][1], drivers[0][1])
+
+    @mock.patch.object(policy_cache.PolicyCacheWatcher, 'start', mock.MagicMock())
+    def test_get_drivers_cache_enabled(self):
+        policy_cache.setup()
+        self.addCleanup(policy_cache.teardown)
+
+        with mock.patch.object(Policy, 'get_all', mock.MagicMock(
+                side_effect=Policy.get_all)) as mock_get_all:
+            with mock.patch.object(Policy, 'query', mock.MagicMock()) as mock_query:
+                for _ in range(3):
+                    drivers = policy_cache.get_drivers('wolfpack.action-1')
+                    self.assertEqual(len(drivers), 2)
+
+                # Resources without policies don't require any queries either
+                self.assertEqual(policy_cache.get_drivers('wolfpack.action-2'), [])
+
+                self.assertEqual(mock_get_all.call_count, 1)
+                self.assertEqual(mock_query.call_count, 0)
+
+        # Drivers are reused
+        self.assertIs(policy_cache.get_drivers('wolfpack.action-1')[0][1], drivers[0][1])
+
+        # Delete event removes the policy from the index
+        policy_db = Policy.get_by_ref('wolfpack.action-1.concurrency')
+        policy_cache.invalidate_policy(policy_db)
+        drivers = policy_cache.get_drivers('wolfpack.action-1')
+        self.assertEqual([entry[0].ref for entry in drivers], ['wolfpack.action-1.raise'])
+
+        # Create and update events add the policy with a new driver
+        policy_db.resource_ref = 'wolfpack.action-2'
+        policy_cache.invalidate_policy(policy_db)
+        policy_cache.set_policy(policy_db)
+        drivers = policy_cache.get_drivers('wolfpack.action-2')
+        self.assertEqual([entry[0].ref for entry in drivers], ['wolfpack.action-1.concurrency'])
+        self.assertEqual(drivers[0][1].threshold, 3)
+
+
+    @mock.patch.object(policy_cache.PolicyCacheWatcher, 'start', mock.MagicMock())
+    def test_get_drivers_cache_reload(self):
+        policy_cache.setup()
+        self.addCleanup(policy_cache.teardown)
+        self.assertEqual(len(policy_cache.get_drivers('wolfpack.action-1')), 2)
+
+        policy_db = Policy.get_by_ref('wolfpack.action-1.concurrency')
+        policy_dbs = list(Policy.get_all())
+
+        def mock_get_all():
+            # Other callers keep using the current index while it's being reloaded
+            self.assertEqual(len(policy_cache.get_drivers('wolfpack.action-1')), 2)
+
+            # Event received during the reload is applied to the new index
+            policy_cache.invalidate_policy(policy_db)
+            return policy_dbs
+
+        # Expire the index
+        policy_cache._INDEX_LOADED_AT = 0
+
+        with mock.patch.object(Policy, 'get_all', mock.MagicMock(
+                side_effect=mock_get_all)) as mock_get_all:
+            drivers = policy_cache.get_drivers('wolfpack.action-1')
+            self.assertEqual(mock_get_all.call_count, 1)
+
+        self.assertEqual([entry[0].ref for entry in drivers], ['wolfpack.action-1.raise'])
+
 
 class PolicyBootstrapTest(DbTestCase):
 
@@ -0,0 +1,77 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bson
+
+from st2common.constants import action as action_constants
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.persistence.liveaction import LiveAction
+from st2common.persistence.policy import ConcurrencySlots
+from st2common.policies import concurrency
+from st2tests.base import CleanDbTestCase
+
+
+class ConcurrencySlotsTestCase(CleanDbTestCase):
+
+    def test_acquire_and_release_slot(self):
+        for holder in ['a', 'b', 'c']:
+            self.assertTrue(concurrency.acquire_slot(key='key1', holder=holder, threshold=3))
+
+        # All the slots are taken
+        self.assertFalse(concurrency.acquire_slot(key='key1', holder='d', threshold=3))
+
+        # Acquiring a slot is idempotent
+        self.assertTrue(concurrency.acquire_slot(key='key1', holder='a', threshold=3))
+        self.assertEqual(ConcurrencySlots.get(key='key1').holders, ['a', 'b', 'c'])
+
+        # Slots for different keys are independent
+        self.assertTrue(concurrency.acquire_slot(key='key2', holder='d', threshold=3))
+
+        self.assertEqual(concurrency.release_slot(key='key1', holder='b'), 2)
+        self.assertEqual(concurrency.release_slot(key='key1', holder='b'), 2)
+        self.assertTrue(concurrency.acquire_slot(key='key1', holder='d', threshold=3))
+
+        # Releasing unknown slots is a no-op
+        self.assertEqual(concurrency.release_slot(key='key3', holder='a'), 0)
+
+    def test_acquire_slot_threshold_zero(self):
+        self.assertFalse(concurrency.acquire_slot(key='key1', holder='a', threshold=0))
+
+    def test_acquire_slot_existing_holders(self):
+        # Executions which are already running are taken into account when slots are created
+        def get_holders():
+            return ['a', 'b']
+
+        self.assertTrue(concurrency.acquire_slot(key='key1', holder='c', threshold=3,
+                                                 get_holders=get_holders))
+        self.assertFalse(concurrency.acquire_slot(key='key1', holder='d', threshold=3,
+                                                  get_holders=get_holders))
+        self.assertEqual(ConcurrencySlots.get(key='key1').holders, ['a', 'b', 'c'])
+
+    def test_reconcile_slots(self):
+        running = LiveAction.add_or_update(
+            LiveActionDB(action='core.local', status=action_constants.LIVEACTION_STATUS_RUNNING),
+            publish=False)
+        succeeded = LiveAction.add_or_update(
+            LiveActionDB(action='core.local', status=action_constants.LIVEACTION_STATUS_SUCCEEDED),
+            publish=False)
+        missing = str(bson.ObjectId())
+
+        for holder in [str(running.id), str(succeeded.id), missing]:
+            self.assertTrue(concurrency.acquire_slot(key='key1', holder=holder, threshold=3))
+
+        self.assertEqual(concurrency.reconcile_slots(), 2)
+        self.assertEqual(ConcurrencySlots.get(key='key1').holders, [str(running.id)])
+        self.assertEqual(concurrency.reconcile_slots(), 0)
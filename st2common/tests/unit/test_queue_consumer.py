@@ -15,6 +15,7 @@
 
 import mock
 from kombu import Connection, Exchange, Queue
+from kombu.message import Message
 
 from st2common.transport import consumers
 from st2common.transport import utils as transport_utils
@@ -33,6 +34,17 @@ class FakeMessageHandler(consumers.MessageHandler):
         pass
 
 
+def get_channel():
+    channel = mock.Mock()
+    channel.no_ack_consumers = None
+    return channel
+
+
+def get_message(channel=None, delivery_tag=1, redelivered=False):
+    return Message(channel=channel or get_channel(), body='', delivery_tag=delivery_tag,
+                   delivery_info={'redelivered': redelivered})
+
+
 def get_handler():
     with Connection(transport_utils.get_messaging_urls()) as conn:
         return FakeMessageHandler(conn, [FAKE_WORK_Q])
@@ -51,5 +63,91 @@ class QueueConsumerTest(DbTestCase):
     def test_process_message_wrong_payload_type(self):
         payload = 100
         handler = get_handler()
-        handler._queue_consumer._process_message(payload)
+        self.assertFalse(handler._queue_consumer._process_message(payload))
         self.assertFalse(FakeMessageHandler.process.called)
+
+    @mock.patch.object(FakeMessageHandler, 'process', mock.MagicMock())
+    def test_message_is_acked_after_processing(self):
+        handler = get_handler()
+        message = get_message()
+        message.channel.basic_ack.side_effect = \
+            lambda *args, **kwargs: self.assertTrue(FakeMessageHandler.process.called)
+
+        handler._queue_consumer._process_message_and_ack(FakeModelDB(), message)
+        message.channel.basic_ack.assert_called_once_with(1)
+        self.assertFalse(message.channel.basic_reject.called)
+        self.assertTrue(message.acknowledged)
+
+    @mock.patch.object(FakeMessageHandler, 'process', mock.MagicMock(side_effect=Exception()))
+    def test_failed_message_is_rejected(self):
+        handler = get_handler()
+
+        # By default failed message is not re-queued
+        message = get_message()
+        handler._queue_consumer._process_message_and_ack(FakeModelDB(), message)
+        self.assertFalse(message.channel.basic_ack.called)
+        message.channel.basic_reject.assert_called_once_with(1, requeue=False)
+
+        # If enabled, message is re-queued on the first failure
+        handler._queue_consumer._requeue_failed = True
+        message = get_message()
+        handler._queue_consumer._process_message_and_ack(FakeModelDB(), message)
+        self.assertFalse(message.channel.basic_ack.called)
+        message.channel.basic_reject.assert_called_once_with(1, requeue=True)
+
+        # Re-delivered message which fails again is not re-queued
+        message = get_message(redelivered=True)
+        handler._queue_consumer._process_message_and_ack(FakeModelDB(), message)
+        self.assertFalse(message.channel.basic_ack.called)
+        message.channel.basic_reject.assert_called_once_with(1, requeue=False)
+
+    @mock.patch.object(FakeMessageHandler, 'process', mock.MagicMock())
+    def test_batch_acks_are_ordered(self):
+        handler = get_handler()
+        queue_consumer = handler._queue_consumer
+        queue_consumer._batch_acks = True
+
+        channel = get_channel()
+        messages = [get_message(channel=channel, delivery_tag=delivery_tag)
+                    for delivery_tag in range(1, 4)]
+        queue_consumer._pending_messages.extend(messages)
+
+        # Messages processed out of order are not acked until all the previous ones are
+        queue_consumer._process_message_and_ack(FakeModelDB(), messages[1])
+        queue_consumer._process_message_and_ack(FakeModelDB(), messages[2])
+        self.assertFalse(channel.basic_ack.called)
+
+        # All three are acked using a single multiple ack
+        queue_consumer._process_message_and_ack(FakeModelDB(), messages[0])
+        channel.basic_ack.assert_called_once_with(3, multiple=True)
+        self.assertTrue(all(message.acknowledged for message in messages))
+        self.assertEqual(len(queue_consumer._pending_messages), 0)
+
+    def test_batch_acks_skip_rejected_messages(self):
+        handler = get_handler()
+        queue_consumer = handler._queue_consumer
+        queue_consumer._batch_acks = True
+
+        channel = get_channel()
+        messages = [get_message(channel=channel, delivery_tag=delivery_tag)
+                    for delivery_tag in range(1, 4)]
+        queue_consumer._pending_messages.extend(messages)
+
+        def mock_process(payload):
+            if payload.name == 'fail':
+                raise Exception('failed')
+
+        with mock.patch.object(FakeMessageHandler, 'process', mock.MagicMock(
+                side_effect=mock_process)):
+            queue_consumer._process_message_and_ack(FakeModelDB(name='ok'), messages[2])
+            queue_consumer._process_message_and_ack(FakeModelDB(name='fail'), messages[1])
+            self.assertFalse(channel.basic_ack.called)
+
+            queue_consumer._process_message_and_ack(FakeModelDB(name='ok'), messages[0])
+
+        # Rejected message is settled individually and the rest are acked together
+        channel.basic_reject.assert_called_once_with(2, requeue=False)
+        channel.basic_ack.assert_called_once_with(3, multiple=True)
+        self.assertTrue(messages[0].acknowledged)
+        self.assertTrue(messages[2].acknowledged)
+        self.assertEqual(len(queue_consumer._pending_messages), 0)
@@ -0,0 +1,84 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import bson
+import unittest2
+
+from st2common.constants.trace import TRACE_CONTEXT
+from st2common.models.api.trace import TraceContext
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.transport import serializers
+from st2common.util import date as date_utils
+
+
+class TransportSerializersTestCase(unittest2.TestCase):
+
+    def test_liveaction_roundtrip(self):
+        liveaction_db = LiveActionDB(id=bson.ObjectId(), action='core.local', status='running',
+                                     start_timestamp=date_utils.get_datetime_utc_now(),
+                                     parameters={'cmd': 'ls'},
+                                     result={'stdout': 'x' * 100, 'a.b': {'$c': 1}})
+
+        decoded = serializers.decode(serializers.encode(liveaction_db))
+
+        self.assertTrue(isinstance(decoded, LiveActionDB))
+        self.assertEqual(decoded.id, liveaction_db.id)
+        self.assertEqual(decoded.action, liveaction_db.action)
+        self.assertEqual(decoded.status, liveaction_db.status)
+        self.assertEqual(decoded.start_timestamp, liveaction_db.start_timestamp)
+        self.assertEqual(decoded.parameters, liveaction_db.parameters)
+        self.assertEqual(decoded.result, liveaction_db.result)
+
+    def test_execution_roundtrip(self):
+        execution_db = ActionExecutionDB(id=bson.ObjectId(), action={'ref': 'core.local'},
+                                         runner={'name': 'run-local'},
+                                         liveaction={'id': str(bson.ObjectId())},
+                                         status='succeeded', result={'stdout': 'out'},
+                                         start_timestamp=date_utils.get_datetime_utc_now())
+
+        decoded = serializers.decode(serializers.encode(execution_db))
+
+        self.assertTrue(isinstance(decoded, ActionExecutionDB))
+        self.assertEqual(decoded.id, execution_db.id)
+        self.assertEqual(decoded.action, execution_db.action)
+        self.assertEqual(decoded.result, execution_db.result)
+
+    def test_trigger_instance_payload_roundtrip(self):
+        payload = {
+            'trigger': 'core.st2.webhook',
+            'payload': {'foo': [1, 2, {'bar': None}]},
+            TRACE_CONTEXT: TraceContext(id_='1234', trace_tag='tag')
+        }
+
+        decoded = serializers.decode(serializers.encode(payload))
+
+        self.assertEqual(decoded['trigger'], payload['trigger'])
+        self.assertEqual(decoded['payload'], payload['payload'])
+        self.assertTrue(isinstance(decoded[TRACE_CONTEXT], TraceContext))
+        self.assertEqual(decoded[TRACE_CONTEXT].id_, '1234')
+        self.assertEqual(decoded[TRACE_CONTEXT].trace_tag, 'tag')
+
+    def test_unsupported_version(self):
+        data = json.dumps({'v': 1000, 'body': {}})
+        self.assertRaises(ValueError, serializers.decode, data)
+
+    def test_unknown_model_class(self):
+        data = json.dumps({'v': serializers.FORMAT_VERSION,
+                           'body': {serializers.MODEL_KEY: 'EvilDB',
+                                    serializers.MODEL_DATA_KEY: {}}})
+        self.assertRaises(TypeError, serializers.decode, data)
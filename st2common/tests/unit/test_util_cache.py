@@ -0,0 +1,69 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest2
+
+from st2common.util.cache import LRUCache
+
+
+class LRUCacheTestCase(unittest2.TestCase):
+
+    def test_get_and_set(self):
+        cache = LRUCache(max_size=10)
+
+        self.assertEqual(cache.get('foo'), None)
+        self.assertEqual(cache.get('foo', 'default'), 'default')
+
+        cache.set('foo', 'bar')
+        self.assertEqual(cache.get('foo'), 'bar')
+        self.assertTrue('foo' in cache)
+
+        cache.delete('foo')
+        self.assertFalse('foo' in cache)
+
+        stats = cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hit_rate'], 1.0 / 3)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+
+        # "a" becomes most recently used so "b" is evicted
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    @mock.patch('st2common.util.cache.time')
+    def test_expired_entry_is_treated_as_missing(self, mock_time):
+        mock_time.time.return_value = 100
+        cache = LRUCache(max_size=10, ttl=10)
+        cache.set('foo', 'bar')
+
+        mock_time.time.return_value = 109
+        self.assertEqual(cache.get('foo'), 'bar')
+
+        mock_time.time.return_value = 110
+        self.assertFalse('foo' in cache)
+        self.assertEqual(cache.get('foo'), None)
+        self.assertEqual(len(cache), 0)
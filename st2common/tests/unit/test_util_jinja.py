@@ -35,6 +35,59 @@ class JinjaUtilsRenderTestCase(unittest2.TestCase):
         expected = {'k2': 'v2', 'k1': 'v1', 'k3': ''}
         self.assertEqual(actual, expected)
 
+    def test_render_values_non_templates_retain_type(self):
+        actual = jinja_utils.render_values(
+            mapping={'k1': 1, 'k2': ['a', 'b'], 'k3': 'foo', 'k4': '{{a}}'},
+            context={'a': 'v1'})
+        expected = {'k1': 1, 'k2': ['a', 'b'], 'k3': 'foo', 'k4': 'v1'}
+        self.assertEqual(actual, expected)
+
+
+class JinjaUtilsTemplateCacheTestCase(unittest2.TestCase):
+
+    def test_is_template(self):
+        self.assertTrue(jinja_utils.is_template('{{a}}'))
+        self.assertTrue(jinja_utils.is_template('{% if a %}b{% endif %}'))
+        self.assertTrue(jinja_utils.is_template('{# comment #}'))
+        self.assertFalse(jinja_utils.is_template('foo'))
+        self.assertFalse(jinja_utils.is_template('{"a": "b"}'))
+
+    def test_get_template_is_cached(self):
+        value = '{{a}} template cache test'
+        hits = jinja_utils.get_template_cache_stats()['hits']
+
+        template1 = jinja_utils.get_template(value)
+        template2 = jinja_utils.get_template(value)
+        self.assertIs(template1, template2)
+        self.assertEqual(jinja_utils.get_template_cache_stats()['hits'], hits + 1)
+
+        # Templates are cached separately for each undefined mode
+        template3 = jinja_utils.get_template(value, allow_undefined=True)
+        self.assertIsNot(template1, template3)
+        self.assertEqual(template3.render({}), ' template cache test')
+
+    def test_compile_values(self):
+        mapping = {'k1': '{{a}} compile test', 'k2': ['{{b}} compile test'], 'k3': 'v3'}
+        jinja_utils.compile_values(mapping=mapping)
+
+        # Rendering the valid templates is served from cache
+        stats = jinja_utils.get_template_cache_stats()
+        rendered = jinja_utils.render_values(mapping=mapping, context={'a': 'v1', 'b': 'v2'})
+        self.assertEqual(rendered['k1'], 'v1 compile test')
+        self.assertEqual(rendered['k2'], ['v2 compile test'])
+        self.assertEqual(jinja_utils.get_template_cache_stats()['hits'], stats['hits'] + 2)
+
+        # Invalid templates are reported when rendering
+        jinja_utils.compile_values(mapping={'k1': '{{ invalid compile test'})
+
+    def test_get_template_has_custom_filters(self):
+        template = jinja_utils.get_template('{{k1 | regex_match("x")}}')
+        self.assertEqual(template.render({'k1': 'xyz'}), 'True')
+
+    def test_get_undeclared_variables(self):
+        variables = jinja_utils.get_undeclared_variables('{{a}} {{b.c}} {{ system.d }}')
+        self.assertEqual(variables, frozenset(['a', 'b', 'system']))
+
 
 class JinjaUtilsRegexFilterTestCase(unittest2.TestCase):
 
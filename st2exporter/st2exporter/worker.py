@@ -45,6 +45,7 @@ EXPORTER_WORK_Q = execution.get_queue(
 
 class ExecutionsExporter(consumers.MessageHandler):
     message_type = ActionExecutionDB
+    config_group = 'exporter'
 
     def __init__(self, connection, queues):
         super(ExecutionsExporter, self).__init__(connection, queues)
@@ -0,0 +1,206 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+import six
+from jsonpath_rw import parse
+
+from st2common import log as logging
+import st2common.operators as criteria_operators
+from st2common.constants.system import SYSTEM_KV_PREFIX
+from st2common.util import jinja as jinja_utils
+from st2common.util.templating import render_template, render_template_with_system_context
+
+__all__ = [
+    'CompiledRule',
+    'CompiledCriterion'
+]
+
+LOG = logging.getLogger('st2reactor.rules.compiled')
+
+
+class CompiledCriterion(object):
+    """
+    Criterion with all the parts which don't depend on the trigger instance (JSONPath
+    expression, operator function, constant and regex patterns) parsed once.
+    """
+
+    def __init__(self, key, criterion):
+        """
+        :param key: Criterion key (JSONPath expression).
+        :type key: ``str``
+
+        :param criterion: Criterion definition with "type" and optional "pattern" attribute.
+        :type criterion: ``dict``
+        """
+        self.key = key
+        self.operator = criterion.get('type', None)
+        self.raw_pattern = criterion.get('pattern', None)
+
+        self.expression = None
+        self.op_func = None
+
+        # Pattern which is used as is when the criterion is evaluated
+        self.pattern = None
+
+        # True if the pattern references the datastore and needs to be rendered on evaluation
+        self.is_dynamic_pattern = False
+
+        # Error which renders this criterion unusable (it will never match)
+        self.error = None
+
+        self._compile()
+
+    def evaluate(self, payload_lookup, value_cache=None):
+        """
+        :param payload_lookup: Lookup which is used to retrieve the value from the payload.
+        :type payload_lookup: :class:`st2reactor.rules.filter.PayloadLookup`
+
+        :param value_cache: Optional cache of payload values keyed by criterion key which is
+                            shared by criteria evaluated against the same trigger instance.
+        :type value_cache: ``dict``
+
+        :rtype: ``bool``
+        """
+        if self.error:
+            LOG.debug('Criterion for key "%s" is invalid: %s', self.key, self.error)
+            return False
+
+        criteria_pattern = self.pattern
+
+        if self.is_dynamic_pattern:
+            try:
+                criteria_pattern = render_template_with_system_context(value=self.raw_pattern)
+            except Exception:
+                LOG.exception('Failed to render pattern value "%s" for key "%s"' %
+                              (self.raw_pattern, self.key))
+                return False
+
+        try:
+            payload_value = self.get_payload_value(payload_lookup=payload_lookup,
+                                                   value_cache=value_cache)
+        except:
+            LOG.exception('Failed transforming criteria key %s', self.key)
+            return False
+
+        try:
+            result = self.op_func(value=payload_value, criteria_pattern=criteria_pattern)
+        except:
+            LOG.exception('There might be a problem with criteria for key "%s".', self.key)
+            return False
+
+        return result
+
+    def get_payload_value(self, payload_lookup, value_cache=None):
+        """
+        Retrieve the payload value this criterion is evaluated against.
+        """
+        if value_cache is not None and self.key in value_cache:
+            return value_cache[self.key]
+
+        matches = payload_lookup.get_value_for_expression(self.expression)
+        # pick value if only 1 matches else will end up being an array match.
+        if matches:
+            payload_value = matches[0] if len(matches) > 0 else matches
+        else:
+            payload_value = None
+
+        if value_cache is not None:
+            value_cache[self.key] = payload_value
+
+        return payload_value
+
+    @property
+    def is_equality_test(self):
+        """
+        True if this criterion is a constant equality test which can be evaluated by hashing
+        the payload value.
+        """
+        if self.error or self.is_dynamic_pattern or self.pattern is None:
+            return False
+
+        if self.op_func is not criteria_operators.equals:
+            return False
+
+        try:
+            hash(self.pattern)
+        except TypeError:
+            return False
+
+        return True
+
+    def _compile(self):
+        if not self.operator:
+            # Comparison operator type not specified, can't perform a comparison
+            self.error = 'Comparison operator type not specified'
+            return
+
+        try:
+            self.op_func = criteria_operators.get_operator(self.operator)
+            self.expression = parse(self.key)
+            self._compile_pattern()
+        except Exception as e:
+            LOG.exception('Failed to compile criterion for key "%s"', self.key)
+            self.error = str(e)
+
+    def _compile_pattern(self):
+        pattern = self.raw_pattern
+
+        if not pattern:
+            self.pattern = None
+            return
+
+        if not isinstance(pattern, six.string_types):
+            # We only perform rendering if value is a string - rendering a non-string value
+            # makes no sense
+            self.pattern = pattern
+            return
+
+        if jinja_utils.is_template(pattern):
+            variables = jinja_utils.get_undeclared_variables(pattern)
+
+            if SYSTEM_KV_PREFIX in variables:
+                # Datastore values can change at any time so they need to be rendered on every
+                # evaluation
+                self.is_dynamic_pattern = True
+                return
+
+            pattern = render_template(value=pattern)
+
+        if self.op_func is criteria_operators.match_regex:
+            pattern = re.compile(pattern)
+
+        self.pattern = pattern
+
+
+class CompiledRule(object):
+    """
+    Rule with pre-compiled criteria. It should be built once when a rule is loaded or updated
+    and re-used for every trigger instance.
+    """
+
+    def __init__(self, rule):
+        """
+        :param rule: Rule DB object.
+        :type rule: :class:`RuleDB`
+        """
+        self.rule = rule
+        self.criteria = []
+
+        criteria = rule.criteria or {}
+        for criterion_k in criteria.keys():
+            criterion_v = criteria[criterion_k]
+            self.criteria.append(CompiledCriterion(key=criterion_k, criterion=criterion_v))
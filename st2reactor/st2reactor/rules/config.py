@@ -46,6 +46,20 @@ def _register_rules_engine_opts():
     ]
     CONF.register_opts(logging_opts, group='rulesengine')
 
+    rules_engine_opts = [
+        cfg.BoolOpt('enable_rule_index', default=True,
+                    help='Keep an in-memory index of enabled rules keyed by trigger reference '
+                         'instead of querying the database for every trigger instance.'),
+        cfg.IntOpt('enforcement_pool_size', default=1,
+                   help='Maximum number of rules matched by a trigger instance which are '
+                        'enforced concurrently. 1 means rules are enforced sequentially.'),
+        cfg.StrOpt('matcher', default='linear',
+                   help='Rules matcher to use. "linear" evaluates criteria of every rule one by '
+                        'one, "network" uses a shared discrimination network which is faster for '
+                        'triggers with a large number of rules.')
+    ]
+    CONF.register_opts(rules_engine_opts, group='rulesengine')
+
     timer_opts = [
         cfg.StrOpt('local_timezone', default='America/Los_Angeles',
                    help='Timezone pertaining to the location where st2 is run.')
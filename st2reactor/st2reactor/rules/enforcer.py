@@ -33,9 +33,15 @@ LOG = logging.getLogger('st2reactor.ruleenforcement.enforce')
 
 
 class RuleEnforcer(object):
-    def __init__(self, trigger_instance, rule):
+    def __init__(self, trigger_instance, rule, trigger=None):
+        """
+        :param trigger: Trigger of the trigger instance. If provided, it's passed to the action
+                        service so it doesn't need to be retrieved from the database again.
+        :type trigger: ``TriggerDB``
+        """
         self.trigger_instance = trigger_instance
         self.rule = rule
+        self.trigger = trigger
 
         try:
             self.data_transformer = get_transformer(trigger_instance.payload)
@@ -59,7 +65,10 @@ class RuleEnforcer(object):
                  json.dumps(data))
 
         # update trace before invoking the action.
-        trace_context = self._update_trace()
+        trace_db = self._update_trace()
+        trace_context = None
+        if trace_db:
+            trace_context = vars(TraceContext(id_=str(trace_db.id), trace_tag=trace_db.trace_tag))
         LOG.debug('Updated trace %s with rule %s.', trace_context, self.rule.id)
 
         context = {
@@ -69,7 +78,10 @@ class RuleEnforcer(object):
             TRACE_CONTEXT: trace_context
         }
 
-        liveaction_db = RuleEnforcer._invoke_action(self.rule.action, data, context)
+        liveaction_db = RuleEnforcer._invoke_action(self.rule.action, data, context,
+                                                    trace_db=trace_db, rule_db=self.rule,
+                                                    trigger_instance_db=self.trigger_instance,
+                                                    trigger_db=self.trigger)
         if not liveaction_db:
             extra = {'trigger_instance_db': self.trigger_instance, 'rule_db': self.rule}
             LOG.audit('Rule enforcement failed. Liveaction for Action %s failed. '
@@ -87,7 +99,7 @@ class RuleEnforcer(object):
 
     def _update_trace(self):
         """
-        :rtype: ``dict`` trace_context as a dict; could be None
+        :rtype: ``TraceDB``; could be None
         """
         trace_db = None
         try:
@@ -101,10 +113,11 @@ class RuleEnforcer(object):
 
         trace_db = trace_service.add_or_update_given_trace_db(trace_db=trace_db,
                                                               rules=[str(self.rule.id)])
-        return vars(TraceContext(id_=str(trace_db.id), trace_tag=trace_db.trace_tag))
+        return trace_db
 
     @staticmethod
-    def _invoke_action(action_exec_spec, params, context=None):
+    def _invoke_action(action_exec_spec, params, context=None, trace_db=None, rule_db=None,
+                       trigger_instance_db=None, trigger_db=None):
         """
         Schedule an action execution.
 
@@ -113,6 +126,9 @@ class RuleEnforcer(object):
         :param params: Parameters to execute the action with.
         :type params: ``dict``
 
+        Already loaded trace, rule, trigger instance and trigger objects are passed to the action
+        service to avoid additional database lookups.
+
         :rtype: :class:`LiveActionDB` on successful schedueling, None otherwise.
         """
         action_ref = action_exec_spec['ref']
@@ -120,7 +136,9 @@ class RuleEnforcer(object):
         # prior to shipping off the params cast them to the right type.
         params = action_param_utils.cast_params(action_ref, params)
         liveaction = LiveActionDB(action=action_ref, context=context, parameters=params)
-        liveaction, _ = action_service.request(liveaction)
+        liveaction, _ = action_service.request(liveaction, trace_db=trace_db, rule_db=rule_db,
+                                               trigger_instance_db=trigger_instance_db,
+                                               trigger_db=trigger_db)
 
         if liveaction.status == action_constants.LIVEACTION_STATUS_REQUESTED:
             return liveaction
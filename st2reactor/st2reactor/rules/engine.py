@@ -13,41 +13,122 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
+import eventlet
+
 from st2common import log as logging
 from st2common.persistence.rule import Rule
 from st2common.services.triggers import get_trigger_db_by_ref
 from st2reactor.rules.enforcer import RuleEnforcer
 from st2reactor.rules.matcher import RulesMatcher
+from st2reactor.rules.network import NetworkRulesMatcher
+
+MATCHER_LINEAR = 'linear'
+MATCHER_NETWORK = 'network'
 
 LOG = logging.getLogger('st2reactor.rules.RulesEngine')
 
 
 class RulesEngine(object):
+    def __init__(self, rule_index=None, enforcement_pool_size=1, matcher=MATCHER_LINEAR):
+        """
+        :param rule_index: Optional in-memory rule index. If not provided, rules are always
+                           retrieved from the database.
+        :type rule_index: :class:`st2reactor.rules.index.RuleIndex`
+
+        :param enforcement_pool_size: Maximum number of rules which are enforced concurrently.
+                                      If 1, rules are enforced sequentially.
+        :type enforcement_pool_size: ``int``
+
+        :param matcher: Name of the rules matcher to use (linear, network).
+        :type matcher: ``str``
+        """
+        if matcher not in [MATCHER_LINEAR, MATCHER_NETWORK]:
+            raise ValueError('Invalid rules matcher: %s' % (matcher))
+
+        self._rule_index = rule_index
+        self._matcher = matcher
+
+        if enforcement_pool_size > 1:
+            self._enforcement_pool = eventlet.GreenPool(enforcement_pool_size)
+        else:
+            self._enforcement_pool = None
+
+        self._enforcement_stats = {
+            'enforced': 0,
+            'failed': 0,
+            'total_time': 0.0,
+            'max_time': 0.0
+        }
+
     def handle_trigger_instance(self, trigger_instance):
         # Find matching rules for trigger instance.
-        matching_rules = self.get_matching_rules_for_trigger(trigger_instance)
+        trigger, matching_rules = self._get_trigger_and_matching_rules(trigger_instance)
 
         # Create rule enforcers.
-        enforcers = self.create_rule_enforcers(trigger_instance, matching_rules)
+        enforcers = self.create_rule_enforcers(trigger_instance, matching_rules, trigger=trigger)
 
         # Enforce the rules.
         self.enforce_rules(enforcers)
 
     def get_matching_rules_for_trigger(self, trigger_instance):
-        trigger = trigger_instance.trigger
-        trigger = get_trigger_db_by_ref(trigger_instance.trigger)
-        rules = Rule.query(trigger=trigger_instance.trigger, enabled=True)
+        _, matching_rules = self._get_trigger_and_matching_rules(trigger_instance)
+        return matching_rules
+
+    def _get_trigger_and_matching_rules(self, trigger_instance):
+        """
+        :return: (trigger_db, matching_rule_dbs) tuple.
+        :rtype: ``tuple``
+        """
+        trigger, rules, compiled_rules = self._get_trigger_and_rules(
+            trigger_ref=trigger_instance.trigger)
         LOG.info('Found %d rules defined for trigger %s (type=%s)', len(rules), trigger['name'],
                  trigger['type'])
-        matcher = RulesMatcher(trigger_instance=trigger_instance,
-                               trigger=trigger, rules=rules)
+        if self._matcher == MATCHER_NETWORK:
+            network = None
+
+            # Networks are only cached for the rules served from the index
+            if compiled_rules is not None:
+                network = self._rule_index.get_rule_network(trigger_ref=trigger_instance.trigger)
+
+            matcher = NetworkRulesMatcher(trigger_instance=trigger_instance,
+                                          trigger=trigger, rules=rules,
+                                          compiled_rules=compiled_rules, network=network)
+        else:
+            matcher = RulesMatcher(trigger_instance=trigger_instance,
+                                   trigger=trigger, rules=rules, compiled_rules=compiled_rules)
 
         matching_rules = matcher.get_matching_rules()
         LOG.info('Matched %s rule(s) for trigger_instance %s (type=%s)', len(matching_rules),
                  trigger['name'], trigger['type'])
-        return matching_rules
+        return trigger, matching_rules
 
-    def create_rule_enforcers(self, trigger_instance, matching_rules):
+    def _get_trigger_and_rules(self, trigger_ref):
+        """
+        :return: (trigger_db, rule_dbs, compiled_rules) tuple where compiled_rules maps rule id
+                 to a pre-compiled rule.
+        :rtype: ``tuple``
+        """
+        if self._rule_index:
+            result = self._rule_index.get_trigger_and_rules(trigger_ref=trigger_ref)
+
+            if result:
+                trigger, compiled_rules = result
+                rules = [compiled_rule.rule for compiled_rule in compiled_rules]
+                compiled_rules = dict([(str(compiled_rule.rule.id), compiled_rule)
+                                       for compiled_rule in compiled_rules])
+                return trigger, rules, compiled_rules
+
+        trigger = get_trigger_db_by_ref(trigger_ref)
+        rules = Rule.query(trigger=trigger_ref, enabled=True)
+
+        if self._rule_index and trigger:
+            self._rule_index.add_trigger(trigger)
+
+        return trigger, rules, None
+
+    def create_rule_enforcers(self, trigger_instance, matching_rules, trigger=None):
         """
         Creates a RuleEnforcer matching to each rule.
 
@@ -56,12 +137,58 @@ class RulesEngine(object):
         """
         enforcers = []
         for matching_rule in matching_rules:
-            enforcers.append(RuleEnforcer(trigger_instance, matching_rule))
+            enforcers.append(RuleEnforcer(trigger_instance, matching_rule, trigger=trigger))
         return enforcers
 
     def enforce_rules(self, enforcers):
-        for enforcer in enforcers:
-            try:
-                enforcer.enforce()  # Should this happen in an eventlet pool?
-            except:
-                LOG.exception('Exception enforcing rule %s.', enforcer.rule)
+        """
+        Enforce the provided rules.
+
+        If concurrent enforcement is enabled, enforcers for a single trigger instance run in a
+        bounded green pool. This method still only returns after all of them have finished so
+        all the rules for a trigger instance are enforced before the next step for that trigger
+        instance happens. Results are returned in the same order as enforcers.
+
+        :rtype: ``list``
+        """
+        if not self._enforcement_pool or len(enforcers) <= 1:
+            return [self._enforce(enforcer) for enforcer in enforcers]
+
+        return list(self._enforcement_pool.imap(self._enforce, enforcers))
+
+    def get_enforcement_stats(self):
+        """
+        :rtype: ``dict``
+        """
+        stats = dict(self._enforcement_stats)
+        count = stats['enforced'] + stats['failed']
+        stats['avg_time'] = (stats['total_time'] / count) if count else 0.0
+        return stats
+
+    def _enforce(self, enforcer):
+        start_time = time.time()
+
+        try:
+            result = enforcer.enforce()
+        except:
+            # Errors are isolated per enforcer so one failing rule doesn't affect the others
+            LOG.exception('Exception enforcing rule %s.', enforcer.rule)
+            result = None
+            succeeded = False
+        else:
+            succeeded = True
+
+        elapsed = time.time() - start_time
+        self._record_enforcement(elapsed=elapsed, succeeded=succeeded)
+        LOG.debug('Enforcing rule %s took %.3f seconds.', enforcer.rule.ref, elapsed)
+
+        return result
+
+    def _record_enforcement(self, elapsed, succeeded):
+        if succeeded:
+            self._enforcement_stats['enforced'] += 1
+        else:
+            self._enforcement_stats['failed'] += 1
+
+        self._enforcement_stats['total_time'] += elapsed
+        self._enforcement_stats['max_time'] = max(self._enforcement_stats['max_time'], elapsed)
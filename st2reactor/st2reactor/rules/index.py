@@ -0,0 +1,191 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+
+from st2common import log as logging
+from st2common.persistence.rule import Rule
+from st2common.services.rule_watcher import RuleWatcher
+from st2common.services.triggerwatcher import TriggerWatcher
+from st2reactor.rules.compiled import CompiledRule
+from st2reactor.rules.network import RuleNetwork
+
+__all__ = [
+    'RuleIndex'
+]
+
+LOG = logging.getLogger('st2reactor.rules.RuleIndex')
+
+
+class RuleIndex(object):
+    """
+    Process-local index of enabled rules keyed by the trigger reference.
+
+    Index is warmed from the database on start and afterwards kept up to date using the rule
+    and trigger CUD events so looking up rules for a trigger instance requires no database
+    round trips. Rules are compiled once when they are loaded or updated. Until the index is
+    warm all the lookups are reported as fallbacks and the caller is expected to go to the
+    database.
+    """
+
+    def __init__(self, queue_suffix=None):
+        # trigger ref -> {rule id: CompiledRule}
+        self._rules_by_trigger = {}
+        # rule id -> trigger ref, needed to handle updates which change the trigger
+        self._rule_trigger_refs = {}
+        # trigger ref -> TriggerDB
+        self._triggers = {}
+        # trigger ref -> RuleNetwork, built lazily and dropped when rules for a trigger change
+        self._networks = {}
+
+        self._warm = False
+        self._stats = {
+            'hits': 0,
+            'fallbacks': 0
+        }
+
+        self._rule_watcher = RuleWatcher(create_handler=self._handle_create_rule,
+                                         update_handler=self._handle_update_rule,
+                                         delete_handler=self._handle_delete_rule,
+                                         queue_suffix=queue_suffix)
+        self._trigger_watcher = TriggerWatcher(create_handler=self._handle_create_trigger,
+                                               update_handler=self._handle_update_trigger,
+                                               delete_handler=self._handle_delete_trigger,
+                                               trigger_types=None,
+                                               queue_suffix=queue_suffix)
+        self._load_thread = None
+
+    def start(self):
+        # Watchers are started first so no update is lost while the index is being warmed.
+        self._rule_watcher.start()
+        self._trigger_watcher.start()
+        self._load_thread = eventlet.spawn(self._load_rules_from_db)
+
+    def stop(self):
+        try:
+            if self._load_thread:
+                self._load_thread = eventlet.kill(self._load_thread)
+        finally:
+            self._rule_watcher.stop()
+            self._trigger_watcher.stop()
+            LOG.info('Rule index stats: %s', self.get_stats())
+
+    def get_trigger_and_rules(self, trigger_ref):
+        """
+        Retrieve trigger and all the enabled compiled rules for the provided trigger reference.
+
+        :param trigger_ref: Trigger reference.
+        :type trigger_ref: ``str``
+
+        :return: (trigger_db, compiled_rules) tuple or None if the lookup can't be served from
+                 the index.
+        :rtype: ``tuple``
+        """
+        trigger_db = self._triggers.get(trigger_ref, None)
+
+        if not self._warm or not trigger_db:
+            self._stats['fallbacks'] += 1
+            return None
+
+        self._stats['hits'] += 1
+        compiled_rules = list(self._rules_by_trigger.get(trigger_ref, {}).values())
+        return trigger_db, compiled_rules
+
+    def get_rule_network(self, trigger_ref):
+        """
+        Retrieve a discrimination network built from all the enabled rules for the provided
+        trigger reference.
+
+        :rtype: :class:`RuleNetwork`
+        """
+        network = self._networks.get(trigger_ref, None)
+
+        if not network:
+            compiled_rules = list(self._rules_by_trigger.get(trigger_ref, {}).values())
+            network = RuleNetwork(compiled_rules=compiled_rules)
+            self._networks[trigger_ref] = network
+
+        return network
+
+    def add_trigger(self, trigger_db):
+        """
+        Add a trigger which has been retrieved from the database on a fallback.
+        """
+        self._triggers[trigger_db.get_reference().ref] = trigger_db
+
+    def get_stats(self):
+        """
+        :rtype: ``dict``
+        """
+        stats = dict(self._stats)
+        stats['rules'] = len(self._rule_trigger_refs)
+        stats['triggers'] = len(self._triggers)
+        return stats
+
+    def _load_rules_from_db(self):
+        for rule_db in Rule.query(enabled=True):
+            self._add_rule(rule_db)
+
+        self._warm = True
+        LOG.info('Rule index warmed with %s rule(s).', len(self._rule_trigger_refs))
+
+    def _add_rule(self, rule_db):
+        rule_id = str(rule_db.id)
+
+        # Rule could have moved to a different trigger
+        self._remove_rule(rule_db)
+
+        if not rule_db.enabled:
+            return
+
+        compiled_rule = CompiledRule(rule_db)
+        self._rules_by_trigger.setdefault(rule_db.trigger, {})[rule_id] = compiled_rule
+        self._rule_trigger_refs[rule_id] = rule_db.trigger
+        self._networks.pop(rule_db.trigger, None)
+
+    def _remove_rule(self, rule_db):
+        rule_id = str(rule_db.id)
+        trigger_ref = self._rule_trigger_refs.pop(rule_id, None)
+
+        if trigger_ref is None:
+            return
+
+        self._networks.pop(trigger_ref, None)
+        rules = self._rules_by_trigger.get(trigger_ref, {})
+        rules.pop(rule_id, None)
+
+        if not rules:
+            self._rules_by_trigger.pop(trigger_ref, None)
+
+    def _handle_create_rule(self, rule_db):
+        LOG.debug('Adding rule %s to the index.', rule_db.ref)
+        self._add_rule(rule_db)
+
+    def _handle_update_rule(self, rule_db):
+        LOG.debug('Updating rule %s in the index.', rule_db.ref)
+        self._add_rule(rule_db)
+
+    def _handle_delete_rule(self, rule_db):
+        LOG.debug('Removing rule %s from the index.', rule_db.ref)
+        self._remove_rule(rule_db)
+
+    def _handle_create_trigger(self, trigger_db):
+        self.add_trigger(trigger_db)
+
+    def _handle_update_trigger(self, trigger_db):
+        self.add_trigger(trigger_db)
+
+    def _handle_delete_trigger(self, trigger_db):
+        self._triggers.pop(trigger_db.get_reference().ref, None)
@@ -21,22 +21,29 @@ LOG = logging.getLogger('st2reactor.rules.RulesMatcher')
 
 
 class RulesMatcher(object):
-    def __init__(self, trigger_instance, trigger, rules):
+    def __init__(self, trigger_instance, trigger, rules, compiled_rules=None):
+        """
+        :param compiled_rules: Optional map of rule id to pre-compiled rule.
+        :type compiled_rules: ``dict``
+        """
         self.trigger_instance = trigger_instance
         self.trigger = trigger
         self.rules = rules
+        self.compiled_rules = compiled_rules or {}
 
     def get_matching_rules(self):
         first_pass, second_pass = self._split_rules_into_passes()
         # first pass
-        rule_filters = [RuleFilter(self.trigger_instance, self.trigger, rule)
+        rule_filters = [RuleFilter(self.trigger_instance, self.trigger, rule,
+                                   compiled_rule=self._get_compiled_rule(rule))
                         for rule in first_pass]
         matched_rules = [rule_filter.rule for rule_filter in rule_filters if rule_filter.filter()]
         LOG.debug('[1st_pass] %d rule(s) found to enforce for %s.', len(matched_rules),
                   self.trigger['name'])
         # second pass
         rule_filters = [SecondPassRuleFilter(self.trigger_instance, self.trigger, rule,
-                                             matched_rules)
+                                             matched_rules,
+                                             compiled_rule=self._get_compiled_rule(rule))
                         for rule in second_pass]
         matched_in_second_pass = [rule_filter.rule for rule_filter in rule_filters
                                   if rule_filter.filter()]
@@ -47,6 +54,9 @@ class RulesMatcher(object):
                  self.trigger['name'])
         return matched_rules
 
+    def _get_compiled_rule(self, rule):
+        return self.compiled_rules.get(str(rule.id), None)
+
     def _split_rules_into_passes(self):
         """
         Splits the rules in the Matcher into first_pass and second_pass collections.
@@ -0,0 +1,208 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Discrimination network (Rete-style) rules matcher.
+
+Instead of evaluating every criterion of every rule linearly, rules are compiled into a shared
+network. Constant equality tests on the same payload path are evaluated once per trigger
+instance and hashed into buckets so looking up all the rules which pass the equality tests for
+a particular path is a single dictionary lookup. Only the remaining (non-equality) criteria of
+the candidate rules are then evaluated one by one, re-using payload values which have already
+been retrieved.
+"""
+
+from collections import defaultdict
+
+from st2common import log as logging
+from st2common.constants.rules import RULE_TYPE_BACKSTOP
+from st2reactor.rules.compiled import CompiledRule
+from st2reactor.rules.filter import PayloadLookup
+
+__all__ = [
+    'RuleNetwork',
+    'NetworkRulesMatcher'
+]
+
+LOG = logging.getLogger('st2reactor.rules.NetworkRulesMatcher')
+
+
+class RuleNetwork(object):
+    def __init__(self, compiled_rules):
+        """
+        :param compiled_rules: Compiled rules which make up this network.
+        :type compiled_rules: ``list`` of :class:`CompiledRule`
+        """
+        self.compiled_rules = compiled_rules
+
+        # criterion key -> criterion which is used to retrieve the payload value for that key
+        self._value_criteria = {}
+
+        # criterion key -> {pattern: [rule index, ...]}
+        self._buckets = defaultdict(lambda: defaultdict(list))
+
+        # rule index -> number of equality tests the rule has
+        self._equality_tests_count = []
+
+        # rule index -> criteria which are not part of the shared network
+        self._residual_criteria = []
+
+        # Indexes of rules which have no equality tests
+        self._unconstrained = []
+
+        self._is_backstop = []
+
+        self._build()
+
+    def get_matching_rules(self, payload):
+        """
+        Return rules matching the provided trigger payload. Backstop rules are only returned if
+        no other rule matches.
+
+        :param payload: Trigger instance payload.
+        :type payload: ``dict``
+
+        :rtype: ``list`` of :class:`RuleDB`
+        """
+        if not payload:
+            # Rules with criteria can't match an empty payload
+            candidates = [index for index, compiled_rule in enumerate(self.compiled_rules)
+                          if not compiled_rule.criteria]
+            return self._filter_candidates(candidates=candidates, payload_lookup=None,
+                                           value_cache=None)
+
+        payload_lookup = PayloadLookup(payload)
+        value_cache = {}
+        passed_tests_count = defaultdict(int)
+
+        for key, buckets in self._buckets.items():
+            criterion = self._value_criteria[key]
+
+            try:
+                value = criterion.get_payload_value(payload_lookup=payload_lookup,
+                                                    value_cache=value_cache)
+            except:
+                LOG.exception('Failed transforming criteria key %s', key)
+                continue
+
+            try:
+                rule_indexes = buckets.get(value, None)
+            except TypeError:
+                # Unhashable values (e.g. list, dict) can't equal any of the constant patterns
+                rule_indexes = None
+
+            for index in rule_indexes or []:
+                passed_tests_count[index] += 1
+
+        candidates = [index for index, count in passed_tests_count.items()
+                      if count == self._equality_tests_count[index]]
+        candidates.extend(self._unconstrained)
+        candidates.sort()
+
+        return self._filter_candidates(candidates=candidates, payload_lookup=payload_lookup,
+                                       value_cache=value_cache)
+
+    def _filter_candidates(self, candidates, payload_lookup, value_cache):
+        first_pass = [index for index in candidates if not self._is_backstop[index]]
+        matched = self._evaluate_residual_criteria(candidates=first_pass,
+                                                   payload_lookup=payload_lookup,
+                                                   value_cache=value_cache)
+        LOG.debug('[1st_pass] %d rule(s) found to enforce.', len(matched))
+
+        # Backstop rules only apply if no rule matched in the first pass.
+        if not matched:
+            second_pass = [index for index in candidates if self._is_backstop[index]]
+            matched = self._evaluate_residual_criteria(candidates=second_pass,
+                                                       payload_lookup=payload_lookup,
+                                                       value_cache=value_cache)
+            LOG.debug('[2nd_pass] %d rule(s) found to enforce.', len(matched))
+
+        return [self.compiled_rules[index].rule for index in matched]
+
+    def _evaluate_residual_criteria(self, candidates, payload_lookup, value_cache):
+        matched = []
+
+        for index in candidates:
+            if not self.compiled_rules[index].rule.enabled:
+                continue
+
+            is_rule_applicable = True
+            for criterion in self._residual_criteria[index]:
+                is_rule_applicable = criterion.evaluate(payload_lookup=payload_lookup,
+                                                        value_cache=value_cache)
+                if not is_rule_applicable:
+                    break
+
+            if is_rule_applicable:
+                matched.append(index)
+
+        return matched
+
+    def _build(self):
+        for index, compiled_rule in enumerate(self.compiled_rules):
+            equality_tests_count = 0
+            residual_criteria = []
+
+            for criterion in compiled_rule.criteria:
+                if criterion.is_equality_test:
+                    self._value_criteria.setdefault(criterion.key, criterion)
+                    self._buckets[criterion.key][criterion.pattern].append(index)
+                    equality_tests_count += 1
+                else:
+                    residual_criteria.append(criterion)
+
+            self._equality_tests_count.append(equality_tests_count)
+            self._residual_criteria.append(residual_criteria)
+            self._is_backstop.append(compiled_rule.rule.type['ref'] == RULE_TYPE_BACKSTOP)
+
+            if equality_tests_count == 0:
+                self._unconstrained.append(index)
+
+
+class NetworkRulesMatcher(object):
+    """
+    Rules matcher with the same interface and semantics as
+    :class:`st2reactor.rules.matcher.RulesMatcher` which uses a discrimination network.
+    """
+
+    def __init__(self, trigger_instance, trigger, rules, compiled_rules=None, network=None):
+        """
+        :param compiled_rules: Optional map of rule id to pre-compiled rule.
+        :type compiled_rules: ``dict``
+
+        :param network: Optional pre-built network for the provided rules.
+        :type network: :class:`RuleNetwork`
+        """
+        self.trigger_instance = trigger_instance
+        self.trigger = trigger
+        self.rules = rules
+        self.compiled_rules = compiled_rules or {}
+        self.network = network
+
+    def get_matching_rules(self):
+        network = self.network or RuleNetwork(compiled_rules=self._get_compiled_rules())
+        matched_rules = network.get_matching_rules(payload=self.trigger_instance.payload)
+        LOG.info('%d rule(s) found to enforce for %s.', len(matched_rules),
+                 self.trigger['name'])
+        return matched_rules
+
+    def _get_compiled_rules(self):
+        result = []
+
+        for rule in self.rules:
+            compiled_rule = self.compiled_rules.get(str(rule.id), None) or CompiledRule(rule)
+            result.append(compiled_rule)
+
+        return result
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from kombu import Connection
+from oslo_config import cfg
 
 from st2common import log as logging
 from st2common.constants.trace import TRACE_CONTEXT, TRACE_ID
@@ -23,6 +24,7 @@ from st2common.transport import consumers, reactor
 from st2common.transport import utils as transport_utils
 import st2reactor.container.utils as container_utils
 from st2reactor.rules.engine import RulesEngine
+from st2reactor.rules.index import RuleIndex
 
 
 LOG = logging.getLogger(__name__)
@@ -33,10 +35,35 @@ RULESENGINE_WORK_Q = reactor.get_trigger_instances_queue(
 
 class TriggerInstanceDispatcher(consumers.MessageHandler):
     message_type = dict
+    config_group = 'rulesengine'
+    batch_acks = True
+    requeue_failed = True
 
     def __init__(self, connection, queues):
         super(TriggerInstanceDispatcher, self).__init__(connection, queues)
-        self.rules_engine = RulesEngine()
+
+        if cfg.CONF.rulesengine.enable_rule_index:
+            self.rule_index = RuleIndex()
+        else:
+            self.rule_index = None
+
+        self.rules_engine = RulesEngine(
+            rule_index=self.rule_index,
+            enforcement_pool_size=cfg.CONF.rulesengine.enforcement_pool_size,
+            matcher=cfg.CONF.rulesengine.matcher)
+
+    def start(self, wait=False):
+        if self.rule_index:
+            self.rule_index.start()
+
+        super(TriggerInstanceDispatcher, self).start(wait=wait)
+
+    def shutdown(self):
+        super(TriggerInstanceDispatcher, self).shutdown()
+        LOG.info('Rule enforcement stats: %s', self.rules_engine.get_enforcement_stats())
+
+        if self.rule_index:
+            self.rule_index.stop()
 
     def process(self, instance):
         trigger = instance['trigger']
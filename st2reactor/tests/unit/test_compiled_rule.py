@@ -0,0 +1,67 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+import mock
+import unittest2
+
+from st2reactor.rules.compiled import CompiledCriterion
+from st2reactor.rules.filter import PayloadLookup
+
+
+class CompiledCriterionTestCase(unittest2.TestCase):
+
+    def test_regex_pattern_is_precompiled(self):
+        criterion = CompiledCriterion(key='trigger.p1',
+                                      criterion={'type': 'matchregex', 'pattern': 'v\\d+'})
+        self.assertEqual(criterion.error, None)
+        self.assertTrue(isinstance(criterion.pattern, type(re.compile(''))))
+        self.assertTrue(criterion.evaluate(PayloadLookup({'p1': 'v1'})))
+        self.assertFalse(criterion.evaluate(PayloadLookup({'p1': 'x1'})))
+
+    @mock.patch('st2reactor.rules.compiled.render_template_with_system_context')
+    def test_static_template_pattern_is_rendered_once(self, mock_render):
+        criterion = CompiledCriterion(key='trigger.p1',
+                                      criterion={'type': 'equals', 'pattern': '{{ "v" ~ 1 }}'})
+        self.assertFalse(criterion.is_dynamic_pattern)
+        self.assertEqual(criterion.pattern, 'v1')
+        self.assertTrue(criterion.evaluate(PayloadLookup({'p1': 'v1'})))
+        self.assertFalse(mock_render.called)
+
+    @mock.patch('st2reactor.rules.compiled.render_template_with_system_context',
+                mock.MagicMock(return_value='v1'))
+    def test_datastore_template_pattern_is_rendered_on_evaluation(self):
+        criterion = CompiledCriterion(key='trigger.p1',
+                                      criterion={'type': 'equals',
+                                                 'pattern': '{{ system.value }}'})
+        self.assertTrue(criterion.is_dynamic_pattern)
+        self.assertTrue(criterion.evaluate(PayloadLookup({'p1': 'v1'})))
+        self.assertFalse(criterion.evaluate(PayloadLookup({'p1': 'v2'})))
+
+    def test_invalid_criterion_never_matches(self):
+        criterion = CompiledCriterion(key='trigger.p1', criterion={'pattern': 'v1'})
+        self.assertTrue(criterion.error)
+        self.assertFalse(criterion.evaluate(PayloadLookup({'p1': 'v1'})))
+
+        criterion = CompiledCriterion(key='trigger.p1',
+                                      criterion={'type': 'unknown', 'pattern': 'v1'})
+        self.assertTrue(criterion.error)
+        self.assertFalse(criterion.evaluate(PayloadLookup({'p1': 'v1'})))
+
+        criterion = CompiledCriterion(key='trigger.p1',
+                                      criterion={'type': 'matchregex', 'pattern': '(v1'})
+        self.assertTrue(criterion.error)
+        self.assertFalse(criterion.evaluate(PayloadLookup({'p1': 'v1'})))
@@ -133,8 +133,8 @@ class FilterTest(DbTestCase):
         f = RuleFilter(MOCK_TRIGGER_INSTANCE, MOCK_TRIGGER, rule)
         self.assertTrue(f.filter(), '"floattt" key ain\'t exist in trigger. Should return true.')
 
-    @mock.patch('st2common.util.templating.KeyValueLookup')
-    def test_criteria_pattern_references_a_datastore_item(self, mock_KeyValueLookup):
+    @mock.patch('st2common.util.templating.get_key_value_lookup')
+    def test_criteria_pattern_references_a_datastore_item(self, mock_get_key_value_lookup):
         class MockResultLookup(object):
             pass
 
@@ -154,7 +154,7 @@ class FilterTest(DbTestCase):
         # Using a variable in pattern, referencing an existing value which doesn't match
         mock_result = MockSystemLookup()
         mock_result.test_value_1 = 'non matching'
-        mock_KeyValueLookup.return_value = mock_result
+        mock_get_key_value_lookup.return_value = mock_result
 
         rule.criteria = {'trigger.p1': {'type': 'equals', 'pattern': '{{ system.test_value_1 }}'}}
         f = RuleFilter(MOCK_TRIGGER_INSTANCE, MOCK_TRIGGER, rule)
@@ -163,7 +163,7 @@ class FilterTest(DbTestCase):
         # Using a variable in pattern, referencing an existing value which does match
         mock_result = MockSystemLookup()
         mock_result.test_value_2 = 'v1'
-        mock_KeyValueLookup.return_value = mock_result
+        mock_get_key_value_lookup.return_value = mock_result
 
         rule.criteria = {'trigger.p1': {'type': 'equals', 'pattern': '{{ system.test_value_2 }}'}}
         f = RuleFilter(MOCK_TRIGGER_INSTANCE, MOCK_TRIGGER, rule)
@@ -172,7 +172,7 @@ class FilterTest(DbTestCase):
         # Using a variable in pattern, referencing an existing value which matches partially
         mock_result = MockSystemLookup()
         mock_result.test_value_3 = 'YYY'
-        mock_KeyValueLookup.return_value = mock_result
+        mock_get_key_value_lookup.return_value = mock_result
 
         rule.criteria = {'trigger.p2': {'type': 'equals', 'pattern': '{{ system.test_value_3 }}'}}
         f = RuleFilter(MOCK_TRIGGER_INSTANCE, MOCK_TRIGGER, rule)
@@ -181,7 +181,7 @@ class FilterTest(DbTestCase):
         # Using a variable in pattern, referencing an existing value which matches partially
         mock_result = MockSystemLookup()
         mock_result.test_value_3 = 'YYY'
-        mock_KeyValueLookup.return_value = mock_result
+        mock_get_key_value_lookup.return_value = mock_result
 
         rule.criteria = {'trigger.p2': {
             'type': 'equals',
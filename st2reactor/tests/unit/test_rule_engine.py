@@ -89,6 +89,30 @@ class RuleEngineTest(DbTestCase):
         rules_engine = RulesEngine()
         rules_engine.handle_trigger_instance(trigger_instance)  # should not throw.
 
+    def test_enforce_rules_concurrently_isolates_errors_and_preserves_order(self):
+        def get_enforcer(result):
+            enforcer = mock.Mock()
+            enforcer.rule.ref = 'sixpack.rule'
+            if isinstance(result, Exception):
+                enforcer.enforce.side_effect = result
+            else:
+                enforcer.enforce.return_value = result
+            return enforcer
+
+        for pool_size in [1, 5]:
+            rules_engine = RulesEngine(enforcement_pool_size=pool_size)
+            enforcers = [get_enforcer('la1'), get_enforcer(ValueError('failed')),
+                         get_enforcer('la3')]
+            results = rules_engine.enforce_rules(enforcers)
+
+            self.assertEqual(results, ['la1', None, 'la3'])
+            for enforcer in enforcers:
+                self.assertEqual(enforcer.enforce.call_count, 1)
+
+            stats = rules_engine.get_enforcement_stats()
+            self.assertEqual(stats['enforced'], 2)
+            self.assertEqual(stats['failed'], 1)
+
     @classmethod
     def _setup_test_models(cls):
         RuleEngineTest._setup_sample_triggers()
@@ -0,0 +1,130 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bson
+import mock
+import unittest2
+
+from st2common.models.db.rule import RuleDB
+from st2common.models.db.trigger import TriggerDB
+from st2common.persistence.rule import Rule
+from st2reactor.rules.engine import RulesEngine
+from st2reactor.rules.index import RuleIndex
+
+
+def _get_rule_db(name, trigger, enabled=True):
+    return RuleDB(id=bson.ObjectId(), name=name, pack='dummy_pack_1', trigger=trigger,
+                  enabled=enabled, criteria={})
+
+
+TRIGGER_1 = TriggerDB(pack='dummy_pack_1', name='st2.test.trigger1', type='dummy_pack_1.t1',
+                      parameters={})
+TRIGGER_2 = TriggerDB(pack='dummy_pack_1', name='st2.test.trigger2', type='dummy_pack_1.t2',
+                      parameters={})
+
+RULE_1 = _get_rule_db('rule1', 'dummy_pack_1.st2.test.trigger1')
+RULE_2 = _get_rule_db('rule2', 'dummy_pack_1.st2.test.trigger1')
+RULE_3 = _get_rule_db('rule3', 'dummy_pack_1.st2.test.trigger2')
+
+
+class RuleIndexTestCase(unittest2.TestCase):
+
+    def _get_warm_index(self):
+        index = RuleIndex()
+        index._handle_create_trigger(TRIGGER_1)
+        index._handle_create_trigger(TRIGGER_2)
+
+        with mock.patch.object(Rule, 'query', mock.MagicMock(return_value=[RULE_1, RULE_2,
+                                                                           RULE_3])):
+            index._load_rules_from_db()
+
+        return index
+
+    def test_lookup_before_warm_is_fallback(self):
+        index = RuleIndex()
+        index._handle_create_trigger(TRIGGER_1)
+        self.assertEqual(index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger1'), None)
+        self.assertEqual(index.get_stats()['fallbacks'], 1)
+        self.assertEqual(index.get_stats()['hits'], 0)
+
+    def test_lookup_unknown_trigger_is_fallback(self):
+        index = self._get_warm_index()
+        self.assertEqual(index.get_trigger_and_rules('dummy_pack_1.unknown'), None)
+        self.assertEqual(index.get_stats()['fallbacks'], 1)
+
+    def test_lookup_hit(self):
+        index = self._get_warm_index()
+        trigger_db, compiled_rules = index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger1')
+        self.assertEqual(trigger_db, TRIGGER_1)
+        self.assertItemsEqual([c.rule.name for c in compiled_rules], ['rule1', 'rule2'])
+        self.assertEqual(index.get_stats()['hits'], 1)
+        self.assertEqual(index.get_stats()['fallbacks'], 0)
+
+    def test_rule_cud_events_update_index(self):
+        index = self._get_warm_index()
+
+        # Disabling a rule removes it from the index
+        disabled_rule = _get_rule_db('rule1', 'dummy_pack_1.st2.test.trigger1', enabled=False)
+        disabled_rule.id = RULE_1.id
+        index._handle_update_rule(disabled_rule)
+        _, compiled_rules = index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger1')
+        self.assertEqual([c.rule.name for c in compiled_rules], ['rule2'])
+
+        # Moving a rule to a different trigger
+        moved_rule = _get_rule_db('rule2', 'dummy_pack_1.st2.test.trigger2')
+        moved_rule.id = RULE_2.id
+        index._handle_update_rule(moved_rule)
+        _, compiled_rules = index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger1')
+        self.assertEqual(compiled_rules, [])
+        _, compiled_rules = index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger2')
+        self.assertItemsEqual([c.rule.name for c in compiled_rules], ['rule2', 'rule3'])
+
+        # Deleting a rule
+        index._handle_delete_rule(RULE_3)
+        _, compiled_rules = index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger2')
+        self.assertEqual([c.rule.name for c in compiled_rules], ['rule2'])
+
+        # Creating a rule
+        new_rule = _get_rule_db('rule4', 'dummy_pack_1.st2.test.trigger1')
+        index._handle_create_rule(new_rule)
+        _, compiled_rules = index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger1')
+        self.assertEqual([c.rule.name for c in compiled_rules], ['rule4'])
+
+    def test_trigger_delete_event_causes_fallback(self):
+        index = self._get_warm_index()
+        index._handle_delete_trigger(TRIGGER_2)
+        self.assertEqual(index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger2'), None)
+
+    @mock.patch('st2reactor.rules.engine.get_trigger_db_by_ref',
+                mock.MagicMock(return_value=TRIGGER_1))
+    @mock.patch.object(Rule, 'query', mock.MagicMock(return_value=[]))
+    def test_rules_engine_uses_index(self):
+        index = self._get_warm_index()
+        engine = RulesEngine(rule_index=index)
+
+        trigger_db, rule_dbs, compiled_rules = engine._get_trigger_and_rules(
+            'dummy_pack_1.st2.test.trigger1')
+        self.assertEqual(len(rule_dbs), 2)
+        self.assertEqual(len(compiled_rules), 2)
+        self.assertFalse(Rule.query.called)
+
+        # Fallback goes to the database and caches the trigger
+        index._handle_delete_trigger(TRIGGER_1)
+        trigger_db, rule_dbs, compiled_rules = engine._get_trigger_and_rules(
+            'dummy_pack_1.st2.test.trigger1')
+        self.assertTrue(Rule.query.called)
+        self.assertEqual(compiled_rules, None)
+        self.assertEqual(index.get_trigger_and_rules('dummy_pack_1.st2.test.trigger1')[0],
+                         TRIGGER_1)
@@ -0,0 +1,108 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bson
+import mock
+import unittest2
+
+from st2common.constants.rules import RULE_TYPE_BACKSTOP
+from st2common.models.db.rule import RuleDB, RuleTypeSpecDB, ActionExecutionSpecDB
+from st2common.models.db.trigger import TriggerDB, TriggerInstanceDB
+from st2common.util import date as date_utils
+from st2reactor.rules.compiled import CompiledRule
+from st2reactor.rules.matcher import RulesMatcher
+from st2reactor.rules.network import RuleNetwork, NetworkRulesMatcher
+
+MOCK_TRIGGER = TriggerDB(pack='dummy_pack_1', name='trigger-test.name', type='system.test')
+
+
+def _get_rule_db(name, criteria, rule_type='standard', enabled=True):
+    return RuleDB(id=bson.ObjectId(), pack='wolfpack', name=name,
+                  trigger=MOCK_TRIGGER.get_reference().ref, criteria=criteria,
+                  type=RuleTypeSpecDB(ref=rule_type), enabled=enabled,
+                  action=ActionExecutionSpecDB(ref='somepack.someaction'))
+
+
+def _get_trigger_instance_db(payload):
+    return TriggerInstanceDB(trigger=MOCK_TRIGGER.get_reference().ref,
+                             occurrence_time=date_utils.get_datetime_utc_now(),
+                             payload=payload)
+
+
+RULES = [
+    _get_rule_db('no_criteria', {}),
+    _get_rule_db('repo_a', {'trigger.repo': {'type': 'equals', 'pattern': 'a'}}),
+    _get_rule_db('repo_a_master', {'trigger.repo': {'type': 'eq', 'pattern': 'a'},
+                                   'trigger.branch': {'type': 'equals', 'pattern': 'master'}}),
+    _get_rule_db('repo_b', {'trigger.repo': {'type': 'equals', 'pattern': 'b'}}),
+    _get_rule_db('repo_a_regex', {'trigger.repo': {'type': 'equals', 'pattern': 'a'},
+                                  'trigger.author': {'type': 'matchregex',
+                                                     'pattern': 'st.*'}}),
+    _get_rule_db('count', {'trigger.count': {'type': 'equals', 'pattern': 1}}),
+    _get_rule_db('list', {'trigger.items': {'type': 'equals', 'pattern': [1, 2]}}),
+    _get_rule_db('disabled', {'trigger.repo': {'type': 'equals', 'pattern': 'a'}},
+                 enabled=False),
+    _get_rule_db('backstop_a', {'trigger.repo': {'type': 'equals', 'pattern': 'a'}},
+                 rule_type=RULE_TYPE_BACKSTOP),
+    _get_rule_db('backstop_any', {'trigger.repo': {'type': 'exists'}},
+                 rule_type=RULE_TYPE_BACKSTOP)
+]
+
+PAYLOADS = [
+    {},
+    {'repo': 'a'},
+    {'repo': 'a', 'branch': 'master'},
+    {'repo': 'a', 'branch': 'dev', 'author': 'stanley'},
+    {'repo': 'b', 'count': 1},
+    {'repo': 'c'},
+    {'repo': ['a'], 'items': [1, 2]},
+    {'count': True},
+    {'other': 'value'}
+]
+
+
+@mock.patch('st2reactor.rules.filter.KeyValueLookup', mock.MagicMock())
+class NetworkRulesMatcherTestCase(unittest2.TestCase):
+
+    def test_network_matches_same_rules_as_linear_matcher(self):
+        for payload in PAYLOADS:
+            trigger_instance = _get_trigger_instance_db(payload)
+
+            linear_matcher = RulesMatcher(trigger_instance, MOCK_TRIGGER, RULES)
+            expected = [rule.name for rule in linear_matcher.get_matching_rules()]
+
+            network_matcher = NetworkRulesMatcher(trigger_instance, MOCK_TRIGGER, RULES)
+            actual = [rule.name for rule in network_matcher.get_matching_rules()]
+
+            self.assertItemsEqual(actual, expected, 'Payload: %s' % (payload))
+
+    def test_backstop_rules_only_match_if_no_other_rule_matched(self):
+        network = RuleNetwork(compiled_rules=[CompiledRule(rule) for rule in RULES])
+
+        matched = [rule.name for rule in network.get_matching_rules({'repo': 'c'})]
+        self.assertEqual(matched, ['no_criteria'])
+
+        rules = [rule for rule in RULES if rule.name != 'no_criteria']
+        network = RuleNetwork(compiled_rules=[CompiledRule(rule) for rule in rules])
+        matched = [rule.name for rule in network.get_matching_rules({'repo': 'c'})]
+        self.assertEqual(matched, ['backstop_any'])
+
+    def test_equality_tests_are_shared(self):
+        network = RuleNetwork(compiled_rules=[CompiledRule(rule) for rule in RULES])
+
+        # Single bucket per payload path, list pattern is not hashable so it's evaluated per rule
+        self.assertItemsEqual(network._buckets.keys(),
+                              ['trigger.repo', 'trigger.branch', 'trigger.count'])
+        self.assertItemsEqual(network._buckets['trigger.repo'].keys(), ['a', 'b'])
@@ -58,6 +58,7 @@ def _register_config_opts():
     _register_scheduler_opts()
     _register_exporter_opts()
     _register_sensor_container_opts()
+    _register_rules_engine_opts()
 
 
 def _override_db_opts():
@@ -90,7 +91,26 @@ def _register_api_opts():
         cfg.IntOpt('heartbeat', default=25,
                    help='Send empty message every N seconds to keep connection open'),
         cfg.BoolOpt('mask_secrets', default=True,
-                    help='True to mask secrets in API responses')
+                    help='True to mask secrets in API responses'),
+        cfg.IntOpt('stream_queue_size', default=1000,
+                   help='Maximum number of events buffered for each stream client'),
+        cfg.StrOpt('stream_overflow_policy', default='drop_oldest',
+                   choices=['drop_oldest', 'coalesce', 'disconnect'],
+                   help='What to do when the stream client buffer is full (drop_oldest, '
+                        'coalesce, disconnect)'),
+        cfg.IntOpt('stream_replay_buffer_size', default=1000,
+                   help='Number of most recent events kept in memory so stream clients can '
+                        'resume using Last-Event-ID. 0 disables resuming.'),
+        cfg.IntOpt('stream_replay_idle_timeout', default=60,
+                   help='How long (in seconds) events are still kept for resuming after the '
+                        'last stream client disconnects. Events are not processed at all when '
+                        'no client is connected for longer than that, but a client which '
+                        'reconnects later can\'t resume and needs to retrieve the current '
+                        'state.'),
+        cfg.IntOpt('execution_filters_refresh_interval', default=0,
+                   help='How often (in seconds) to reconcile execution filter values which are '
+                        'kept in memory with the database. 0 disables keeping the values in '
+                        'memory.')
     ]
     _register_opts(api_opts, group='api')
 
@@ -237,6 +257,17 @@ def _register_sensor_container_opts():
     _register_cli_opts([sensor_test_opt])
 
 
+def _register_rules_engine_opts():
+    rules_engine_opts = [
+        cfg.BoolOpt('enable_rule_index', default=True,
+                    help='Keep an in-memory index of enabled rules keyed by trigger reference.'),
+        cfg.IntOpt('enforcement_pool_size', default=1,
+                   help='Maximum number of rules which are enforced concurrently.'),
+        cfg.StrOpt('matcher', default='linear', help='Rules matcher to use.')
+    ]
+    _register_opts(rules_engine_opts, group='rulesengine')
+
+
 def _register_opts(opts, group=None):
     CONF.register_opts(opts, group)
 
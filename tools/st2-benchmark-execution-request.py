@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+
+Tags: Benchmark.
+
+A utility script which reports the number of database reads and writes and the time needed to
+request a single action execution using action_service.request.
+
+Scenarios:
+
+* manual - action run by hand
+* rule - action triggered by a rule where only references are available in the context
+* rule-preloaded - action triggered by a rule where the rules engine passes already loaded
+  trace, rule, trigger instance and trigger objects to the action service
+* child - child execution of a workflow
+
+Note: The script saves st2tests fixtures into the provided database and drops it at the end so
+it should only be run against a throwaway database.
+
+"""
+
+import argparse
+import time
+
+import mongoengine
+from oslo_config import cfg
+
+from st2common import config
+from st2common.constants.trace import TRACE_CONTEXT
+from st2common.models.api.trace import TraceContext
+from st2common.models.db import MongoDBAccess
+from st2common.models.db import db_setup
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.models.db.trace import TraceDB
+from st2common.persistence.trace import Trace
+from st2common.services import action as action_service
+from st2common.transport.publishers import PoolPublisher
+from st2common.util import reference
+from st2tests.fixturesloader import FixturesLoader
+
+FIXTURES_PACK = 'generic'
+
+FIXTURES = {
+    'actions': ['local.yaml'],
+    'runners': ['run-local.yaml'],
+    'triggertypes': ['triggertype2.yaml'],
+    'triggers': ['trigger2.yaml'],
+    'triggerinstances': ['trigger_instance_1.yaml'],
+    'rules': ['rule3.yaml']
+}
+
+READ_METHODS = ['get', 'query', 'count', 'distinct']
+WRITE_METHODS = ['insert', 'add_or_update', 'update', 'delete']
+
+
+class OperationsCounter(object):
+    """
+    Counts database operations performed through MongoDBAccess.
+    """
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+
+    def install(self):
+        for name in READ_METHODS:
+            setattr(MongoDBAccess, name, self._wrap(getattr(MongoDBAccess, name), 'reads'))
+
+        for name in WRITE_METHODS:
+            setattr(MongoDBAccess, name, self._wrap(getattr(MongoDBAccess, name), 'writes'))
+
+    def reset(self):
+        self.reads = 0
+        self.writes = 0
+
+    def _wrap(self, func, counter):
+        def wrapper(*args, **kwargs):
+            setattr(self, counter, getattr(self, counter) + 1)
+            return func(*args, **kwargs)
+        return wrapper
+
+
+def _get_liveaction(context=None):
+    context = context or {}
+    context['user'] = 'stanley'
+    return LiveActionDB(action='core.local', parameters={'cmd': 'echo benchmark'},
+                        context=context)
+
+
+def _get_scenarios(models):
+    rule_db = models['rules']['rule3.yaml']
+    trigger_instance_db = models['triggerinstances']['trigger_instance_1.yaml']
+    trigger_db = models['triggers']['trigger2.yaml']
+    trace_db = Trace.add_or_update(TraceDB(trace_tag='benchmark'))
+    trace_context = vars(TraceContext(id_=str(trace_db.id), trace_tag=trace_db.trace_tag))
+
+    def get_rule_context():
+        return {
+            'rule': reference.get_ref_from_model(rule_db),
+            'trigger_instance': reference.get_ref_from_model(trigger_instance_db),
+            TRACE_CONTEXT: trace_context
+        }
+
+    _, parent_execution_db = action_service.request(_get_liveaction())
+    parent_context = {'parent': {'execution_id': str(parent_execution_db.id)}}
+
+    return [
+        ('manual', lambda: action_service.request(_get_liveaction())),
+        ('rule', lambda: action_service.request(_get_liveaction(get_rule_context()))),
+        ('rule-preloaded', lambda: action_service.request(
+            _get_liveaction(get_rule_context()), trace_db=trace_db, rule_db=rule_db,
+            trigger_instance_db=trigger_instance_db, trigger_db=trigger_db)),
+        ('child', lambda: action_service.request(_get_liveaction(dict(parent_context))))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Action execution request benchmark')
+    parser.add_argument('--count', type=int, default=100,
+                        help='Number of executions to request for each scenario.')
+    parser.add_argument('--db-name', default='st2-benchmark',
+                        help='Name of the throwaway database to use.')
+    args = parser.parse_args()
+
+    config.parse_args(args=[])
+    db_setup(db_name=args.db_name, db_host=cfg.CONF.database.host,
+             db_port=cfg.CONF.database.port)
+
+    # Benchmark doesn't need a message bus
+    PoolPublisher.publish = lambda self, *args, **kwargs: None
+
+    try:
+        models = FixturesLoader().save_fixtures_to_db(fixtures_pack=FIXTURES_PACK,
+                                                      fixtures_dict=FIXTURES)
+        scenarios = _get_scenarios(models)
+
+        counter = OperationsCounter()
+        counter.install()
+
+        print('%16s %14s %14s %14s' % ('scenario', 'reads / exec', 'writes / exec',
+                                       'time (ms)'))
+
+        for name, func in scenarios:
+            counter.reset()
+            start = time.time()
+
+            for _ in range(args.count):
+                func()
+
+            elapsed = (time.time() - start) / args.count
+            print('%16s %14.1f %14.1f %14.2f' % (name, float(counter.reads) / args.count,
+                                                 float(counter.writes) / args.count,
+                                                 elapsed * 1000))
+    finally:
+        mongoengine.connection.get_connection().drop_database(args.db_name)
+
+
+if __name__ == '__main__':
+    main()
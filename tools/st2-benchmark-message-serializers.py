@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+
+Tags: Benchmark.
+
+A utility script which compares size and encode / decode CPU time of the pickle and st2json
+message bus serializers for the most common message types (LiveAction, ActionExecution and
+trigger instance messages).
+
+"""
+
+import argparse
+import pickle
+import time
+
+import bson
+
+from st2common import config
+from st2common.constants.trace import TRACE_CONTEXT
+from st2common.models.api.trace import TraceContext
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.transport import serializers
+from st2common.util import date as date_utils
+
+
+def _get_result(size):
+    return {
+        'stdout': 'x' * size,
+        'stderr': '',
+        'return_code': 0,
+        'succeeded': True,
+        'failed': False
+    }
+
+
+def _get_messages(result_size):
+    now = date_utils.get_datetime_utc_now()
+    parameters = {'cmd': 'uname -a', 'hosts': 'localhost', 'timeout': 60}
+
+    liveaction_db = LiveActionDB(id=bson.ObjectId(), action='core.remote', status='succeeded',
+                                 start_timestamp=now, end_timestamp=now, parameters=parameters,
+                                 result=_get_result(result_size),
+                                 context={'user': 'stanley'})
+    execution_db = ActionExecutionDB(id=bson.ObjectId(), status='succeeded',
+                                     start_timestamp=now, end_timestamp=now,
+                                     action={'ref': 'core.remote', 'name': 'remote',
+                                             'pack': 'core', 'runner_type': 'run-remote',
+                                             'parameters': {}},
+                                     runner={'name': 'run-remote', 'runner_parameters': {}},
+                                     liveaction={'id': str(liveaction_db.id),
+                                                 'callback': {}, 'action': 'core.remote'},
+                                     parameters=parameters, result=_get_result(result_size),
+                                     context={'user': 'stanley'})
+    trigger_instance = {
+        'trigger': 'core.st2.webhook',
+        'payload': {'headers': {'Content-Type': 'application/json'},
+                    'body': {'repository': 'st2', 'branch': 'master', 'commits': list(range(50))}},
+        TRACE_CONTEXT: TraceContext(trace_tag='webhook')
+    }
+
+    return [('LiveAction', liveaction_db), ('ActionExecution', execution_db),
+            ('TriggerInstance', trigger_instance)]
+
+
+def _benchmark(encode, decode, message, count):
+    start = time.time()
+    for _ in range(count):
+        data = encode(message)
+    encode_time = (time.time() - start) / count
+
+    start = time.time()
+    for _ in range(count):
+        decode(data)
+    decode_time = (time.time() - start) / count
+
+    return len(data), encode_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Message bus serializers benchmark')
+    parser.add_argument('--count', type=int, default=1000,
+                        help='Number of times each message is encoded and decoded.')
+    parser.add_argument('--result-size', type=int, default=10000,
+                        help='Size of the stdout in the execution result.')
+    args = parser.parse_args()
+
+    config.parse_args(args=[])
+
+    serializers_map = [
+        ('pickle', lambda message: pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL),
+         pickle.loads),
+        (serializers.JSON_SERIALIZER, serializers.encode, serializers.decode)
+    ]
+
+    print('%16s %10s %12s %14s %14s' % ('message', 'serializer', 'size (bytes)',
+                                        'encode (us)', 'decode (us)'))
+
+    for name, message in _get_messages(result_size=args.result_size):
+        for serializer, encode, decode in serializers_map:
+            size, encode_time, decode_time = _benchmark(encode, decode, message, args.count)
+            print('%16s %10s %12d %14.1f %14.1f' % (name, serializer, size,
+                                                     encode_time * 1000000,
+                                                     decode_time * 1000000))
+
+
+if __name__ == '__main__':
+    main()
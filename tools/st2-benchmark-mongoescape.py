@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+
+Tags: Benchmark.
+
+A utility script which measures CPU time needed to escape and unescape keys of large execution
+results (the same work which is performed on each write and read of EscapedDictField and
+EscapedDynamicField fields).
+
+It compares the current implementation with the previous one which deep copied the whole value.
+
+"""
+
+import argparse
+import copy
+import time
+
+import six
+
+from st2common.util import mongoescape
+
+
+def _legacy_translate_chars(field, translation):
+    if not isinstance(field, dict):
+        return field
+
+    work_items = [(k, v, field) for k, v in six.iteritems(field)]
+
+    while len(work_items) > 0:
+        oldkey, value, work_field = work_items.pop(0)
+        newkey = oldkey
+
+        for t_k, t_v in six.iteritems(translation):
+            newkey = newkey.replace(t_k, t_v)
+
+        if newkey != oldkey:
+            work_field[newkey] = value
+            del work_field[oldkey]
+
+        if isinstance(value, dict):
+            work_items.extend([(k, v, value) for k, v in six.iteritems(value)])
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    work_items.extend([(k, v, item) for k, v in six.iteritems(item)])
+
+    return field
+
+
+def _legacy_escape_chars(field):
+    return _legacy_translate_chars(copy.deepcopy(field), mongoescape.ESCAPE_TRANSLATION)
+
+
+def _legacy_unescape_chars(field):
+    value = copy.deepcopy(field)
+    value = _legacy_translate_chars(value, mongoescape.UNESCAPE_TRANSLATION)
+    return _legacy_translate_chars(value, mongoescape.RULE_CRITERIA_UNESCAPE_TRANSLATION)
+
+
+def _get_results(hosts):
+    """
+    Return results which resemble the ones produced by the most common runners.
+    """
+    # Remote command executed on many hosts, keys are host names and need to be escaped
+    remote_result = {}
+    for index in range(hosts):
+        remote_result['host%s.example.com' % (index)] = {
+            'stdout': 'Linux host%s 3.13.0-24-generic x86_64 GNU/Linux' % (index),
+            'stderr': '',
+            'return_code': 0,
+            'succeeded': True,
+            'failed': False
+        }
+
+    # Action returning a large JSON document without any keys which need to be escaped
+    http_result = {
+        'status_code': 200,
+        'headers': {'Content-Type': 'application/json'},
+        'body': [{'id': index, 'name': 'item-%s' % (index), 'tags': ['a', 'b', 'c'],
+                  'attributes': {'size': index, 'owner': 'stanley'}}
+                 for index in range(hosts * 5)]
+    }
+
+    # Workflow result with a mix of both
+    workflow_result = {
+        'tasks': [{'id': 'task%s' % (index), 'name': 'task%s' % (index), 'state': 'SUCCESS',
+                   'result': (copy.deepcopy(remote_result) if index % 10 == 0 else
+                              {'stdout': 'ok'})}
+                  for index in range(hosts)]
+    }
+
+    return [('remote', remote_result), ('http', http_result), ('workflow', workflow_result)]
+
+
+def _benchmark(func, value, count):
+    start = time.time()
+    for _ in range(count):
+        func(value)
+    return (time.time() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mongo key escaping benchmark')
+    parser.add_argument('--count', type=int, default=20,
+                        help='Number of times each result is escaped and unescaped.')
+    parser.add_argument('--hosts', type=int, default=500,
+                        help='Number of hosts / items in the generated results.')
+    args = parser.parse_args()
+
+    implementations = [
+        ('legacy', _legacy_escape_chars, _legacy_unescape_chars),
+        ('current', mongoescape.escape_chars, mongoescape.unescape_chars)
+    ]
+
+    print('%10s %14s %14s %14s' % ('result', 'implementation', 'escape (ms)', 'unescape (ms)'))
+
+    for name, result in _get_results(hosts=args.hosts):
+        escaped = mongoescape.escape_chars(result)
+
+        for implementation, escape, unescape in implementations:
+            escape_time = _benchmark(escape, result, args.count)
+            unescape_time = _benchmark(unescape, escaped, args.count)
+            print('%10s %14s %14.2f %14.2f' % (name, implementation, escape_time * 1000,
+                                                unescape_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
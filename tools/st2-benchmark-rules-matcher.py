@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+
+Tags: Benchmark.
+
+A utility script which compares performance of the linear rules matcher and the discrimination
+network rules matcher for different number of rules on a single trigger.
+
+Rules and trigger instances are constructed in memory so no database or message bus is needed.
+
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import bson
+
+from st2common.models.db.rule import RuleDB, ActionExecutionSpecDB
+from st2common.models.db.trigger import TriggerDB, TriggerInstanceDB
+from st2common.util import date as date_utils
+from st2reactor.rules.compiled import CompiledRule
+from st2reactor.rules.matcher import RulesMatcher
+from st2reactor.rules.network import RuleNetwork, NetworkRulesMatcher
+
+TRIGGER = TriggerDB(pack='core', name='st2.webhook', type='core.st2.webhook')
+
+
+def _get_rules(count):
+    rules = []
+
+    for index in range(count):
+        criteria = {
+            'trigger.body.repository': {'type': 'equals', 'pattern': 'repo-%s' % (index)},
+            'trigger.body.branch': {'type': 'equals', 'pattern': 'master'}
+        }
+
+        # Add some criteria which can't be hashed into buckets
+        if index % 10 == 0:
+            criteria['trigger.body.author'] = {'type': 'matchregex', 'pattern': 'user-.*'}
+
+        rule = RuleDB(id=bson.ObjectId(), pack='benchmark', name='rule-%s' % (index),
+                      trigger=TRIGGER.get_reference().ref, criteria=criteria,
+                      action=ActionExecutionSpecDB(ref='core.local'))
+        rules.append(rule)
+
+    return rules
+
+
+def _get_trigger_instances(rules_count, count):
+    trigger_instances = []
+
+    for _ in range(count):
+        payload = {
+            'body': {
+                'repository': 'repo-%s' % (random.randint(0, rules_count - 1)),
+                'branch': random.choice(['master', 'dev']),
+                'author': 'user-%s' % (random.randint(0, 100))
+            }
+        }
+        trigger_instance = TriggerInstanceDB(trigger=TRIGGER.get_reference().ref,
+                                             occurrence_time=date_utils.get_datetime_utc_now(),
+                                             payload=payload)
+        trigger_instances.append(trigger_instance)
+
+    return trigger_instances
+
+
+def _benchmark(matcher_cls, trigger_instances, rules, **kwargs):
+    start = time.time()
+    matched = 0
+
+    for trigger_instance in trigger_instances:
+        matcher = matcher_cls(trigger_instance, TRIGGER, rules, **kwargs)
+        matched += len(matcher.get_matching_rules())
+
+    elapsed = time.time() - start
+    return elapsed, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rules matcher benchmark')
+    parser.add_argument('--rules', default='10,100,1000,10000',
+                        help='Comma separated list of rule counts to benchmark with.')
+    parser.add_argument('--trigger-instances', type=int, default=100,
+                        help='Number of trigger instances to match per rule count.')
+    args = parser.parse_args()
+
+    # Per rule logging would dominate the results
+    logging.disable(logging.INFO)
+
+    print('%10s %20s %20s %10s' % ('rules', 'linear (ms/instance)', 'network (ms/instance)',
+                                   'speedup'))
+
+    for rules_count in [int(value) for value in args.rules.split(',')]:
+        rules = _get_rules(rules_count)
+        trigger_instances = _get_trigger_instances(rules_count, args.trigger_instances)
+
+        # Compiled rules and the network are built once, same as with the rule index
+        compiled_rules = dict([(str(rule.id), CompiledRule(rule)) for rule in rules])
+        network = RuleNetwork(compiled_rules=[compiled_rules[str(rule.id)] for rule in rules])
+
+        linear_time, linear_matched = _benchmark(RulesMatcher, trigger_instances, rules,
+                                                 compiled_rules=compiled_rules)
+        network_time, network_matched = _benchmark(NetworkRulesMatcher, trigger_instances, rules,
+                                                   compiled_rules=compiled_rules,
+                                                   network=network)
+
+        assert linear_matched == network_matched
+
+        count = len(trigger_instances)
+        print('%10s %20.3f %20.3f %9.1fx' % (rules_count, (linear_time / count) * 1000,
+                                             (network_time / count) * 1000,
+                                             linear_time / network_time))
+
+
+if __name__ == '__main__':
+    main()